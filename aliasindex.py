@@ -0,0 +1,113 @@
+"""Index of the aliases of all entries of a catalog.
+
+Import tasks resolve the names they read to entries through `add_entry`,
+`entry_exists` and `get_preferred_name`, which in `Catalog` scan the aliases
+of every entry, stubs included, on each call. `SupernovaCatalog` instead
+keeps an `AliasIndex` mapping every alias to the names of the entries
+having it. The index is kept up to date by `EntryDict`, the dictionary of
+entries of the catalog, whenever an entry is stored, replaced (e.g. by its
+stub), renamed or deleted, and by `Supernova.add_quantity` whenever an alias
+is added to a stored entry, so that looking up a name never scans the
+entries.
+"""
+from collections import OrderedDict
+
+__all__ = ['AliasIndex', 'EntryDict']
+
+
+class AliasIndex(object):
+    """Map each alias to the names of the entries having it."""
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._names = {}
+        self._aliases = {}
+
+    def __contains__(self, alias):
+        return alias in self._names
+
+    def __len__(self):
+        return len(self._names)
+
+    def names(self, alias):
+        """Return the names of the entries having `alias`."""
+        return self._names.get(alias, [])
+
+    def aliases(self, name):
+        """Return the aliases indexed for entry `name`."""
+        return self._aliases.get(name, set())
+
+    def add(self, name, alias):
+        """Note that entry `name` has `alias`."""
+        aliases = self._aliases.setdefault(name, set())
+        if alias not in aliases:
+            aliases.add(alias)
+            self._names.setdefault(alias, []).append(name)
+
+    def update(self, name, aliases):
+        """Set the aliases of entry `name` to `aliases`."""
+        aliases = set(aliases)
+        known = self.aliases(name)
+        removed, added = known - aliases, aliases - known
+        for alias in removed:
+            self._discard(name, alias)
+        for alias in added:
+            self.add(name, alias)
+        if not aliases:
+            self._aliases.pop(name, None)
+
+    def remove(self, name):
+        """Forget all of the aliases of entry `name`."""
+        for alias in self._aliases.pop(name, set()):
+            self._discard(name, alias)
+
+    def clear(self):
+        """Forget all entries."""
+        self._names.clear()
+        self._aliases.clear()
+
+    def _discard(self, name, alias):
+        self._aliases.get(name, set()).discard(alias)
+        names = self._names.get(alias)
+        if names is not None and name in names:
+            names.remove(name)
+            if not names:
+                del self._names[alias]
+
+
+class EntryDict(OrderedDict):
+    """Dictionary of entries which keeps an `AliasIndex` of them up to date.
+    """
+
+    def __init__(self, index, *args, **kwargs):
+        """Initialize the dictionary, indexing aliases into `index`."""
+        self.index = index
+        super(EntryDict, self).__init__(*args, **kwargs)
+
+    def __setitem__(self, name, entry):
+        super(EntryDict, self).__setitem__(name, entry)
+        self.index.update(name, entry.get_aliases(includename=False))
+
+    def __delitem__(self, name):
+        super(EntryDict, self).__delitem__(name)
+        self.index.remove(name)
+
+    def pop(self, name, *args):
+        """Remove entry `name` and return it."""
+        if name in self:
+            self.index.remove(name)
+        return super(EntryDict, self).pop(name, *args)
+
+    def popitem(self, last=True):
+        """Remove and return the last (or first) `(name, entry)` pair."""
+        name, entry = super(EntryDict, self).popitem(last=last)
+        self.index.remove(name)
+        return name, entry
+
+    def clear(self):
+        """Remove all entries."""
+        super(EntryDict, self).clear()
+        self.index.clear()
+
+    def __reduce__(self):
+        return (type(self), (self.index, list(self.items())))
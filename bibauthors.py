@@ -0,0 +1,134 @@
+"""Batched, concurrent resolution of bibcode authors from ADS.
+
+Authors used to be fetched inline by `Supernova.sanitize`, with one blocking
+request per unseen bibcode.  `BibcodeResolver` instead takes every missing
+bibcode at once, asks ADS for them in batches using a few threads, and
+retries failed requests with an exponential backoff.
+"""
+import time
+import urllib.parse
+import urllib.request
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from html import unescape
+
+__all__ = ['BibcodeResolver', 'clean_bibcode']
+
+
+def clean_bibcode(bibcode, biberror_dict):
+    """Return `bibcode` unescaped and with known errors corrected."""
+    if len(bibcode) != 19:
+        bibcode = urllib.parse.unquote(unescape(bibcode)).replace('A.A.',
+                                                                  'A&A')
+    if bibcode in biberror_dict:
+        bibcode = biberror_dict[bibcode]
+    return bibcode
+
+
+class BibcodeResolver(object):
+    """Resolve the "First author et al. (year)" string of many bibcodes.
+
+    `base_url` is the ADS abstract service URL which the (';' separated)
+    bibcodes are appended to, e.g. `Catalog.ADS_BIB_URL`; any server
+    answering in the same format, such as a local stub, can be used instead.
+    """
+
+    BATCH_SIZE = 100
+    MAX_WORKERS = 8
+    RETRIES = 3
+    BACKOFF = 1.0
+    TIMEOUT = 60
+
+    # Custom ADS formats (`%R` is the bibcode, `%3m` the author list)
+    BATCH_FORMAT = ('&data_type=Custom&nr_to_return={}'
+                    '&format=%25R%09%253m%20%25(y)')
+    SINGLE_FORMAT = '&data_type=Custom&format=%253m%20%25(y)'
+
+    def __init__(self, base_url, batch_size=None, max_workers=None,
+                 retries=None, timeout=None):
+        """Initialize the resolver."""
+        self.base_url = base_url
+        self.batch_size = batch_size or self.BATCH_SIZE
+        self.max_workers = max_workers or self.MAX_WORKERS
+        self.retries = self.RETRIES if retries is None else retries
+        self.timeout = timeout or self.TIMEOUT
+
+    def resolve(self, bibcodes):
+        """Return an `OrderedDict` of bibcode -> author string.
+
+        Bibcodes that ADS did not return authors for map to an empty string.
+        """
+        bibcodes = list(OrderedDict.fromkeys(bibcodes))
+        batches = [bibcodes[i:i + self.batch_size]
+                   for i in range(0, len(bibcodes), self.batch_size)]
+
+        found = {}
+        missing = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for batch, authors in zip(
+                    batches, executor.map(self._query_batch, batches)):
+                # A batch ADS could not be reached for is given up on whole.
+                if authors is None:
+                    found.update((x, '') for x in batch)
+                    continue
+                found.update(authors)
+                missing.extend(x for x in batch if not authors.get(x))
+
+            # Fall back to one request per bibcode for any a batch missed.
+            for bibcode, author in zip(
+                    missing, executor.map(self._query_single, missing)):
+                found[bibcode] = author
+
+        authors = OrderedDict()
+        for bibcode in bibcodes:
+            if not found[bibcode]:
+                warnings.warn(
+                    "Bibcode didn't return authors, not converting"
+                    "this bibcode.")
+            authors[bibcode] = found[bibcode]
+        return authors
+
+    def _query_batch(self, bibcodes):
+        """Return the authors ADS found of `bibcodes`, `None` on failure."""
+        query = (self.base_url +
+                 ';'.join(urllib.parse.quote(x) for x in bibcodes) +
+                 self.BATCH_FORMAT.format(len(bibcodes)))
+        text = self._fetch(query)
+        if text is None:
+            return None
+        authors = {}
+        wanted = set(bibcodes)
+        for line in text.splitlines():
+            if '\t' not in line:
+                continue
+            bibcode, author = line.split('\t', 1)
+            bibcode = bibcode.strip()
+            if bibcode in wanted:
+                authors[bibcode] = unescape(author).strip()
+        return authors
+
+    def _query_single(self, bibcode):
+        query = (self.base_url + urllib.parse.quote(bibcode) +
+                 self.SINGLE_FORMAT)
+        text = self._fetch(query)
+        if text is None:
+            return ''
+        hsplit = text.split("\n")
+        if len(hsplit) > 5:
+            return unescape(hsplit[5]).strip()
+        return ''
+
+    def _fetch(self, url):
+        """Return the decoded response from `url`, `None` on failure."""
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.BACKOFF * 2 ** (attempt - 1))
+            try:
+                response = urllib.request.urlopen(url, timeout=self.timeout)
+                return response.read().decode('utf-8')
+            except (KeyboardInterrupt, SystemExit):
+                raise
+            except Exception:
+                continue
+        return None
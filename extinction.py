@@ -0,0 +1,156 @@
+"""Milky Way extinction lookups, from IRSA or from local SFD dust maps.
+
+Extinctions are cached by a small cell in (RA, Dec) rather than by entry
+name, so that renamed and merged entries still hit the cache, and all the
+positions missing from the cache can be resolved together before cleanup.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from astropy import units as un
+from astropy.coordinates import SkyCoord as coord
+from astropy.io import fits
+
+__all__ = ['ExtinctionResolver', 'SFDMap', 'coordinate_cell', 'parse_coords']
+
+
+def coordinate_cell(ra, dec):
+    """Return the cache key of the cell containing `ra`, `dec` (degrees).
+
+    Cells are 1e-4 degrees on a side, far smaller than the resolution of the
+    dust maps.
+    """
+    return '{:.4f} {:+.4f}'.format(ra % 360.0, dec)
+
+
+def parse_coords(ras, decs):
+    """Parse sexagesimal coordinate strings into a `SkyCoord` array.
+
+    Returns the coordinates along with a mask of those that could be parsed.
+    """
+    try:
+        coords = coord(ras, decs, unit=(un.hourangle, un.deg))
+        return coords, np.ones(len(ras), dtype=bool)
+    except (KeyboardInterrupt, SystemExit):
+        raise
+    except Exception:
+        pass
+    # Some string failed to parse, parse them one at a time instead.
+    radeg = np.zeros(len(ras))
+    decdeg = np.zeros(len(ras))
+    good = np.zeros(len(ras), dtype=bool)
+    for i, (ra, dec) in enumerate(zip(ras, decs)):
+        try:
+            c = coord(ra, dec, unit=(un.hourangle, un.deg))
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except Exception:
+            continue
+        radeg[i] = c.ra.deg
+        decdeg[i] = c.dec.deg
+        good[i] = True
+    return coord(radeg, decdeg, unit=(un.deg, un.deg)), good
+
+
+class SFDMap(object):
+    """Schlegel, Finkbeiner & Davis (1998) dust maps read from local FITS.
+
+    `path` is the directory containing `SFD_dust_4096_ngp.fits` and
+    `SFD_dust_4096_sgp.fits`; the maps are memory-mapped, so only the pixels
+    that are needed are ever read.  Like IRSA's `ext SandF` columns, values
+    are rescaled by 0.86 (Schlafly & Finkbeiner 2011), and the mean and
+    standard deviation are taken over a 5' radius about each position.
+    """
+
+    FILENAME = 'SFD_dust_4096_{}.fits'
+    SCALING = 0.86
+    RADIUS = 5.0 * un.arcmin
+    # Spacing of the points sampled within `RADIUS` of each position.
+    STEP = 1.0 * un.arcmin
+
+    def __init__(self, path):
+        """Open the two hemisphere maps."""
+        self._hdus = {}
+        for pole in ('ngp', 'sgp'):
+            hdulist = fits.open(
+                os.path.join(path, self.FILENAME.format(pole)), memmap=True)
+            self._hdus[pole] = hdulist[0]
+
+        radius = self.RADIUS.to(un.arcmin).value
+        step = self.STEP.to(un.arcmin).value
+        steps = np.arange(-radius, radius + 0.5 * step, step)
+        dx, dy = np.meshgrid(steps, steps)
+        inside = np.hypot(dx, dy) <= radius
+        self._offset_pa = np.arctan2(dx[inside], dy[inside]) * un.rad
+        self._offset_sep = np.hypot(dx[inside], dy[inside]) * un.arcmin
+
+    def ebv(self, coords):
+        """Return the mean and standard deviation of E(B-V) at `coords`."""
+        coords = coords.reshape(-1)
+        samples = coords[:, np.newaxis].directional_offset_by(
+            self._offset_pa[np.newaxis, :],
+            self._offset_sep[np.newaxis, :]).galactic
+        values = self._values(samples.l.rad, samples.b.rad) * self.SCALING
+        return values.mean(axis=1), values.std(axis=1)
+
+    def _values(self, lrad, brad):
+        """Return the map values at galactic `lrad`, `brad` (radians)."""
+        values = np.zeros(lrad.shape)
+        for pole, sign in (('ngp', 1.0), ('sgp', -1.0)):
+            hemi = (brad >= 0.0) if sign > 0 else (brad < 0.0)
+            if not np.any(hemi):
+                continue
+            hdu = self._hdus[pole]
+            header = hdu.header
+            lam_scal = header['LAM_SCAL']
+            # Lambert zenithal equal-area projection, see SFD98 appendix C.
+            rad = lam_scal * np.sqrt(1.0 - sign * np.sin(brad[hemi]))
+            x = header['CRPIX1'] - 1.0 + rad * np.cos(lrad[hemi])
+            y = header['CRPIX2'] - 1.0 - sign * rad * np.sin(lrad[hemi])
+            nrow, ncol = hdu.data.shape
+            ix = np.clip(np.round(x).astype(int), 0, ncol - 1)
+            iy = np.clip(np.round(y).astype(int), 0, nrow - 1)
+            values[hemi] = hdu.data[iy, ix]
+        return values
+
+
+class ExtinctionResolver(object):
+    """Resolve E(B-V) for many positions at once.
+
+    Positions are looked up in the local SFD maps if `sfd_path` is given,
+    otherwise IRSA is queried for each of them from a pool of threads.
+    """
+
+    MAX_WORKERS = 8
+
+    def __init__(self, sfd_path=None, max_workers=None):
+        """Initialize the resolver."""
+        self.sfd_map = SFDMap(sfd_path) if sfd_path else None
+        self.max_workers = max_workers or self.MAX_WORKERS
+
+    def resolve(self, ra_decs, coords, good):
+        """Return a list of `[ebv, ebverr]` (or `None`) for each position.
+
+        `ra_decs` are the "RA Dec" strings sent to IRSA, `coords` the same
+        positions as a `SkyCoord` array used for the local maps, and `good`
+        the mask of the `coords` that could be parsed (see `parse_coords`).
+        """
+        if not len(ra_decs):
+            return []
+        if self.sfd_map is not None:
+            means, stds = self.sfd_map.ebv(coords)
+            return [[round(float(x), 4), round(float(y), 4)] if g else None
+                    for x, y, g in zip(means, stds, good)]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(self._query_irsa, ra_decs))
+
+    def _query_irsa(self, ra_dec):
+        from astroquery.irsa_dust import IrsaDust
+        try:
+            result = IrsaDust.get_query_table(ra_dec, section='ebv')
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except Exception:
+            return None
+        return [result['ext SandF mean'][0], result['ext SandF std'][0]]
@@ -0,0 +1,105 @@
+"""Reading of one-dimensional FITS spectra.
+
+The FITS spectrum tasks opened every file in full, converted its data to
+lists of strings point by point and built the wavelength grid in a Python
+loop, one file after another. `read_fits_spectrum` instead memory-maps the
+file, so that only the planes holding the fluxes and errors are read, and
+returns them as arrays along with a wavelength grid computed in one NumPy
+operation, ready to be passed to `Supernova.add_spectrum`.
+`read_fits_spectra` reads a list of files in a pool of worker processes,
+returning them in order.
+"""
+import os
+from collections import OrderedDict
+from functools import partial
+
+import numpy as np
+from astropy.io import fits
+
+from .utils import process_map
+
+__all__ = ['FITSSpectrum', 'read_fits_spectra', 'read_fits_spectrum']
+
+
+class FITSSpectrum(object):
+    """The header, fluxes, errors and wavelengths of a FITS spectrum.
+
+    `header` maps the keywords of the primary header to their values.
+    `fluxes` and `errors` are `None` if the data have a number of axes
+    other than 1 or 3, and `errors` is also `None` for 1-axis data.
+    `warning` is the error met verifying the header, if it was not raised.
+    """
+
+    def __init__(self, path, header, fluxes=None, errors=None,
+                 wavelengths=None, warning=None):
+        """Initialize from the parts read by `read_fits_spectrum`."""
+        self.path = path
+        self.filename = os.path.basename(path)
+        self.header = header
+        self.fluxes = fluxes
+        self.errors = errors
+        self.wavelengths = wavelengths
+        self.warning = warning
+
+
+def _start_wavelength(header):
+    """Return the wavelength of the first pixel of a spectrum."""
+    if 'CRVAL1' in header:
+        return header['CRVAL1']
+    if header.get('CTYPE1') == 'MULTISPE':
+        return float(header['WAT2_001'].split('"')[-1].split()[3])
+    raise ValueError('Unsupported spectrum format.')
+
+
+def read_fits_spectrum(path, error_band=-1, strict=True):
+    """Read the spectrum in the primary HDU of FITS file `path`.
+
+    Header keywords containing '.' or '/' are dropped before the header is
+    verified. If `strict` is false, a header that cannot be fixed is
+    reported in the `warning` of the spectrum rather than raising an error,
+    for the caller to log. Data with 3 axes are read as
+    IRAF multispec data, the fluxes being in the first band and the errors
+    in band `error_band`.
+    """
+    with fits.open(path, memmap=True) as hdulist:
+        hdu = hdulist[0]
+        # Delete from the end so that earlier indices stay valid.
+        for ci in reversed([i for i, x in enumerate(hdu.header)
+                            if '.' in x or '/' in x]):
+            del hdu.header[ci]
+        warning = None
+        try:
+            hdu.verify('silentfix')
+        except Exception as e:
+            if strict:
+                raise
+            warning = str(e)
+        header = OrderedDict(hdu.header.items())
+
+        if not header['SIMPLE']:
+            raise ValueError('Non-simple FITS import not yet supported.')
+        w0 = _start_wavelength(header)
+        if header['NAXIS'] == 1:
+            wd = header['CDELT1']
+            fluxes = np.array(hdu.data)
+            errors = None
+        elif header['NAXIS'] == 3:
+            wd = header['CD1_1']
+            fluxes = np.array(hdu.data[0][0])
+            errors = np.array(hdu.data[error_band][0])
+        else:
+            return FITSSpectrum(path, header, warning=warning)
+
+    # The first pixel is taken to be the reference pixel.
+    wavelengths = w0 + wd * np.arange(len(fluxes))
+    return FITSSpectrum(path, header, fluxes, errors, wavelengths, warning)
+
+
+def read_fits_spectra(paths, processes=None, **kwargs):
+    """Read the FITS spectra `paths`, yielding `FITSSpectrum`s in order.
+
+    Files are read by `processes` worker processes (one per core if `None`),
+    with the keyword arguments of `read_fits_spectrum`.
+    """
+    return process_map(partial(read_fits_spectrum, **kwargs), paths,
+                       processes=processes)
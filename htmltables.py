@@ -0,0 +1,164 @@
+"""Parsing of HTML pages, and extraction of the rows of their tables.
+
+The scraping tasks parsed every page with BeautifulSoup's `html5lib` tree
+builder, the slowest one there is, before walking its rows. `parse_html`
+instead builds the tree with `lxml`, and only falls back to `html5lib` for
+pages `lxml` would build a different tree of: pages `lxml` reports errors
+in, or with content misplaced in their tables, which `html5lib` moves out of
+them. `table_rows` yields the cells of each row of a page as it goes, and
+`page_rows` extracts the rows of several pages at once in worker
+processes, returning them as `Cell`s, picklable copies of the cells which
+can be used as the BeautifulSoup tags they were made from.
+"""
+from functools import partial
+
+from bs4 import BeautifulSoup, Tag
+
+from .utils import process_map
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+__all__ = ['Cell', 'is_malformed', 'page_rows', 'parse_html', 'table_rows']
+
+# Elements whose children may only be other table elements, and those.
+TABLE_ELEMENTS = {
+    'table': {'caption', 'colgroup', 'thead', 'tbody', 'tfoot', 'tr'},
+    'thead': {'tr'},
+    'tbody': {'tr'},
+    'tfoot': {'tr'},
+    'tr': {'td', 'th'}
+}
+TABLE_CONTENT = {'script', 'style', 'template'}
+
+
+class Cell(object):
+    """Copy of a BeautifulSoup tag, with the parts of its interface used by
+    the tasks: its `name`, `attrs`, `contents` (strings and `Cell`s), `text`,
+    `find`, `findAll`, `renderContents`, indexing by attribute and `str`.
+    """
+
+    def __init__(self, tag):
+        """Copy `tag`."""
+        self.name = tag.name
+        self.attrs = dict(tag.attrs)
+        self.contents = [Cell(x) if isinstance(x, Tag) else str(x)
+                         for x in tag.contents]
+        self.text = tag.text
+        self._html = str(tag)
+        self._inner = tag.renderContents()
+
+    def __str__(self):
+        return self._html
+
+    def __getitem__(self, key):
+        return self.attrs[key]
+
+    def get(self, key, default=None):
+        """Return attribute `key`, `default` if the tag does not have it."""
+        return self.attrs.get(key, default)
+
+    def has_attr(self, key):
+        """Return whether the tag has attribute `key`."""
+        return key in self.attrs
+
+    def renderContents(self):
+        """Return the HTML of the contents of the tag, encoded as UTF-8."""
+        return self._inner
+
+    def find(self, name):
+        """Return the first descendant tag called `name`, if any."""
+        found = self.findAll(name)
+        return found[0] if found else None
+
+    def findAll(self, name):
+        """Return the descendant tags called `name`, in order."""
+        found = []
+        for x in self.contents:
+            if isinstance(x, Cell):
+                if x.name == name:
+                    found.append(x)
+                found.extend(x.findAll(name))
+        return found
+
+
+def is_malformed(html):
+    """Return whether `lxml` would parse `html` differently from `html5lib`.
+
+    Pages are taken to be parsed alike if `lxml` reports no errors in them
+    (other than unknown tags), have no text or elements misplaced in their
+    tables, and no tables without a `tbody` in the cells of others. Pages
+    which are not valid UTF-8 are taken to be malformed, as the two parsers
+    may guess their encodings differently.
+    """
+    if etree is None:
+        return True
+    if isinstance(html, bytes):
+        try:
+            html.decode('utf-8')
+        except UnicodeDecodeError:
+            return True
+    parser = etree.HTMLParser(recover=True)
+    try:
+        root = etree.fromstring(html, parser)
+    except (etree.LxmlError, ValueError):
+        return True
+    if root is None:
+        return True
+    if any(x.type_name != 'HTML_UNKNOWN_TAG' for x in parser.error_log):
+        return True
+    for table in root.iter('table'):
+        # Only `html5lib` adds the `tbody` of a table, which shows in the
+        # cell the table is in, if any.
+        if (any(x.tag == 'tr' for x in table) and
+                any(x.tag in ('td', 'th') for x in table.iterancestors())):
+            return True
+    for element in root.iter(*TABLE_ELEMENTS):
+        if element.text and element.text.strip():
+            return True
+        allowed = TABLE_ELEMENTS[element.tag]
+        for child in element:
+            if child.tail and child.tail.strip():
+                return True
+            # Comments are kept in place by both parsers.
+            if (isinstance(child.tag, str) and child.tag not in allowed and
+                    child.tag not in TABLE_CONTENT):
+                return True
+    return False
+
+
+def parse_html(html, **kwargs):
+    """Return the `BeautifulSoup` of `html`, built with `lxml` unless it is
+    malformed.
+    """
+    builder = 'html5lib' if is_malformed(html) else 'lxml'
+    return BeautifulSoup(html, builder, **kwargs)
+
+
+def table_rows(html, table=None):
+    """Yield a tuple of the cells (`td` tags) of each row of `html`.
+
+    Rows are those of table number `table` of the page if given, of all of
+    its tables otherwise. Rows without cells yield empty tuples.
+    """
+    soup = html if isinstance(html, BeautifulSoup) else parse_html(html)
+    if table is not None:
+        soup = soup.findAll('table')[table]
+    for row in soup.findAll('tr'):
+        yield tuple(row.findAll('td'))
+
+
+def _page_rows(html, table=None):
+    return [tuple(Cell(x) for x in row) for row in table_rows(html, table)]
+
+
+def page_rows(pages, table=None, processes=None):
+    """Yield a list of the rows of each of `pages`, in order.
+
+    Pages are parsed in `processes` worker processes (one per core if
+    `None`), and their cells returned as `Cell`s.
+    """
+    return process_map(partial(_page_rows, table=table), pages,
+                       processes=processes)
@@ -0,0 +1,141 @@
+"""Write-behind journaling of entries within a memory budget.
+
+Many tasks call `journal_entries` every time they move on to another object,
+or after every file they read. Each call writes every entry in memory to disk
+and turns it into a stub, and an entry that is touched again later then has
+to be read back from disk. During an import `SupernovaCatalog` instead keeps
+journaled entries in memory until their estimated size exceeds
+`SupernovaCatalog.JOURNAL_BUDGET_MB`, then writes the least recently used
+ones out in one batch. Entries are serialized when they are journaled, and
+only the resulting bytes are written on a background thread. All entries
+are still written, and stubbed, at the end of every task, so each task
+starts from the same state as before.
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from astrocats.catalog.spectrum import SPECTRUM
+
+from .photometrycolumns import PhotometryColumns
+from .supernova import SUPERNOVA
+
+__all__ = ['JournalBuffer', 'entry_size']
+
+# Rough memory used by a quantity, photometric point or source, by a point
+# kept in `PhotometryColumns`, and by a point of a spectrum.
+ITEM_BYTES = 1000
+PHOTOMETRY_ROW_BYTES = 300
+SPECTRUM_POINT_BYTES = 250
+
+
+def entry_size(entry):
+    """Return an estimate of the memory used by `entry`, in bytes."""
+    size = 0
+    for value in entry.values():
+        if isinstance(value, list):
+            size += len(value) * ITEM_BYTES
+        elif isinstance(value, PhotometryColumns):
+            size += len(value) * PHOTOMETRY_ROW_BYTES
+    for spectrum in entry.get(SUPERNOVA.SPECTRA, []):
+        size += len(spectrum.get(SPECTRUM.DATA, [])) * SPECTRUM_POINT_BYTES
+    return size
+
+
+class JournalBuffer(object):
+    """Track entries in least recently used order and write them behind.
+
+    Entries are written by calling `write` with the arguments passed to
+    `submit` on a single background thread; `wait(name)` must be called
+    before the file of an entry is read.
+    """
+
+    # Fraction of the budget entries are written down to once it is
+    # exceeded, so that they are written in large batches.
+    LOW_WATER = 0.5
+
+    def __init__(self, write, budget):
+        """Initialize the buffer, `budget` in bytes."""
+        self.write = write
+        self.budget = budget
+        self._lru = OrderedDict()
+        self._touched = set()
+        self._sizes = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def touch(self, name):
+        """Note that entry `name` was just used."""
+        self._lru[name] = None
+        self._lru.move_to_end(name)
+        self._touched.add(name)
+
+    def evictions(self, entries):
+        """Return the names of the entries to write to keep to the budget.
+
+        `entries` is the catalog's dictionary of entries, of which only
+        those that are not stubs are counted.
+        """
+        dirty = [x for x in entries if not entries[x]._stub]
+        sizes = {}
+        for name in dirty:
+            if name in self._touched or name not in self._sizes:
+                sizes[name] = entry_size(entries[name])
+            else:
+                sizes[name] = self._sizes[name]
+        self._sizes = sizes
+        self._touched = set()
+        total = sum(sizes.values())
+        if total <= self.budget:
+            return []
+
+        # Entries never touched through `add_entry` are written first.
+        rank = {x: i for i, x in enumerate(self._lru)}
+        evict = []
+        for name in sorted(dirty, key=lambda x: rank.get(x, -1)):
+            if total <= self.LOW_WATER * self.budget:
+                break
+            evict.append(name)
+            total -= sizes[name]
+        return evict
+
+    def submit(self, name, *args):
+        """Write entry `name` in the background, calling `write(*args)`,
+        and forget about it.
+        """
+        self._lru.pop(name, None)
+        self._sizes.pop(name, None)
+        self.wait(name)
+        future = self._executor.submit(self.write, *args)
+        with self._lock:
+            self._pending[name] = future
+        future.add_done_callback(lambda x: self._done(name, x))
+
+    def wait(self, name):
+        """Wait for the write of entry `name`, if any, to finish."""
+        with self._lock:
+            future = self._pending.get(name)
+        if future is not None:
+            future.result()
+
+    def wait_all(self):
+        """Wait for all writes to finish, raising the first error."""
+        with self._lock:
+            futures = list(self._pending.values())
+        for future in futures:
+            future.result()
+
+    def close(self):
+        """Wait for all writes and stop the writer thread."""
+        try:
+            self.wait_all()
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def _done(self, name, future):
+        with self._lock:
+            # Failed writes are kept so that waiting raises their error.
+            if (self._pending.get(name) is future and
+                    future.exception() is None):
+                del self._pending[name]
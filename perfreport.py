@@ -0,0 +1,137 @@
+"""Per-task performance report of an import.
+
+`TaskProfiler` records, for every task run by `SupernovaCatalog.import_data`,
+its wall and CPU time, the time spent blocked in `load_url` and in HTTP
+downloads, how many entries it created or modified, how often it called
+`add_quantity`, `add_photometry`, `add_spectrum` and `journal_entries`, and
+the peak resident memory of the process by the time it finished. The report
+is written as JSON to `SupernovaCatalog.PATHS.PERF_REPORTS`, one file per
+import; `scripts/perfdiff.py` compares two of them.
+"""
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, where peak memory is not reported.
+    resource = None
+
+__all__ = ['TaskProfiler']
+
+COUNTERS = ['load_url', 'http', 'add_quantity', 'add_photometry',
+            'add_spectrum', 'journal_entries']
+TIMERS = ['load_url', 'http', 'journal_entries']
+
+
+def peak_rss_mb():
+    """Return the peak resident memory of this process so far, in MB,
+    `None` if it cannot be found.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS, kilobytes elsewhere.
+    return peak / (1024. ** 2 if sys.platform == 'darwin' else 1024.)
+
+
+class TaskProfiler(object):
+    """Accumulate timings and counts for the running task."""
+
+    def __init__(self):
+        """Initialize an empty report."""
+        self.started = datetime.now()
+        self.tasks = OrderedDict()
+        self._task = None
+        self._start = None
+        self._created = set()
+        self._touched = set()
+
+    @property
+    def running(self):
+        """Name of the task being profiled, `None` if none."""
+        return self._task
+
+    def start_task(self, name):
+        """Finish the current task, if any, and start profiling `name`."""
+        self.finish_task()
+        self._task = name
+        self._created = set()
+        self._touched = set()
+        stats = OrderedDict([('wall_time', 0.), ('cpu_time', 0.)])
+        for timer in TIMERS:
+            stats[timer + '_time'] = 0.
+        for counter in COUNTERS:
+            stats[counter + '_calls'] = 0
+        self.tasks[name] = stats
+        self._start = (time.perf_counter(), time.process_time())
+
+    def finish_task(self):
+        """Finish profiling the current task."""
+        if self._task is None:
+            return
+        stats = self.tasks[self._task]
+        stats['wall_time'] += time.perf_counter() - self._start[0]
+        stats['cpu_time'] += time.process_time() - self._start[1]
+        stats['entries_created'] = len(self._created)
+        stats['entries_modified'] = len(self._touched - self._created)
+        peak = peak_rss_mb()
+        if peak is not None:
+            stats['peak_rss_mb'] = peak
+        self._task = None
+
+    def count(self, counter, n=1):
+        """Add `n` calls of `counter` to the current task."""
+        if self._task is not None:
+            self.tasks[self._task][counter + '_calls'] += n
+
+    @contextmanager
+    def timed(self, timer):
+        """Count a call of `timer`, adding the time spent in the block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self._task is not None:
+                stats = self.tasks[self._task]
+                stats[timer + '_time'] += time.perf_counter() - start
+                stats[timer + '_calls'] += 1
+
+    def entry_created(self, name):
+        """Note that the current task created entry `name`."""
+        if self._task is not None:
+            self._created.add(name)
+
+    def entry_touched(self, name):
+        """Note that the current task added data to entry `name`."""
+        if self._task is not None:
+            self._touched.add(name)
+
+    def report(self):
+        """Return the report as a dictionary."""
+        return OrderedDict([
+            ('started', self.started.strftime('%Y-%m-%d %H:%M:%S')),
+            ('wall_time', sum(x['wall_time'] for x in self.tasks.values())),
+            ('peak_rss_mb', peak_rss_mb()),
+            ('tasks', self.tasks)
+        ])
+
+    def save(self, directory):
+        """Write the report to a timestamped file in `directory`.
+
+        Returns the path of the file.
+        """
+        self.finish_task()
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        path = os.path.join(
+            directory, 'import-' + self.started.strftime('%Y%m%d-%H%M%S') +
+            '.json')
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent='\t', separators=(',', ':'))
+        return path
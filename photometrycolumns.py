@@ -0,0 +1,236 @@
+"""Photometry of an entry kept as compact rows, with typed columns."""
+import sys
+from collections import OrderedDict
+from copy import deepcopy
+
+import numpy as np
+from astrocats.catalog.photometry import PHOTOMETRY, Photometry
+
+from .quantityindex import PhotometryIndex
+
+__all__ = ['PHOTOMETRY_CATEGORIES', 'PhotometryColumns']
+
+# Photometry keys with categorical values, whose strings are interned as
+# points are added so that the points of an entry share them.
+PHOTOMETRY_CATEGORIES = (PHOTOMETRY.BAND, PHOTOMETRY.BAND_SET,
+                         PHOTOMETRY.INSTRUMENT, PHOTOMETRY.SOURCE,
+                         PHOTOMETRY.SYSTEM, PHOTOMETRY.TELESCOPE,
+                         PHOTOMETRY.U_TIME)
+
+
+def _to_float(value, reduce=None):
+    """Convert a photometry value, or reduce a list of them, to a float."""
+    try:
+        if isinstance(value, list):
+            return float(reduce([float(x) for x in value]))
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class PhotometryColumns(object):
+    """The photometry points of an entry, in place of a list of them.
+
+    Each point is stored as a tuple of its values, led by the tuple of its
+    keys, which it shares with the other points having the same keys;
+    categorical values (see `PHOTOMETRY_CATEGORIES`) are interned. Indexing
+    or iterating makes new `Photometry` dicts of the points, changes to which
+    are only kept by assigning them back to their index. Columns of floats,
+    flags and category codes are parsed from the points the first time they
+    are asked for, and follow points being appended.
+    """
+
+    def __init__(self, photometry=()):
+        """Initialize from a list of `Photometry` points."""
+        self._rows = []
+        self._layouts = {}
+        self._attributes = None
+        self._buckets = {}
+        self._bucketed = 0
+        self._reset_columns()
+        for photo in photometry:
+            self.append(photo)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._point(x) for x in self._rows[index]]
+        return self._point(self._rows[index])
+
+    def __setitem__(self, index, photo):
+        self._rows[index] = self._pack(photo)
+        self._reset_columns()
+        self._buckets = {}
+        self._bucketed = 0
+
+    def __iter__(self):
+        for row in self._rows:
+            yield self._point(row)
+
+    def __deepcopy__(self, memo):
+        # Points keep their parent, as `CatDict.__deepcopy__` does.
+        columns = PhotometryColumns()
+        columns._rows = deepcopy(self._rows, memo)
+        columns._layouts = self._layouts
+        columns._attributes = self._attributes
+        return columns
+
+    def append(self, photo):
+        """Add `Photometry` point `photo` after the others."""
+        self._rows.append(self._pack(photo))
+
+    def sort(self, key=None, reverse=False):
+        """Sort the points in place, as `list.sort` would sort them."""
+        if key is None:
+            raise TypeError('Photometry points can only be sorted by key.')
+        order = sorted(range(len(self._rows)), key=lambda i: key(self[i]),
+                       reverse=reverse)
+        self._rows = [self._rows[i] for i in order]
+        self._reset_columns()
+        self._buckets = {}
+        self._bucketed = 0
+
+    def take(self, indices):
+        """Return the points `indices`, along with their parsed columns."""
+        columns = PhotometryColumns()
+        columns._rows = [self._rows[i] for i in indices]
+        columns._layouts = self._layouts
+        columns._attributes = self._attributes
+        for name, column in self._columns.items():
+            if len(column) == len(self._rows):
+                columns._columns[name] = column[indices]
+        for key in self.categories:
+            if ('codes', key) in columns._columns:
+                columns.categories[key] = list(self.categories[key])
+                columns._category_codes[key] = dict(
+                    self._category_codes[key])
+        return columns
+
+    def ordered(self):
+        """Return the points as `OrderedDict`s, in the key order written."""
+        ordered = []
+        for row in self._rows:
+            keys, order = self._layouts[row[0]]
+            ordered.append(OrderedDict((keys[i], row[i + 1]) for i in order))
+        return ordered
+
+    def add_sources_of_duplicate(self, photo):
+        """Add the sources of `photo` to the first point it duplicates.
+
+        Returns whether there was such a point. Points are compared only with
+        those sharing their `PhotometryIndex` bucket.
+        """
+        for row in self._rows[self._bucketed:]:
+            self._buckets.setdefault(self._bucket(row), []).append(
+                self._bucketed)
+            self._bucketed += 1
+        bucket = tuple(str(photo.get(x)) for x in PhotometryIndex.BUCKET_KEYS)
+        for index in self._buckets.get(bucket, []):
+            item = self[index]
+            if photo.is_duplicate_of(item):
+                item.append_sources_from(photo)
+                self._rows[index] = self._pack(item)
+                self._reset_columns()
+                return True
+        return False
+
+    def values(self, key, reduce=np.mean):
+        """Return the values of `key` as floats, NaN where missing.
+
+        Listed values are reduced to one with `reduce`.
+        """
+        return self._column(
+            ('values', key, reduce), np.float64,
+            lambda x: _to_float(self._get(x, key, np.nan), reduce))
+
+    def has(self, key):
+        """Return whether each point has `key`."""
+        return self._column(('has', key), bool, lambda x: key in x[0])
+
+    def flag(self, key):
+        """Return whether each point has a true value of `key`."""
+        return self._column(('flag', key), bool,
+                            lambda x: bool(self._get(x, key, False)))
+
+    def codes(self, key):
+        """Return the indices of the values of `key` in `categories[key]`.
+
+        Points without `key` have code -1, values are compared as strings.
+        """
+        self.categories.setdefault(key, [])
+        self._category_codes.setdefault(key, {})
+        return self._column(('codes', key), np.int32,
+                            lambda x: self._code(x, key))
+
+    def isin(self, key, values):
+        """Return whether the value of `key` of each point is in `values`.
+        """
+        codes = self.codes(key)
+        return np.isin(codes, [self._category_codes[key][x] for x in values
+                               if x in self._category_codes[key]])
+
+    def _pack(self, photo):
+        """Return the row storing `Photometry` point `photo`."""
+        if self._attributes is None:
+            self._attributes = dict(vars(photo))
+        keys = tuple(photo.keys())
+        if keys not in self._layouts:
+            order = sorted(range(len(keys)),
+                           key=lambda i: photo.sort_func(keys[i]))
+            self._layouts[keys] = (keys, tuple(order))
+        keys = self._layouts[keys][0]
+        values = [photo[x] for x in keys]
+        for i, key in enumerate(keys):
+            if key in PHOTOMETRY_CATEGORIES and isinstance(values[i], str):
+                values[i] = sys.intern(values[i])
+        return (keys,) + tuple(values)
+
+    def _point(self, row):
+        """Return a new `Photometry` point made from `row`."""
+        photo = Photometry.__new__(Photometry)
+        OrderedDict.__init__(photo, zip(row[0], row[1:]))
+        vars(photo).update(self._attributes)
+        return photo
+
+    def _get(self, row, key, default=None):
+        """Return the value of `key` of the point in `row`."""
+        keys = row[0]
+        return row[keys.index(key) + 1] if key in keys else default
+
+    def _bucket(self, row):
+        return tuple(str(self._get(row, x))
+                     for x in PhotometryIndex.BUCKET_KEYS)
+
+    def _reset_columns(self):
+        self._columns = {}
+        self.categories = {}
+        self._category_codes = {}
+
+    def _column(self, name, dtype, parse):
+        """Return column `name`, parsing the points it is missing."""
+        column = self._columns.get(name)
+        if column is None:
+            column = np.empty(0, dtype=dtype)
+        if len(column) < len(self._rows):
+            new = self._rows[len(column):]
+            column = np.concatenate([column, np.fromiter(
+                map(parse, new), dtype=dtype, count=len(new))])
+            self._columns[name] = column
+        return column
+
+    def _code(self, row, key):
+        """Return the category code of `key` of the point in `row`."""
+        value = self._get(row, key)
+        if value is None:
+            return -1
+        return self._category(key, str(value))
+
+    def _category(self, key, value):
+        """Return the code of category `value` of `key`, adding it if new."""
+        codes = self._category_codes[key]
+        if value not in codes:
+            codes[value] = len(codes)
+            self.categories[key].append(sys.intern(value))
+        return codes[value]
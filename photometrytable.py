@@ -0,0 +1,166 @@
+"""Conversion of tables of magnitudes to photometry points.
+
+The tasks reading light curves from VizieR and CDS tables converted every
+row with `convert_aq_output`, turning each of its values into a string,
+searched its column names for magnitude columns, checked each magnitude
+with `is_number` and `float`, and converted each Julian date with
+`Decimal`, one row and band at a time. `table_photometry` instead converts
+and checks each column once, as arrays, and builds the photometry dicts of
+the valid magnitudes only. The dicts are those the loops built, so they are
+added with `add_photometry`, checked for duplicates as any other point.
+"""
+import re
+from decimal import Decimal
+
+import numpy as np
+
+from astrocats.catalog.photometry import PHOTOMETRY
+
+__all__ = ['band_columns', 'jd_to_mjd_strings', 'table_groups',
+           'table_photometry']
+
+# Offset of Modified Julian Dates from Julian Dates.
+MJD_OFFSET = Decimal('2400000.5')
+# Dates that can be converted as floats and still be written to the digits
+# they were given with.
+PLAIN_NUMBER = re.compile(r'^\d{1,9}(\.\d{0,6})?$')
+
+
+def band_columns(colnames, suffix='mag'):
+    """Return the names in `colnames` of magnitude columns, named after
+    their band and `suffix` (`Vmag`), leaving out error and limit columns.
+    """
+    return [x for x in colnames
+            if x.endswith(suffix) and not x.startswith(('e_', 'l_'))]
+
+
+def table_groups(table, column):
+    """Yield each value of `column` of `table` with the rows having it, in
+    the order the values first appear.
+    """
+    values = np.ma.getdata(table[column]).astype(str)
+    keys, first, inverse = np.unique(
+        values, return_index=True, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    order = np.argsort(inverse, kind='stable')
+    groups = np.split(order, np.cumsum(np.bincount(inverse))[:-1])
+    for ki in np.argsort(first):
+        yield str(keys[ki]), table[groups[ki]]
+
+
+def _column(table, name, numbers=True):
+    """Return the values of column `name` as strings, and which of them are
+    given.
+
+    Strings are the values as `convert_aq_output` would give them: numbers
+    as `str` writes them, other values as they are. Values are given if not
+    masked and, if `numbers` is set, numbers other than NaN.
+    """
+    column = table[name]
+    data = np.ma.getdata(column)
+    strings = data.astype(str).tolist()
+    given = ~np.ma.getmaskarray(column)
+    if data.dtype.kind in 'iuf':
+        return strings, given & ~np.isnan(data.astype(float))
+    if not numbers:
+        return strings, given & (data.astype(str) != '')
+    for i in np.flatnonzero(given):
+        x = strings[i]
+        try:
+            given[i] = ' ' not in x and not np.isnan(float(x))
+        except ValueError:
+            given[i] = False
+    return strings, given
+
+
+def jd_to_mjd_strings(jds, offset='0'):
+    """Return the Modified Julian Dates of Julian Dates `jds` (strings), plus
+    `offset` days, written as `jd_to_mjd` gives them.
+
+    Dates are converted as an array of floats and written to as many decimal
+    places as their `Decimal`s would have; those with too many digits for a
+    float to hold are converted as `Decimal`s.
+    """
+    jds = np.asarray(jds, dtype=str)
+    offset = Decimal(offset)
+    decimals = max(-offset.as_tuple().exponent, 1)
+    mjds = np.empty(len(jds), dtype=object)
+    plain = np.array([bool(PLAIN_NUMBER.match(x)) for x in jds],
+                     dtype=bool)
+    if plain.any():
+        values = jds[plain].astype(float) + float(offset - MJD_OFFSET)
+        places = np.char.str_len(np.char.partition(jds[plain], '.')[:, 2])
+        places = np.maximum(places, decimals)
+        strings = np.empty(len(values), dtype=object)
+        for digits in np.unique(places):
+            sel = places == digits
+            strings[sel] = np.char.mod('%.{}f'.format(digits), values[sel])
+        mjds[plain] = strings
+    for i in np.flatnonzero(~plain):
+        mjds[i] = str(Decimal(jds[i]) + offset - MJD_OFFSET)
+    return mjds.astype(str)
+
+
+def table_photometry(table, time, magnitudes, band=None, jd=False,
+                     time_offset='0', upper_limits=(), columns=None,
+                     **fields):
+    """Return the photometry dicts of the magnitudes in `table`.
+
+    `time` is the column of the times of the rows, Julian Dates if `jd` is
+    set (plus `time_offset` days), MJDs otherwise. `magnitudes` are the
+    magnitude columns, whose bands are the values of column `band` if given,
+    their names without `mag` otherwise. A point is made for each magnitude
+    that is a number, with the error in column `e_` + its name if that is a
+    number, as an upper limit without error where column `l_` + its name is
+    one of `upper_limits` (such as `('>',)`). `columns` maps photometry keys to the columns of
+    their values, and `fields` gives keys of the same value for all points.
+    Points are in the order of the rows, then of `magnitudes`.
+    """
+    if not len(table) or not magnitudes:
+        return []
+    times, valid_times = _column(table, time, numbers=jd)
+    if jd:
+        rows = np.flatnonzero(valid_times)
+        for ri, mjd in zip(rows, jd_to_mjd_strings(
+                [times[x] for x in rows], offset=time_offset).tolist()):
+            times[ri] = mjd
+    fields.setdefault(PHOTOMETRY.U_TIME, 'MJD')
+    colnames = table.colnames
+    if band:
+        bands = _column(table, band, numbers=False)[0]
+    mags = []
+    for name in magnitudes:
+        strings, valid = _column(table, name)
+        errors = None
+        if 'e_' + name in colnames:
+            errors = _column(table, 'e_' + name)
+        limits = np.zeros(len(table), dtype=bool)
+        if upper_limits and 'l_' + name in colnames:
+            flags, given = _column(table, 'l_' + name, numbers=False)
+            limits = np.isin(flags, list(upper_limits)) & given
+        if not band:
+            bands = [name.replace('mag', '')] * len(table)
+        mags.append((strings, valid & valid_times, errors, limits, bands))
+    extra = [(key, _column(table, name, numbers=False))
+             for key, name in (columns or {}).items()]
+
+    points = []
+    for ri in np.flatnonzero(np.any([x[1] for x in mags], axis=0)):
+        for strings, valid, errors, limits, bands in mags:
+            if not valid[ri]:
+                continue
+            photodict = {
+                PHOTOMETRY.TIME: times[ri],
+                PHOTOMETRY.BAND: bands[ri],
+                PHOTOMETRY.MAGNITUDE: strings[ri]
+            }
+            photodict.update(fields)
+            for key, (values, given) in extra:
+                if given[ri]:
+                    photodict[key] = values[ri]
+            if limits[ri]:
+                photodict[PHOTOMETRY.UPPER_LIMIT] = True
+            elif errors is not None and errors[1][ri]:
+                photodict[PHOTOMETRY.E_MAGNITUDE] = errors[0][ri]
+            points.append(photodict)
+    return points
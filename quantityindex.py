@@ -0,0 +1,258 @@
+"""Indexes of the quantities and photometry of an entry, by value."""
+from collections import Counter
+
+from astrocats.catalog.key import KEY_TYPES, Key
+from astrocats.catalog.photometry import PHOTOMETRY
+from astrocats.catalog.quantity import QUANTITY
+from astrocats.catalog.utils import get_sig_digits, listify
+
+__all__ = ['PhotometryIndex', 'QuantityIndex']
+
+
+class QuantityIndex(object):
+    """Index of a list of quantities of `key`.
+
+    The index follows quantities being appended to the list, and is rebuilt
+    if the list is replaced or its quantities removed or reordered (other
+    than through `pop`). It does not follow changes made to the quantities
+    themselves; call `reset` after making one.
+    """
+
+    # Rank of a quantity having both preferred kinds and others.
+    BAD_RANK = 'bad'
+
+    def __init__(self, key):
+        """Initialize an index of no quantities of `key`."""
+        self.key = key
+        self.reset()
+
+    def __len__(self):
+        return self._count
+
+    def reset(self):
+        """Forget all quantities, to index them again when next updated."""
+        self._quantities = None
+        self._count = 0
+        self._last = None
+        self._values = {}
+        self._metrics = {}
+        self._counts = {}
+
+    def update(self, quantities):
+        """Index the quantities of `quantities`."""
+        if (quantities is not self._quantities or
+                len(quantities) < self._count or
+                (self._count and
+                 quantities[self._count - 1] is not self._last)):
+            self.reset()
+            self._quantities = quantities
+        for quantity in quantities[self._count:]:
+            self._add(quantity)
+        return self
+
+    def replace(self, quantities):
+        """Index `quantities` in place of the indexed list, reusing what is
+        known of the quantities already indexed, and return it.
+        """
+        known = {id(x): i for i, x in enumerate(
+            self._quantities[:self._count])} if self._quantities else {}
+        metrics = self._metrics
+        self.reset()
+        self._quantities = quantities
+        for name in metrics:
+            self._metrics[name] = []
+            self._counts[name] = Counter()
+        for quantity in quantities:
+            i = known.get(id(quantity))
+            if i is None:
+                self._add(quantity)
+                continue
+            self._values.setdefault(
+                self._bucket(quantity), []).append(quantity)
+            for name, metric in metrics.items():
+                self._metrics[name].append(metric[i])
+                self._counts[name][metric[i]] += 1
+            self._count += 1
+            self._last = quantity
+        return quantities
+
+    def pop(self):
+        """Remove the last quantity from the list and the index."""
+        quantity = self._quantities.pop()
+        self._count -= 1
+        self._last = self._quantities[-1] if self._quantities else None
+        bucket = self._bucket(quantity)
+        self._values[bucket].pop()
+        if not self._values[bucket]:
+            del self._values[bucket]
+        for name, metric in self._metrics.items():
+            self._counts[name][metric.pop()] -= 1
+        return quantity
+
+    def find(self, value):
+        """Return the quantities having `value`, in order."""
+        return [x for x in self._values.get(self._value(value), [])
+                if x[QUANTITY.VALUE] == value]
+
+    def duplicate_of(self, quantity):
+        """Return the first quantity `quantity` is a duplicate of, if any."""
+        for item in self._values.get(self._bucket(quantity), []):
+            if quantity.is_duplicate_of(item):
+                return item
+        return None
+
+    def replace_better(self, added, dates=False):
+        """Compare `added` to the indexed quantities as `replace_better` does.
+
+        Returns whether `added` is worse than them, and which of them to keep
+        (`None` to keep them all). Dates are compared by how many of year,
+        month and day they give.
+        """
+        if dates:
+            return self._replace_better_dates(added)
+        if type(self.key) != Key:
+            return False, []
+        if self.key.type == KEY_TYPES.NUMERIC:
+            return self._replace_better_numbers(added)
+        if self.key.type == KEY_TYPES.STRING:
+            return self._replace_better_strings(added)
+        return True, None
+
+    def _replace_better_dates(self, added):
+        parts = self._parts(added)
+        counts = self._count_of('parts')
+        if not any(counts[x] for x in counts if x < parts):
+            return True, None
+        metric = self._metric('parts')
+        return False, [x for i, x in enumerate(self._quantities)
+                       if metric[i] >= parts]
+
+    def _replace_better_strings(self, added):
+        rank = self._rank(added)
+        counts = self._count_of('rank')
+        ranks = [x for x in counts if counts[x] and x is not None]
+        if rank is None or not ranks:
+            return False, None
+        if rank == self.BAD_RANK or self.BAD_RANK in ranks:
+            self._raise_bad_rank()
+        isworse = not (counts[None] or max(ranks) >= rank)
+        if max(ranks) <= rank:
+            return isworse, None
+        metric = self._metric('rank')
+        return isworse, [x for i, x in enumerate(self._quantities)
+                         if metric[i] is None or metric[i] <= rank]
+
+    def _replace_better_numbers(self, added):
+        newrank = self._rank(added)
+        newerror = self._error(added)
+        newsig = self._sig(added)
+        ranks = self._metric('rank')
+        errors = self._metric('error')
+        sigs = self._metric('sig')
+        isworse = True
+        kept = []
+        for i, ct in enumerate(self._quantities):
+            addct = False
+            checke = False
+            if newrank is not None and ranks[i] is not None:
+                if self.BAD_RANK in (newrank, ranks[i]):
+                    self._raise_bad_rank()
+                if newrank > ranks[i]:
+                    addct = True
+                if newrank == ranks[i]:
+                    checke = True
+                if newrank <= ranks[i]:
+                    isworse = False
+            else:
+                checke = True
+            if checke and errors[i] is not None:
+                if newerror is not None:
+                    if newerror >= errors[i]:
+                        addct = True
+                    if newerror <= errors[i]:
+                        isworse = False
+            elif checke and newerror is not None:
+                isworse = False
+            else:
+                if sigs[i] >= newsig:
+                    addct = True
+                if newsig >= sigs[i]:
+                    isworse = False
+            if addct:
+                kept.append(ct)
+        return isworse, (None if len(kept) == self._count else kept)
+
+    def _add(self, quantity):
+        self._values.setdefault(
+            self._bucket(quantity), []).append(quantity)
+        for name, metric in self._metrics.items():
+            value = getattr(self, '_' + name)(quantity)
+            metric.append(value)
+            self._counts[name][value] += 1
+        self._count += 1
+        self._last = quantity
+
+    def _metric(self, name):
+        """Return metric `name` of each indexed quantity."""
+        if name not in self._metrics:
+            metric = [getattr(self, '_' + name)(x)
+                      for x in self._quantities[:self._count]]
+            self._metrics[name] = metric
+            self._counts[name] = Counter(metric)
+        return self._metrics[name]
+
+    def _count_of(self, name):
+        """Return how many indexed quantities have each value of `name`."""
+        self._metric(name)
+        return self._counts[name]
+
+    def _value(self, value):
+        # Values are compared as strings, so that any value can be bucketed.
+        return str(value)
+
+    def _bucket(self, quantity):
+        """Return the bucket of `quantity`, shared by its duplicates."""
+        return self._value(quantity.get(QUANTITY.VALUE))
+
+    def _parts(self, quantity):
+        return len(quantity[QUANTITY.VALUE].split('/'))
+
+    def _rank(self, quantity):
+        """Return the best rank of the kinds of `quantity` in the kind
+        preference of the key, `None` if it has no preferred kind.
+        """
+        preference = getattr(self.key, 'kind_preference', [])
+        kinds = listify(quantity.get(QUANTITY.KIND, []))
+        if not preference or set(kinds).isdisjoint(preference):
+            return None
+        if not set(kinds).issubset(preference):
+            return self.BAD_RANK
+        return min([preference.index(x) for x in kinds])
+
+    def _error(self, quantity):
+        if QUANTITY.E_VALUE not in quantity:
+            return None
+        return float(quantity[QUANTITY.E_VALUE])
+
+    def _sig(self, quantity):
+        return get_sig_digits(quantity[QUANTITY.VALUE])
+
+    def _raise_bad_rank(self):
+        raise ValueError('Quantity of `{}` has kinds both in and not in its '
+                         'kind preference.'.format(self.key))
+
+
+class PhotometryIndex(QuantityIndex):
+    """Index of a list of photometry points, for finding duplicates.
+
+    Points are bucketed by their time, band and measurement, which points
+    must share to be duplicates of each other, so that adding a point to a
+    light curve of thousands compares it with a few of them only.
+    """
+
+    BUCKET_KEYS = (PHOTOMETRY.TIME, PHOTOMETRY.BAND, PHOTOMETRY.MAGNITUDE,
+                   PHOTOMETRY.FLUX, PHOTOMETRY.FLUX_DENSITY,
+                   PHOTOMETRY.COUNT_RATE)
+
+    def _bucket(self, point):
+        return tuple(self._value(point.get(x)) for x in self.BUCKET_KEYS)
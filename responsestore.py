@@ -0,0 +1,155 @@
+"""Shared store of downloaded HTTP responses, revalidated with conditional GETs.
+
+Every response downloaded through `SupernovaCatalog.download_url` is kept in
+one store (`SupernovaCatalog.PATHS.HTTP_STORE`), whatever the task and
+whether or not it is archived in the task's repo. Bodies are stored once
+per SHA-1 of their content, and an index records for each URL which body
+it last returned along with its `ETag` and `Last-Modified` headers. These
+are sent back with the next request of the URL, so an unchanged page costs
+a `304 Not Modified` instead of a full download.
+
+If the `ASTROCATS_HTTP_REPLAY` environment variable is set, nothing is
+downloaded at all and every URL is answered from the store alone, which
+replays an import against the responses of an earlier one.
+"""
+import codecs
+import hashlib
+import json
+import os
+import threading
+import urllib.parse
+from datetime import datetime
+
+import requests
+
+__all__ = ['ResponseStore']
+
+
+class ResponseStore(object):
+    """Content-addressed store of responses, keyed by URL and POST data."""
+
+    REPLAY_ENV = 'ASTROCATS_HTTP_REPLAY'
+    USER_AGENT = ('Mozilla/5.0 (Macintosh; Intel Mac OS X '
+                  '10_10_1) AppleWebKit/537.36 (KHTML, like Gecko) '
+                  'Chrome/39.0.2171.95 Safari/537.36')
+    CODE_ERRORS = [500, 307, 404]
+
+    def __init__(self, path, replay=None):
+        """Open the store in directory `path`.
+
+        `replay` defaults to whether `REPLAY_ENV` is set.
+        """
+        self.path = path
+        self.index_path = os.path.join(path, 'index.json')
+        if replay is None:
+            replay = bool(os.environ.get(self.REPLAY_ENV))
+        self.replay = replay
+        self.index = {}
+        if os.path.isfile(self.index_path):
+            with codecs.open(self.index_path, 'r', encoding='utf8') as f:
+                self.index = json.load(f)
+        self._changed = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url, post=None):
+        """Return the index key of a request of `url` with `post` data."""
+        if not post:
+            return url
+        return url + '\n' + urllib.parse.urlencode(sorted(post.items()))
+
+    def get(self, url, post=None):
+        """Return the stored body of `url`, `None` if not stored."""
+        record = self.index.get(self.key(url, post))
+        if record is None:
+            return None
+        return self._read_body(record['sha1'])
+
+    def fetch(self, url, timeout, post=None, verify=True):
+        """Return the text of `url`, raising an exception on failure.
+
+        The stored body is revalidated if the URL has validators. In replay
+        mode it is returned without any request, `None` if there is none.
+        """
+        key = self.key(url, post)
+        record = self.index.get(key)
+        if self.replay:
+            return None if record is None else self._read_body(
+                record['sha1'])
+
+        headers = {'User-Agent': self.USER_AGENT}
+        if record is not None and not post:
+            if record.get('etag'):
+                headers['If-None-Match'] = record['etag']
+            if record.get('last_modified'):
+                headers['If-Modified-Since'] = record['last_modified']
+        session = requests.Session()
+        if post:
+            response = session.post(url, timeout=timeout, headers=headers,
+                                    data=post, verify=verify)
+        else:
+            response = session.get(url, timeout=timeout, headers=headers,
+                                   verify=verify)
+        if response.status_code == 304 and record is not None:
+            text = self._read_body(record['sha1'])
+            if text is not None:
+                return text
+            # The body has gone missing, fetch it again unconditionally.
+            headers.pop('If-None-Match', None)
+            headers.pop('If-Modified-Since', None)
+            response = session.get(url, timeout=timeout, headers=headers,
+                                   verify=verify)
+        response.raise_for_status()
+        for xx in response.history:
+            xx.raise_for_status()
+            if xx.status_code in self.CODE_ERRORS:
+                raise RuntimeError("URL response returned status code "
+                                   "'{}'".format(xx.status_code))
+        text = response.text
+        self._store(key, text, response.headers)
+        return text
+
+    def save(self):
+        """Write the index, if anything was added to it."""
+        with self._lock:
+            if not self._changed:
+                return
+            index = json.dumps(self.index, indent='\t',
+                               separators=(',', ':'), ensure_ascii=False)
+            self._changed = False
+        tmp_path = self.index_path + '.tmp'
+        with codecs.open(tmp_path, 'w', encoding='utf8') as f:
+            f.write(index)
+        os.replace(tmp_path, self.index_path)
+
+    def _body_path(self, sha1):
+        return os.path.join(self.path, 'bodies', sha1[:2], sha1)
+
+    def _read_body(self, sha1):
+        path = self._body_path(sha1)
+        if not os.path.isfile(path):
+            return None
+        with codecs.open(path, 'r', encoding='utf8') as f:
+            return f.read()
+
+    def _store(self, key, text, headers):
+        body = text.encode('utf8')
+        sha1 = hashlib.sha1(body).hexdigest()
+        path = self._body_path(sha1)
+        if not os.path.isfile(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = '{}.{}.tmp'.format(path, threading.get_ident())
+            with open(tmp_path, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+        record = {
+            'sha1': sha1,
+            'fetched': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+        if headers.get('ETag'):
+            record['etag'] = headers['ETag']
+        if headers.get('Last-Modified'):
+            record['last_modified'] = headers['Last-Modified']
+        with self._lock:
+            self.index[key] = record
+            self._changed = True
@@ -0,0 +1,156 @@
+"""Columnar, memory-mappable copy of `catalog.min.json` for scripts.
+
+`catalog.min.json` is several megabytes of nested JSON that scripts used to
+load whole and then scan entry by entry. `CatalogMin` converts it once into
+a directory of NumPy `.npy` files next to it (`catalog.min/`), one per
+column, which are memory-mapped on load. The conversion is redone whenever
+the JSON file changes. It can also be run on its own after the web catalog
+has been written,
+
+    python -m astrocats.supernovae.scripts.catalogmin [path/to/catalog.min.json]
+
+Columns holding the first value of a quantity are stored as strings (empty
+if missing) and, for numeric quantities, also as floats with `_float`
+appended to the name (`NaN` if missing or not a number). Quantities that
+can hold several values (`alias`, `claimedtype`) are stored as all their
+values in one array, plus an array of offsets of each row into it.
+"""
+import json
+import os
+import sys
+
+import numpy as np
+
+from astrocats.catalog.utils import is_number
+from astrocats.supernovae.extinction import parse_coords
+
+__all__ = ['CatalogMin']
+
+
+class CatalogMin(object):
+    """Columns of `catalog.min.json`, with a name -> row index.
+
+    Example: rows of type Ia with a known host offset,
+
+        meta = CatalogMin()
+        rows = meta.rows_with('claimedtype', 'Ia')
+        offsets = meta['hostoffsetdist_float'][rows]
+        offsets = offsets[~np.isnan(offsets)]
+    """
+
+    PATH = 'astrocats/supernovae/output/catalog.min.json'
+    VERSION = 1
+
+    FIRST_VALUE_KEYS = ['ra', 'dec', 'discoverdate', 'maxdate', 'host',
+                        'redshift', 'maxappmag', 'maxabsmag', 'lumdist',
+                        'hostoffsetang', 'hostoffsetdist', 'ebv']
+    NUMERIC_KEYS = ['redshift', 'maxappmag', 'maxabsmag', 'lumdist',
+                    'hostoffsetang', 'hostoffsetdist', 'ebv']
+    LIST_KEYS = ['alias', 'claimedtype']
+
+    def __init__(self, path=None):
+        """Load the columns for `path`, converting it first if needed."""
+        self.path = path or self.PATH
+        self.column_dir = os.path.splitext(self.path)[0]
+        if not self._is_current():
+            self.build()
+        with open(os.path.join(self.column_dir, 'columns.json'), 'r') as f:
+            self._info = json.load(f)
+        self._columns = {}
+        for column in self._info['columns']:
+            self._columns[column] = np.load(
+                os.path.join(self.column_dir, column + '.npy'),
+                mmap_mode='r')
+        names = self._columns['name'].tolist()
+        self.index = dict(zip(reversed(names),
+                              reversed(range(len(names)))))
+
+    def __len__(self):
+        """Return the number of entries."""
+        return self._info['rows']
+
+    def __getitem__(self, column):
+        """Return a column as a (memory-mapped) array."""
+        return self._columns[column]
+
+    def columns(self):
+        """Return the names of all the columns."""
+        return list(self._info['columns'])
+
+    def row(self, name):
+        """Return the (first) row of entry `name`, `None` if not present."""
+        return self.index.get(name)
+
+    def values(self, key, row):
+        """Return the list of values of list quantity `key` in `row`."""
+        offsets = self._columns[key + '_offsets']
+        return self._columns[key][offsets[row]:offsets[row + 1]].tolist()
+
+    def value_rows(self, key):
+        """Return the row of each element of the values of `key`."""
+        offsets = self._columns[key + '_offsets']
+        return np.repeat(np.arange(len(self)), np.diff(offsets))
+
+    def rows_with(self, key, value):
+        """Return a boolean mask of rows with `value` among values of `key`."""
+        mask = np.zeros(len(self), dtype=bool)
+        mask[self.value_rows(key)[self._columns[key] == value]] = True
+        return mask
+
+    def _is_current(self):
+        path = os.path.join(self.column_dir, 'columns.json')
+        if not os.path.isfile(path):
+            return False
+        with open(path, 'r') as f:
+            info = json.load(f)
+        stat = os.stat(self.path)
+        return (info.get('version') == self.VERSION and
+                info.get('source_mtime') == stat.st_mtime and
+                info.get('source_size') == stat.st_size)
+
+    def build(self):
+        """Convert the JSON file into columns."""
+        stat = os.stat(self.path)
+        with open(self.path, 'r') as f:
+            meta = json.load(f)
+
+        columns = {}
+        columns['name'] = [x.get('name', '') for x in meta]
+        for key in self.FIRST_VALUE_KEYS:
+            columns[key] = [x[key][0]['value'] if x.get(key) else ''
+                            for x in meta]
+        for key in self.NUMERIC_KEYS:
+            columns[key + '_float'] = np.array(
+                [float(x) if x and is_number(x) else np.nan
+                 for x in columns[key]])
+        coords, good = parse_coords(columns['ra'], columns['dec'])
+        good &= np.array([bool(x) for x in columns['ra']], dtype=bool)
+        good &= np.array([bool(x) for x in columns['dec']], dtype=bool)
+        columns['ra_deg'] = np.where(good, coords.ra.deg, np.nan)
+        columns['dec_deg'] = np.where(good, coords.dec.deg, np.nan)
+        for key in self.LIST_KEYS:
+            values = [[y['value'] for y in x.get(key) or []] for x in meta]
+            columns[key] = [y for x in values for y in x]
+            columns[key + '_offsets'] = np.cumsum(
+                [0] + [len(x) for x in values], dtype=np.int64)
+
+        if not os.path.isdir(self.column_dir):
+            os.makedirs(self.column_dir)
+        for column in columns:
+            data = columns[column]
+            if isinstance(data, list):
+                data = np.array(data, dtype=str)
+            np.save(os.path.join(self.column_dir, column + '.npy'), data)
+        # Written last, so that an interrupted build is redone.
+        info = {'version': self.VERSION, 'rows': len(meta),
+                'columns': sorted(columns), 'source_mtime': stat.st_mtime,
+                'source_size': stat.st_size}
+        with open(os.path.join(self.column_dir, 'columns.json'), 'w') as f:
+            json.dump(info, f)
+
+
+if __name__ == '__main__':
+    meta = CatalogMin(sys.argv[1] if len(sys.argv) > 1 else None)
+    meta.build()
+    print('Wrote {} columns of {} entries to {}.'.format(
+        len(meta.columns()), len(meta), meta.column_dir))
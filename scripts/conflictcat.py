@@ -1,4 +1,3 @@
-import gzip
 import json
 import os
 import warnings
@@ -9,7 +8,7 @@ from astropy.coordinates import SkyCoord as coord
 from tqdm import tqdm
 
 from astrocats.catalog.utils import round_sig
-from astrocats.supernovae.scripts.repos import repo_file_list
+from astrocats.supernovae.scripts.scanner import CatalogScanner
 
 from ...catalog.utils import get_entry_filename
 
@@ -17,22 +16,8 @@ conflicts = []
 
 outdir = "astrocats/supernovae/output/"
 
-files = repo_file_list(bones=False)
 
-for fcnt, eventfile in enumerate(tqdm(sorted(files, key=lambda s: s.lower()))):
-    # if fcnt > 100:
-    #    break
-    fileeventname = os.path.splitext(os.path.basename(eventfile))[
-        0].replace('.json', '')
-
-    if eventfile.split('.')[-1] == 'gz':
-        with gzip.open(eventfile, 'rt') as f:
-            filetext = f.read()
-    else:
-        with open(eventfile, 'r') as f:
-            filetext = f.read()
-
-    item = json.loads(filetext, object_pairs_hook=OrderedDict)
+def extract(eventfile, item):
     item = item[list(item.keys())[0]]
 
     ras = []
@@ -44,7 +29,6 @@ for fcnt, eventfile in enumerate(tqdm(sorted(files, key=lambda s: s.lower()))):
     zsources = []
     ctsources = []
     for key in list(item.keys()):
-        lc = 0
         if key in ['name', 'sources', 'photometry', 'spectra']:
             continue
         if len(item[key]) == 1:
@@ -106,9 +90,13 @@ for fcnt, eventfile in enumerate(tqdm(sorted(files, key=lambda s: s.lower()))):
                     ctsources.append({'idtype': ','.join(
                         [x['idtype'] for x in newsources]), 'id': ','.join([x['id'] for x in newsources])})
 
+    conflicts = []
+
     edit = True if os.path.isfile(
         '../sne-internal/' + get_entry_filename(item['name']) + '.json') else False
 
+    ialias = item.get('alias', item['name'])
+
     if ras and decs and item['name'] and item['name'] not in ['SN2002fz']:
         oralen = len(ras)
         odeclen = len(decs)
@@ -130,7 +118,6 @@ for fcnt, eventfile in enumerate(tqdm(sorted(files, key=lambda s: s.lower()))):
         ras = ras[:oralen]
         decs = decs[:odeclen]
 
-        ialias = item.get('alias', item['name'])
         if len(ras) != len(radegs):
             tqdm.write('Mangled R.A. for ' + item['name'])
             conflicts.append(OrderedDict([('name', item['name']), ('alias', ialias), ('edit', edit),
@@ -177,8 +164,26 @@ for fcnt, eventfile in enumerate(tqdm(sorted(files, key=lambda s: s.lower()))):
             conflicts.append(OrderedDict([('name', item['name']), ('alias', ialias), ('edit', edit),
                                           ('quantity', 'claimedtype'), ('difference', ''), ('values', cts), ('sources', ctsources)]))
 
-# Convert to array since that's what datatables expects
-jsonstring = json.dumps(conflicts, indent='\t',
-                        separators=(',', ':'), ensure_ascii=False)
-with open(outdir + 'conflicts.json', 'w') as f:
-    f.write(jsonstring)
+    return conflicts
+
+
+def consume(eventfile, newconflicts):
+    conflicts.extend(newconflicts)
+
+
+def finish():
+    # Convert to array since that's what datatables expects
+    jsonstring = json.dumps(conflicts, indent='\t',
+                            separators=(',', ':'), ensure_ascii=False)
+    with open(outdir + 'conflicts.json', 'w') as f:
+        f.write(jsonstring)
+
+
+def register(scanner):
+    scanner.register(extract, consume, finish)
+
+
+if __name__ == '__main__':
+    scanner = CatalogScanner()
+    register(scanner)
+    scanner.run()
@@ -1,35 +1,12 @@
-
-import gzip
-import json
-import os
-from collections import OrderedDict
-
 from tqdm import tqdm
 
-from repos import repo_file_list
-
-files = repo_file_list(bones=False)
+from astrocats.supernovae.scripts.scanner import CatalogScanner
 
-spectracount = 0
-photocount = 0
-eventswithspectra = 0
-eventswithphoto = 0
+counts = {'events': 0, 'spectra': 0, 'photo': 0, 'eventswithspectra': 0,
+          'eventswithphoto': 0}
 
-for fcnt, eventfile in enumerate(tqdm(sorted(files, key=lambda s: s.lower()))):
-    # if fcnt > 100:
-    #    break
-    fileeventname = os.path.splitext(os.path.basename(eventfile))[
-        0].replace('.json', '')
 
-    if os.path.isfile(eventfile):
-        if eventfile.split('.')[-1] == 'gz':
-            with gzip.open(eventfile, 'rt') as f:
-                filetext = f.read()
-        else:
-            with open(eventfile, 'r') as f:
-                filetext = f.read()
-
-    item = json.loads(filetext, object_pairs_hook=OrderedDict)
+def extract(eventfile, item):
     namekey = list(item.keys())[0]
     item = item[namekey]
 
@@ -37,16 +14,34 @@ for fcnt, eventfile in enumerate(tqdm(sorted(files, key=lambda s: s.lower()))):
         tqdm.write(
             namekey + ' has different name from its key ' + item['name'])
 
-    if 'spectra' in item:
-        eventswithspectra += 1
-        spectracount += len(item['spectra'])
+    return (len(item['spectra']) if 'spectra' in item else None,
+            len(item['photometry']) if 'photometry' in item else None)
+
+
+def consume(eventfile, result):
+    spectracount, photocount = result
+    counts['events'] += 1
+    if spectracount is not None:
+        counts['eventswithspectra'] += 1
+        counts['spectra'] += spectracount
+    if photocount is not None:
+        counts['eventswithphoto'] += 1
+        counts['photo'] += photocount
+
+
+def finish():
+    print('Event count: ' + str(counts['events']))
+    print('Events with spectra: ' + str(counts['eventswithspectra']))
+    print('Events with photometry: ' + str(counts['eventswithphoto']))
+    print('Total spectra: ' + str(counts['spectra']))
+    print('Total photometry: ' + str(counts['photo']))
+
+
+def register(scanner):
+    scanner.register(extract, consume, finish)
 
-    if 'photometry' in item:
-        eventswithphoto += 1
-        photocount += len(item['photometry'])
 
-print('Event count: ' + str(len(files)))
-print('Events with spectra: ' + str(eventswithspectra))
-print('Events with photometry: ' + str(eventswithphoto))
-print('Total spectra: ' + str(spectracount))
-print('Total photometry: ' + str(photocount))
+if __name__ == '__main__':
+    scanner = CatalogScanner()
+    register(scanner)
+    scanner.run()
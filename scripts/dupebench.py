@@ -0,0 +1,107 @@
+"""Benchmark the duplicate search of `dupecat.py` on synthetic catalogs.
+
+Times `find_dupes` for catalogs of 10k, 50k and 100k entries (or the sizes
+given on the command line).  For catalogs of up to `--brute-max` entries the
+original all-pairs separation scan is also timed, and the two are checked to
+produce identical `dupes.json` output.
+
+    python -m astrocats.supernovae.scripts.dupebench [-b 10000] [N ...]
+"""
+import argparse
+import io
+import json
+import time
+from collections import OrderedDict
+from contextlib import redirect_stdout
+
+import numpy as np
+from astropy import units as un
+from astropy.coordinates import SkyCoord as coord
+
+from astrocats.supernovae.scripts.dupes import close_pairs, find_dupes
+
+
+def synthetic_catalog(size, seed=0):
+    """Return a random catalog in the format built by `dupecat.py`.
+
+    About 5% of the entries are placed within a few arcseconds of another,
+    and some of those are marked as distinct from each other.
+    """
+    rng = np.random.RandomState(seed)
+    ra = rng.uniform(0., 360., size)
+    dec = np.degrees(np.arcsin(rng.uniform(-1., 1., size)))
+    ndupe = size // 20
+    orig = rng.randint(0, size - ndupe, ndupe)
+    dupe = np.arange(size - ndupe, size)
+    ra[dupe] = ra[orig] + rng.normal(0., 3., ndupe) / 3600. / np.maximum(
+        np.cos(np.radians(dec[orig])), 0.01)
+    dec[dupe] = np.clip(dec[orig] + rng.normal(0., 3., ndupe) / 3600.,
+                        -90., 90.)
+    coo = coord(ra % 360., dec, unit=(un.deg, un.deg))
+    ras = coo.ra.to_string(unit=un.hourangle, sep=':', precision=2, pad=True)
+    decs = coo.dec.to_string(sep=':', precision=1, alwayssign=True, pad=True)
+
+    catalog = []
+    for i in range(size):
+        item = OrderedDict()
+        if rng.rand() < 0.8:
+            item['discyear'] = 1990. + 30. * rng.rand()
+        if rng.rand() < 0.5:
+            item['maxyear'] = item.get('discyear', 2000.) + 0.1 * rng.rand()
+        item['name'] = ('SN' if rng.rand() < 0.5 else 'PSN') + str(i)
+        item['alias'] = [item['name']]
+        item['ra'] = ras[i]
+        item['dec'] = decs[i]
+        item['raerr'] = float(rng.choice([0., 0.5, 30.]))
+        item['decerr'] = float(rng.choice([0., 0.5, 30.]))
+        catalog.append(item)
+    for i, j in zip(dupe[::10], orig[::10]):
+        catalog[i]['distinctfrom'] = [catalog[j]['name']]
+    return catalog
+
+
+def brute_force_pairs(catalog, coo):
+    """Return the close pairs found by the original all-pairs scan."""
+    poserrs = np.array([np.hypot(x['raerr'], x['decerr']) for x in catalog])
+    pairs = OrderedDict()
+    for i1 in range(len(catalog)):
+        distdegs = coo[i1 + 1:].separation(coo[i1]).arcsecond
+        close = np.flatnonzero(
+            distdegs < 10. + (poserrs[i1] + poserrs[i1 + 1:]) / 3600.)
+        for i2 in close:
+            pairs[(i1, i1 + 1 + int(i2))] = distdegs[i2]
+    return pairs
+
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+parser.add_argument('sizes', nargs='*', type=int,
+                    default=[10000, 50000, 100000])
+parser.add_argument('-b', '--brute-max', type=int, default=10000,
+                    help='Largest catalog to also run the all-pairs scan on.')
+args = parser.parse_args()
+
+print('{:>8} {:>8} {:>12} {:>12}'.format(
+    'entries', 'dupes', 'indexed [s]', 'all-pairs [s]'))
+for size in args.sizes:
+    catalog = synthetic_catalog(size)
+    coo = coord([x['ra'] for x in catalog], [x['dec'] for x in catalog],
+                unit=(un.hourangle, un.deg))
+
+    # Keep the match messages of `find_dupes` out of the table.
+    with redirect_stdout(io.StringIO()):
+        start = time.time()
+        dupes = find_dupes(catalog, coo)
+        indexed = time.time() - start
+
+        brute = float('nan')
+        if size <= args.brute_max:
+            start = time.time()
+            pairs = brute_force_pairs(catalog, coo)
+            brute_dupes = find_dupes(catalog, coo, pairs)
+            brute = time.time() - start
+            if (pairs != close_pairs(catalog, coo) or
+                    json.dumps(brute_dupes) != json.dumps(dupes)):
+                raise RuntimeError('Indexed and all-pairs searches differ!')
+
+    print('{:>8} {:>8} {:>12.2f} {:>12.2f}'.format(
+        size, len(dupes), indexed, brute))
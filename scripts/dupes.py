@@ -0,0 +1,201 @@
+"""Find likely duplicate entries by their positions and dates.
+
+Used by `dupecat.py`. Rather than computing the separation between every
+pair of entries, candidate pairs come from a spatial index
+(`search_around_sky`). Only pairs that could pass the match radius are
+considered, plus pairs where one entry lists the other as distinct.
+"""
+import math
+import os
+from collections import OrderedDict
+
+import numpy as np
+from astropy import units as un
+from astropy.coordinates import search_around_sky
+from tqdm import tqdm
+
+from ...catalog.utils import get_entry_filename
+
+# Matching radius in arcseconds, to which positional errors are added.
+MATCH_RADIUS = 10.
+
+
+def match_radius(item1, item2):
+    """Return the radius (in arcseconds) within which two entries match."""
+    poserr1 = math.hypot(item1['raerr'], item1['decerr'])
+    poserr2 = math.hypot(item2['raerr'], item2['decerr'])
+    return MATCH_RADIUS + (poserr1 + poserr2) / 3600.
+
+
+def close_pairs(catalog, coo):
+    """Return a dict of `(i1, i2)` -> separation in arcseconds.
+
+    Includes every pair (with `i1 < i2`) closer than their `match_radius`.
+    Separations are computed the same way as the brute force
+    `coo[i1 + 1:].separation(coo[i1])`, so they are identical to it.
+    """
+    poserrs = np.array([math.hypot(x['raerr'], x['decerr'])
+                        for x in catalog])
+    maxerr = np.nanmax(poserrs) if len(poserrs) else 0.
+    if not np.isfinite(maxerr):
+        maxerr = 0.
+    # Slightly enlarge the search to not lose pairs right at the limit to
+    # round-off, these are cut with the exact radius below.
+    seplimit = (MATCH_RADIUS + 2. * maxerr / 3600.) * 1.001 + 1.e-3
+    idx1, idx2, _, _ = search_around_sky(coo, coo, seplimit * un.arcsec)
+    upper = idx1 < idx2
+    idx1, idx2 = idx1[upper], idx2[upper]
+    order = np.lexsort((idx2, idx1))
+    idx1, idx2 = idx1[order], idx2[order]
+    if not len(idx1):
+        return OrderedDict()
+    distdegs = coo[idx2].separation(coo[idx1]).arcsecond
+
+    pairs = OrderedDict()
+    for i1, i2, distdeg in zip(idx1, idx2, distdegs):
+        i1, i2 = int(i1), int(i2)
+        if distdeg < match_radius(catalog[i1], catalog[i2]):
+            pairs[(i1, i2)] = distdeg
+    return pairs
+
+
+def distinct_pairs(catalog):
+    """Return the set of `(i1, i2)` pairs where one is distinct from other."""
+    owners = {}
+    for i, item in enumerate(catalog):
+        for alias in item['alias']:
+            owners.setdefault(alias, []).append(i)
+    pairs = set()
+    for i, item in enumerate(catalog):
+        for name in item.get('distinctfrom', []):
+            for j in owners.get(name, []):
+                if i != j:
+                    pairs.add((min(i, j), max(i, j)))
+    return pairs
+
+
+def find_dupes(catalog, coo, pairs=None):
+    """Return the list of likely duplicates among `catalog`.
+
+    `catalog` is a list of the dicts built by `dupecat.py` and `coo` their
+    coordinates.  `pairs`, a dict of `(i1, i2)` -> separation, defaults to
+    the result of `close_pairs`.
+    """
+    if pairs is None:
+        pairs = close_pairs(catalog, coo)
+    candidates = {}
+    for i1, i2 in set(pairs).union(distinct_pairs(catalog)):
+        candidates.setdefault(i1, []).append(i2)
+
+    dupes = []
+    for i1 in tqdm(sorted(candidates)):
+        item1 = catalog[i1]
+        # Not reset for each pair, a swapped `name1` carries over to the
+        # following pairs, as it always has.
+        name1 = item1['name']
+
+        maxyear1 = None
+        if 'maxyear' in item1 and item1['maxyear']:
+            maxyear1 = item1['maxyear']
+        discyear1 = None
+        if 'discyear' in item1 and item1['discyear']:
+            discyear1 = item1['discyear']
+
+        for i2 in sorted(candidates[i1]):
+            item2 = catalog[i2]
+            name2 = item2['name']
+
+            aliases1 = item1['alias']
+            aliases2 = item2['alias']
+
+            distinctfrom1 = item1[
+                'distinctfrom'] if 'distinctfrom' in item1 else []
+            distinctfrom2 = item2[
+                'distinctfrom'] if 'distinctfrom' in item2 else []
+
+            if (len(set(aliases1).intersection(distinctfrom2))):
+                tqdm.write('Found ' + name2 +
+                           ' in distinct from list of ' + name1 + '.')
+                continue
+            if (len(set(aliases2).intersection(distinctfrom1))):
+                tqdm.write('Found ' + name1 +
+                           ' in distinct from list of ' + name2 + '.')
+                continue
+
+            if (i1, i2) not in pairs:
+                continue
+
+            maxyear2 = None
+            if 'maxyear' in item2 and item2['maxyear']:
+                maxyear2 = item2['maxyear']
+            discyear2 = None
+            if 'discyear' in item2 and item2['discyear']:
+                discyear2 = item2['discyear']
+
+            ra1 = item1['ra']
+            ra2 = item2['ra']
+            dec1 = item1['dec']
+            dec2 = item2['dec']
+
+            maxdiffyear = ''
+            discdiffyear = ''
+
+            distdeg = pairs[(i1, i2)]
+            exactstr = ('exact' if distdeg == 0.0 else 'a close')
+
+            if (maxyear1 and maxyear2) or (discyear1 and discyear2):
+                if maxyear1 and maxyear2:
+                    maxdiffyear = abs(maxyear1 - maxyear2)
+                if discyear1 and discyear2:
+                    discdiffyear = abs(discyear1 - discyear2)
+
+                if maxdiffyear and maxdiffyear <= 2.0:
+                    tqdm.write(name1 + ' has ' + exactstr +
+                               ' coordinate and maximum date match to ' +
+                               name2 + " [" + str(distdeg) + ', ' +
+                               str(maxdiffyear) + ']')
+                elif discdiffyear and discdiffyear <= 2.0:
+                    tqdm.write(name1 + ' has ' + exactstr +
+                               ' coordinate and discovery date match to ' +
+                               name2 + " [" + str(distdeg) + ', ' +
+                               str(discdiffyear) + ']')
+                else:
+                    tqdm.write(
+                        name1 + ' has ' + exactstr +
+                        ' coordinate, but significantly different ' +
+                        'date, to ' + name2 + " [Deg. diff: " +
+                        str(distdeg) +
+                        ((', Max. diff: ' + str(maxdiffyear)) if
+                         maxdiffyear else '') +
+                        ((', Disc. diff: ' + str(discdiffyear)) if
+                         discdiffyear else '') + ']')
+            else:
+                tqdm.write(name1 + ' has ' + exactstr +
+                           ' coordinate match to ' + name2 + " [" +
+                           str(distdeg) + "]")
+            if (not name1.startswith(('SN', 'AT')) and
+                name2.startswith(('SN', 'AT')) or
+                (discyear1 and discyear2 and discyear2 < discyear1 and
+                 not name1.startswith(('SN', 'AT'))) or
+                    (maxyear1 and maxyear2 and maxyear2 < maxyear1 and
+                     not name1.startswith(('SN', 'AT')))):
+                name1, name2 = name2, name1
+                aliases1, aliases2 = aliases2, aliases1
+                ra1, ra2 = ra2, ra1
+                dec1, dec2 = dec2, dec1
+
+            edit = True if os.path.isfile(
+                '../sne-internal/' + get_entry_filename(name1) +
+                '.json') else False
+
+            dupes.append(OrderedDict([('name1', name1),
+                                      ('aliases1', aliases1),
+                                      ('name2', name2),
+                                      ('aliases2', aliases2), ('ra1', ra1),
+                                      ('dec1', dec1),
+                                      ('ra2', ra2), ('dec2', dec2),
+                                      ('distdeg', str(distdeg)),
+                                      ('maxdiffyear', str(maxdiffyear)),
+                                      ('discdiffyear', str(discdiffyear)),
+                                      ('edit', edit)]))
+    return dupes
@@ -0,0 +1,272 @@
+"""Benchmark the `Supernova` entry hot paths on synthetic entries.
+
+Micro benchmarks time single methods (`add_quantity` on new entries and on
+entries loaded from JSON, `_clean_quantity`, `sanitize`, `set_preferred_name`,
+`set_first_max_light`, and `add_spectrum` from lists of strings or from
+arrays) on entries with 10 to 10^5 photometric or spectral points, macro
+benchmarks time building a catalog of `--size` entries and running all of
+`do_cleanup` on them. Entries come from `synthetic.py` and everything runs
+offline. Each benchmark is run `--repeat` times and the fastest run
+reported; setting up the entries is never timed. Benchmarks also check that
+loaded entries keep their values, failing if they do not.
+
+Times can be saved as a baseline and later runs compared against it, the
+script exiting with status 1 if any benchmark got slower by more than
+`--threshold`,
+
+    python -m astrocats.supernovae.scripts.entrybench --save
+    python -m astrocats.supernovae.scripts.entrybench --compare [NAME ...]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from functools import partial
+
+import numpy as np
+
+from astrocats.catalog.quantity import QUANTITY
+from astrocats.supernovae.scripts.synthetic import (SyntheticCatalog,
+                                                    populate, synthetic_entry)
+from astrocats.supernovae.supernova import SUPERNOVA
+from astrocats.supernovae.tasks.cleanup import do_cleanup
+
+BASELINE = 'astrocats/supernovae/output/perf/entrybench.json'
+SIZES = [10, 100, 1000, 10000, 100000]
+
+
+def _entries(catalog, count, seed, **kwargs):
+    """Return `count` new synthetic entries, without photometry by default.
+    """
+    rng = np.random.RandomState(seed)
+    kwargs.setdefault('nphoto', 0)
+    kwargs.setdefault('nspec', 0)
+    return [catalog.entries[synthetic_entry(catalog, rng, i, **kwargs)]
+            for i in range(count)]
+
+
+def bench_add_quantity(args, catalog):
+    """Add 2000 aliases, redshifts and types, half of them duplicates."""
+    entry = _entries(catalog, 1, args.seed)[0]
+    rng = np.random.RandomState(args.seed)
+    sources = [entry.add_source(bibcode='2000ApJ...{:03d}..100A'.format(i))
+               for i in range(20)]
+    calls = []
+    for i in range(2000):
+        value = rng.randint(1000)
+        source = sources[rng.randint(len(sources))]
+        if i % 3 == 0:
+            calls.append((SUPERNOVA.ALIAS, 'PS1-{}'.format(value), source,
+                          {}))
+        elif i % 3 == 1:
+            calls.append((SUPERNOVA.REDSHIFT, '0.{:04d}'.format(value),
+                          source, {'kind': 'heliocentric'}))
+        else:
+            calls.append((SUPERNOVA.CLAIMED_TYPE, 'Ia' if value % 2 else
+                          'II P', source, {}))
+    start = time.perf_counter()
+    for key, value, source, kwargs in calls:
+        entry.add_quantity(key, value, source, **kwargs)
+    return time.perf_counter() - start
+
+
+def bench_add_quantity_loaded(args, catalog):
+    """Add a claimed type to 500 entries loaded back from their JSON files.
+
+    Adding a value must keep those the entry was loaded with; the benchmark
+    fails if it does not.
+    """
+    paths = [x.save() for x in _entries(catalog, 500, args.seed)]
+    entries = [catalog.proto.init_from_file(catalog, path=x) for x in paths]
+    loaded = [[y[QUANTITY.VALUE] for y in x.get(SUPERNOVA.CLAIMED_TYPE, [])]
+              for x in entries]
+    start = time.perf_counter()
+    for entry in entries:
+        entry.add_quantity(SUPERNOVA.CLAIMED_TYPE, 'Ia-02cx',
+                           entry.add_self_source())
+    elapsed = time.perf_counter() - start
+    for entry, values in zip(entries, loaded):
+        kept = [x[QUANTITY.VALUE] for x in entry[SUPERNOVA.CLAIMED_TYPE]]
+        if not set(values).issubset(kept):
+            raise RuntimeError('{}: adding a claimed type to {} lost {}.'
+                               .format(entry[SUPERNOVA.NAME], values,
+                                       sorted(set(values) - set(kept))))
+    return elapsed
+
+
+def bench_clean_quantity(args, catalog):
+    """Clean every quantity of 500 entries again."""
+    quantities = []
+    for entry in _entries(catalog, 500, args.seed):
+        for key in entry:
+            if key in (SUPERNOVA.NAME, SUPERNOVA.SCHEMA, SUPERNOVA.SOURCES):
+                continue
+            quantities.extend((entry, x) for x in entry[key])
+    start = time.perf_counter()
+    for entry, quantity in quantities:
+        entry._clean_quantity(quantity)
+    return time.perf_counter() - start
+
+
+def bench_sanitize(args, catalog):
+    """Sanitize 200 entries with photometry and spectra."""
+    entries = _entries(catalog, 200, args.seed, nphoto=None, nspec=None)
+    start = time.perf_counter()
+    for entry in entries:
+        entry.sanitize()
+    return time.perf_counter() - start
+
+
+def bench_set_preferred_name(args, catalog):
+    """Set the preferred name of 1000 entries."""
+    entries = _entries(catalog, 1000, args.seed)
+    start = time.perf_counter()
+    for entry in entries:
+        entry.set_preferred_name()
+    return time.perf_counter() - start
+
+
+def bench_set_first_max_light(size, args, catalog):
+    """Derive the first and maximum light of an entry of `size` points."""
+    entry = _entries(catalog, 1, args.seed, nphoto=size)[0]
+    start = time.perf_counter()
+    entry.set_first_max_light()
+    return time.perf_counter() - start
+
+
+def bench_add_spectrum(size, args, catalog):
+    """Add 10 spectra of `size` points each to an entry."""
+    entry = _entries(catalog, 1, args.seed)[0]
+    source = entry.add_source(bibcode='2000ApJ...001..100A')
+    wavelengths = ['{:.2f}'.format(x) for x in np.linspace(3e3, 1e4, size)]
+    fluxes = ['{:.4e}'.format(x) for x in
+              1e-15 * (1. + np.random.RandomState(args.seed).rand(size))]
+    start = time.perf_counter()
+    for i in range(10):
+        entry.add_spectrum(
+            u_wavelengths='Angstrom', u_fluxes='erg/s/cm^2/Angstrom',
+            u_time='MJD', time=str(55000 + i), wavelengths=wavelengths,
+            fluxes=fluxes, source=source)
+    return time.perf_counter() - start
+
+
+def bench_add_spectrum_arrays(size, args, catalog):
+    """Add 10 spectra of `size` points each to an entry, as arrays."""
+    entry = _entries(catalog, 1, args.seed)[0]
+    source = entry.add_source(bibcode='2000ApJ...001..100A')
+    wavelengths = np.linspace(3e3, 1e4, size)
+    fluxes = 1e-15 * (1. + np.random.RandomState(args.seed).rand(size))
+    start = time.perf_counter()
+    for i in range(10):
+        entry.add_spectrum(
+            u_wavelengths='Angstrom', u_fluxes='erg/s/cm^2/Angstrom',
+            u_time='MJD', time=str(55000 + i), wavelengths=wavelengths,
+            fluxes=fluxes, formats=['{:.2f}', '{:.4e}'], source=source)
+    return time.perf_counter() - start
+
+
+def bench_populate(args, catalog):
+    """Build and journal a catalog of `--size` synthetic entries."""
+    start = time.perf_counter()
+    populate(catalog, args.size, seed=args.seed)
+    catalog.journal_entries()
+    return time.perf_counter() - start
+
+
+def bench_cleanup(args, catalog):
+    """Run `do_cleanup` on a journaled catalog of `--size` entries."""
+    populate(catalog, args.size, seed=args.seed)
+    catalog.journal_entries()
+    start = time.perf_counter()
+    do_cleanup(catalog)
+    return time.perf_counter() - start
+
+
+BENCHMARKS = OrderedDict([
+    ('add_quantity', bench_add_quantity),
+    ('add_quantity_loaded', bench_add_quantity_loaded),
+    ('clean_quantity', bench_clean_quantity),
+    ('sanitize', bench_sanitize),
+    ('set_preferred_name', bench_set_preferred_name)
+])
+for size in SIZES:
+    BENCHMARKS['set_first_max_light[{}]'.format(size)] = partial(
+        bench_set_first_max_light, size)
+for size in SIZES:
+    BENCHMARKS['add_spectrum[{}]'.format(size)] = partial(
+        bench_add_spectrum, size)
+for size in SIZES:
+    BENCHMARKS['add_spectrum_arrays[{}]'.format(size)] = partial(
+        bench_add_spectrum_arrays, size)
+BENCHMARKS['populate'] = bench_populate
+BENCHMARKS['cleanup'] = bench_cleanup
+
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+parser.add_argument('names', nargs='*',
+                    help='Benchmarks to run (default all), a name matches '
+                    'all benchmarks starting with it.')
+parser.add_argument('-n', '--size', type=int, default=10000,
+                    help='Number of entries of the macro benchmarks.')
+parser.add_argument('-r', '--repeat', type=int, default=3)
+parser.add_argument('-s', '--seed', type=int, default=0)
+parser.add_argument('--save', nargs='?', const=BASELINE,
+                    help='Save the times as a baseline.')
+parser.add_argument('--compare', nargs='?', const=BASELINE,
+                    help='Compare the times to a saved baseline.')
+parser.add_argument('-t', '--threshold', type=float, default=0.25,
+                    help='Fractional slowdown considered a regression.')
+args = parser.parse_args()
+
+names = [x for x in BENCHMARKS
+         if not args.names or any(x.startswith(y) for y in args.names)]
+baseline = {}
+if args.compare:
+    with open(args.compare, 'r') as f:
+        baseline = json.load(f)
+    if baseline.get('size') != args.size or baseline.get('seed') != args.seed:
+        print('Warning: baseline was run with --size {} --seed {}.'.format(
+            baseline.get('size'), baseline.get('seed')))
+    baseline = baseline['times']
+
+times = OrderedDict()
+regressed = []
+print('{:<28} {:>10} {:>10} {:>7}'.format(
+    'benchmark', 'time [s]', 'baseline', 'ratio'))
+for name in names:
+    best = float('inf')
+    for i in range(args.repeat):
+        catalog = SyntheticCatalog()
+        try:
+            best = min(best, BENCHMARKS[name](args, catalog))
+        finally:
+            catalog.close()
+    times[name] = best
+    line = '{:<28} {:>10.4f}'.format(name, best)
+    if name in baseline:
+        ratio = best / baseline[name]
+        line += ' {:>10.4f} {:>7.2f}'.format(baseline[name], ratio)
+        if ratio > 1. + args.threshold:
+            regressed.append(name)
+            line += ' !'
+    print(line)
+
+if args.save:
+    saved = {'size': args.size, 'seed': args.seed, 'times': times}
+    if os.path.isfile(args.save):
+        # Keep the times of benchmarks that were not run this time.
+        with open(args.save, 'r') as f:
+            old = json.load(f)
+        if old.get('size') == args.size and old.get('seed') == args.seed:
+            saved['times'] = OrderedDict(old['times'])
+            saved['times'].update(times)
+    if os.path.dirname(args.save):
+        os.makedirs(os.path.dirname(args.save), exist_ok=True)
+    with open(args.save, 'w') as f:
+        json.dump(saved, f, indent='\t', separators=(',', ':'))
+
+if regressed:
+    print('\nSlower than the baseline: ' + ', '.join(regressed))
+    sys.exit(1)
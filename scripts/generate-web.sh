@@ -9,24 +9,22 @@ python -m astrocats.scripts.webcat -c sne &
 pids[0]=$!
 python -m astrocats.scripts.webcat -c sne -by &
 pids[1]=$!
-python -m astrocats.supernovae.scripts.dupecat &
+python -m astrocats.supernovae.scripts.postprocess dupecat conflictcat &
 pids[2]=$!
-python -m astrocats.supernovae.scripts.conflictcat &
-pids[3]=$!
 python -m astrocats.scripts.bibliocat -c sne &
-pids[4]=$!
+pids[3]=$!
 python -m astrocats.supernovae.scripts.erratacat &
-pids[5]=$!
+pids[4]=$!
 python -m astrocats.scripts.hostcat -c sne &
-pids[6]=$!
+pids[5]=$!
 python -m astrocats.scripts.hammertime -c sne &
-pids[7]=$!
+pids[6]=$!
 python -m astrocats.supernovae.scripts.histograms &
-pids[8]=$!
+pids[7]=$!
 python -m astrocats.scripts.atelscbetsiaucs -c sne &
-pids[9]=$!
+pids[8]=$!
 python -m astrocats.supernovae.scripts.frbcat &
-pids[10]=$!
+pids[9]=$!
 for pid in ${pids[*]}; do
 	wait $pid
 done
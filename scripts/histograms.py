@@ -2,6 +2,7 @@
 import json
 from collections import OrderedDict
 
+import numpy as np
 import seaborn as sns
 from bokeh.embed import file_html
 from bokeh.models import ColumnDataSource, HoverTool
@@ -9,14 +10,13 @@ from bokeh.plotting import Figure, reset_output
 from bokeh.resources import CDN
 
 from astrocats.catalog.utils import is_number, tq
+from astrocats.supernovae.scripts.catalogmin import CatalogMin
 
 outdir = "astrocats/supernovae/output/"
 
 mincnt = 5
 
-with open(outdir + 'catalog.min.json', 'r') as f:
-    filetext = f.read()
-    meta = json.loads(filetext, object_pairs_hook=OrderedDict)
+meta = CatalogMin(outdir + 'catalog.min.json')
 with open('astrocats/supernovae/input/type-synonyms.json', 'r') as f:
     typereps = json.loads(f.read(), object_pairs_hook=OrderedDict)
 with open('astrocats/supernovae/input/non-sne-types.json', 'r') as f:
@@ -25,21 +25,19 @@ with open('astrocats/supernovae/input/non-sne-types.json', 'r') as f:
 
 sntypes = []
 
-for event in meta:
-    if 'claimedtype' in event and event['claimedtype']:
-        for ct in event['claimedtype']:
-            ctv = ct['value'].strip('?* ')
-            for rep in typereps:
-                if ctv in typereps[rep]:
-                    ctv = rep
-                    break
-            if not ctv:
-                continue
-            if (ctv not in sntypes and ctv.upper() not in nonsnetypes and
-                    ctv not in ['nIa', 'Candidate'] and
-                    not is_number(ctv) and '\\' not in ctv):
-                # temporarily ignoring bad types from import
-                sntypes.append(ctv)
+for ctv in np.unique(meta['claimedtype']).tolist():
+    ctv = ctv.strip('?* ')
+    for rep in typereps:
+        if ctv in typereps[rep]:
+            ctv = rep
+            break
+    if not ctv:
+        continue
+    if (ctv not in sntypes and ctv.upper() not in nonsnetypes and
+            ctv not in ['nIa', 'Candidate'] and
+            not is_number(ctv) and '\\' not in ctv):
+        # temporarily ignoring bad types from import
+        sntypes.append(ctv)
 
 sntypes = sorted(sntypes)
 snoffs = [[] for x in range(len(sntypes))]
@@ -56,14 +54,12 @@ p.add_tools(hover)
 p.title.text_font = 'futura'
 p.title.text_font_size = '14pt'
 
+hostoffsets = meta['hostoffsetdist_float']
+hasoffset = ~np.isnan(hostoffsets)
 for si, sntype in enumerate(tq(sntypes)):
-    for event in meta:
-        if ('hostoffsetdist' in event and event['hostoffsetdist'] and
-                is_number(event['hostoffsetdist'][0]['value']) and
-                'claimedtype' in event and event['claimedtype'] and
-                sntype in [x['value'] for x in event['claimedtype']]):
-            snoffs[si].append(float(event['hostoffsetdist'][0]['value']))
-    snoffs[si] = sorted(snoffs[si])
+    # Note that rows are selected by their unreplaced types.
+    rows = meta.rows_with('claimedtype', sntype) & hasoffset
+    snoffs[si] = np.sort(hostoffsets[rows]).tolist()
 
 colors = sns.color_palette("hls", n_colors=sum(
     [1 if len(snoffs[i]) >= mincnt else 0 for i, x in
@@ -1,7 +1,5 @@
 
-import gzip
 import json
-import os
 import warnings
 from collections import OrderedDict
 
@@ -10,7 +8,7 @@ from astropy.coordinates import SkyCoord as coord
 from astroquery.simbad import Simbad
 from tqdm import tqdm
 
-from astrocats.supernovae.scripts.repos import repo_file_list
+from astrocats.supernovae.scripts.scanner import CatalogScanner
 
 from ...catalog.utils import get_entry_filename
 
@@ -20,26 +18,10 @@ warnings.filterwarnings('ignore')
 
 outdir = "astrocats/supernovae/output/"
 
-files = repo_file_list(bones=False)
-
 newcatalog = []
 
-# Simbad.list_votable_fields()
-# sys.exit()
-for fcnt, eventfile in enumerate(tqdm(sorted(files, key=lambda s: s.lower()))):
-    if fcnt > 2000:
-        break
-    fileeventname = os.path.splitext(os.path.basename(eventfile))[
-        0].replace('.json', '')
-
-    if eventfile.split('.')[-1] == 'gz':
-        with gzip.open(eventfile, 'rt') as f:
-            filetext = f.read()
-    else:
-        with open(eventfile, 'r') as f:
-            filetext = f.read()
-
-    item = json.loads(filetext, object_pairs_hook=OrderedDict)
+
+def extract(eventfile, item):
     item = item[list(item.keys())[0]]
     newitem = OrderedDict()
 
@@ -55,27 +37,46 @@ for fcnt, eventfile in enumerate(tqdm(sorted(files, key=lambda s: s.lower()))):
         # Temporary fix for David's typo
         if newitem['dec'].count('.') == 2:
             newitem['dec'] = newitem['dec'][:newitem['dec'].rfind('.')]
-        newcatalog.append(newitem)
-
-coo = coord([x['ra'] for x in newcatalog],
-            [x['dec'] for x in newcatalog], unit=(un.hourangle, un.deg))
-
-for ci, co in enumerate(tqdm(coo)):
-    customSimbad = Simbad()
-    customSimbad.add_votable_fields('otype', 'z_value')
-    regstr = 'region(ICRS, ' + co.to_string('hmsdms') + ', 1m)'
-    print(regstr)
-
-    result_table = customSimbad.query_criteria(regstr, otype='Galaxy')
-    if result_table:
-        print(newcatalog[ci])
-        if 'redshift' in newcatalog[ci]:
-            print(newcatalog[ci]['redshift'])
-        print(result_table)
-
-# Convert to array since that's what datatables expects
-dupes = list(dupes.values())
-jsonstring = json.dumps(dupes, indent='\t', separators=(',', ':'),
-                        ensure_ascii=False)
-with open(outdir + 'hostcandidates.json', 'w') as f:
-   f.write(jsonstring)
+        return newitem
+    return None
+
+
+def consume(eventfile, newitem):
+    newcatalog.append(newitem)
+
+
+def finish():
+    # Simbad.list_votable_fields()
+    # sys.exit()
+    coo = coord([x['ra'] for x in newcatalog],
+                [x['dec'] for x in newcatalog], unit=(un.hourangle, un.deg))
+
+    for ci, co in enumerate(tqdm(coo)):
+        customSimbad = Simbad()
+        customSimbad.add_votable_fields('otype', 'z_value')
+        regstr = 'region(ICRS, ' + co.to_string('hmsdms') + ', 1m)'
+        print(regstr)
+
+        result_table = customSimbad.query_criteria(regstr, otype='Galaxy')
+        if result_table:
+            print(newcatalog[ci])
+            if 'redshift' in newcatalog[ci]:
+                print(newcatalog[ci]['redshift'])
+            print(result_table)
+
+    # Convert to array since that's what datatables expects
+    dupes = list(dupes.values())
+    jsonstring = json.dumps(dupes, indent='\t', separators=(',', ':'),
+                            ensure_ascii=False)
+    with open(outdir + 'hostcandidates.json', 'w') as f:
+       f.write(jsonstring)
+
+
+def register(scanner):
+    scanner.register(extract, consume, finish, limit=2001)
+
+
+if __name__ == '__main__':
+    scanner = CatalogScanner()
+    register(scanner)
+    scanner.run()
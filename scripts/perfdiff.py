@@ -0,0 +1,88 @@
+"""Compare two import performance reports, flagging regressed tasks.
+
+The reports are those written by `SupernovaCatalog.import_data` to
+`output/perf` (see `perfreport.py`). A task has regressed if one of its
+times or its peak memory grew by more than `--threshold` (as a fraction of
+the old value) and by more than an absolute minimum, so that tasks taking
+a fraction of a second do not raise alarms. Exits with status 1 if any task
+regressed.
+
+    python -m astrocats.supernovae.scripts.perfdiff [-t 0.25] OLD NEW
+"""
+import argparse
+import json
+import sys
+from collections import OrderedDict
+
+# Compared statistics, and the smallest increase worth flagging.
+CHECKS = OrderedDict([
+    ('wall_time', 5.),
+    ('cpu_time', 5.),
+    ('load_url_time', 5.),
+    ('http_time', 5.),
+    ('journal_entries_time', 5.),
+    ('peak_rss_mb', 100.)
+])
+COUNTS = ['entries_created', 'entries_modified', 'add_quantity_calls',
+          'add_photometry_calls', 'add_spectrum_calls', 'load_url_calls',
+          'http_calls']
+
+
+def regressions(old, new, threshold):
+    """Return a list of `(task, stat, old, new)` that regressed."""
+    regressed = []
+    for task, stats in new['tasks'].items():
+        if task not in old['tasks']:
+            continue
+        for stat, minimum in CHECKS.items():
+            before = old['tasks'][task].get(stat, 0.)
+            after = stats.get(stat, 0.)
+            if after - before > max(minimum, threshold * before):
+                regressed.append((task, stat, before, after))
+    return regressed
+
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+parser.add_argument('old', help='Report of the reference import.')
+parser.add_argument('new', help='Report of the import to check.')
+parser.add_argument('-t', '--threshold', type=float, default=0.25,
+                    help='Fractional increase considered a regression.')
+parser.add_argument('-c', '--counts', action='store_true',
+                    help='Also list the changes in entry and call counts.')
+args = parser.parse_args()
+
+with open(args.old, 'r') as f:
+    old = json.load(f, object_pairs_hook=OrderedDict)
+with open(args.new, 'r') as f:
+    new = json.load(f, object_pairs_hook=OrderedDict)
+
+regressed = regressions(old, new, args.threshold)
+flagged = set((x[0], x[1]) for x in regressed)
+
+print('{:<24} {:>10}  {:>10} {:>10}  {:>10} {:>9}  {:>9}'.format(
+    'task', 'wall [s]', 'was', 'http [s]', 'was', 'RSS [MB]', 'was'))
+for task, stats in new['tasks'].items():
+    before = old['tasks'].get(task, {})
+    cells = []
+    for stat, fmt in [('wall_time', '{:>10.1f}'), ('http_time', '{:>10.1f}'),
+                      ('peak_rss_mb', '{:>9.0f}')]:
+        mark = '!' if (task, stat) in flagged else ' '
+        cells.append((fmt + '{}').format(stats.get(stat, 0.), mark))
+        cells.append(fmt.format(before[stat]) if stat in before else
+                     fmt.replace('.1f', '').replace('.0f', '').format('-'))
+    print('{:<24} '.format(task) + ' '.join(cells))
+    if args.counts and before:
+        changes = ['{} {:+d}'.format(x, stats.get(x, 0) - before.get(x, 0))
+                   for x in COUNTS if stats.get(x, 0) != before.get(x, 0)]
+        if changes:
+            print('    ' + ', '.join(changes))
+
+for task in old['tasks']:
+    if task not in new['tasks']:
+        print('{:<24} not run'.format(task))
+
+if regressed:
+    print('\nRegressions:')
+    for task, stat, before, after in regressed:
+        print('  {}: {} {:.1f} -> {:.1f}'.format(task, stat, before, after))
+    sys.exit(1)
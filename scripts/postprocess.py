@@ -0,0 +1,25 @@
+"""Run several catalog scripts over a single read of the event files.
+
+    python -m astrocats.supernovae.scripts.postprocess dupecat conflictcat
+
+Each named script must provide a `register(scanner)` function, see
+`scanner.py`.
+"""
+import argparse
+from importlib import import_module
+
+from astrocats.supernovae.scripts.scanner import CatalogScanner
+
+SCRIPTS = ['dupecat', 'conflictcat', 'cxccat', 'hostcandidatecat', 'counts',
+           'sentinel', 'lccollections']
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+parser.add_argument('scripts', nargs='+', choices=SCRIPTS)
+parser.add_argument('-p', '--processes', type=int, default=None,
+                    help='Number of reader processes (default: one per core).')
+args = parser.parse_args()
+
+scanner = CatalogScanner(processes=args.processes)
+for script in args.scripts:
+    import_module('astrocats.supernovae.scripts.' + script).register(scanner)
+scanner.run()
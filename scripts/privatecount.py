@@ -4,14 +4,19 @@ import re
 from tqdm import tqdm
 from glob import glob
 
+from astrocats.supernovae.scripts.catalogmin import CatalogMin
+
 totcount = 0
 totcountp14 = 0
 evcount = 0
-with open('../output/catalog.min.json', 'r') as f:
-    filetext = f.read()
-    meta = json.loads(filetext)
+meta = CatalogMin('../output/catalog.min.json')
 
-metaals = [[y['value'].upper() for y in x['alias']] for x in meta]
+# Upper-case alias -> all upper-case aliases of the last entry that has it.
+metaals = {}
+for mi in range(len(meta)):
+    als = [x.upper() for x in meta.values('alias', mi)]
+    for al in als:
+        metaals[al] = als
 
 names = []
 
@@ -21,10 +26,7 @@ for folder in tqdm(glob('../input/sne-external-WISEREP/*')):
     if os.path.isfile(path):
         with open(path, 'r') as f:
             dat = json.loads(f.read())
-            aliases = []
-            for al in metaals:
-                if name.upper() in al:
-                    aliases = al
+            aliases = metaals.get(name.upper(), [])
             if not aliases:
                 continue
             if "Private Spectra" in dat and any([x for x in aliases]):
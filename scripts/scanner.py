@@ -0,0 +1,101 @@
+"""Read every event file of the catalog once for several scripts.
+
+Scripts register an `extract` callback, which is run on each parsed event
+within a pool of reader processes and should return only the (small, picklable)
+data the script needs, or `None` to skip the event. The returned data are
+passed to the script's `consume` callback in the main process in the same
+(case-insensitive, sorted) file order the scripts have always used, followed
+by a call to `finish` once all files have been read.
+
+    scanner = CatalogScanner()
+    register(scanner)
+    scanner.run()
+
+`python -m astrocats.supernovae.scripts.postprocess` runs several scripts
+over a single scan.
+"""
+import json
+import multiprocessing
+import os
+from collections import OrderedDict
+
+from tqdm import tqdm
+
+from astrocats.supernovae.scripts.events import get_event_text
+from astrocats.supernovae.scripts.repos import repo_file_list
+
+# Consumers inherited by the forked reader processes of `CatalogScanner.run`.
+_consumers = []
+
+
+class CatalogScanner(object):
+    """Fan each parsed event out to a number of registered consumers."""
+
+    def __init__(self, files=None, processes=None, chunksize=16):
+        """Initialize the scanner over `files`, all non-boneyard by default.
+
+        `processes` is the number of reader processes, one per core if
+        `None`.
+        """
+        if files is None:
+            files = repo_file_list(bones=False)
+        self.files = sorted(files, key=lambda s: s.lower())
+        self.processes = processes or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self._consumers = []
+
+    def register(self, extract, consume=None, finish=None, limit=None):
+        """Register a consumer.
+
+        `extract(eventfile, data)` is called in a reader process with the
+        parsed JSON of each file (shared by all consumers, so it must not be
+        modified), `consume(eventfile, result)` in this process
+        for every result that isn't `None`, and `finish()` after the scan.
+        If `limit` is given, only the first `limit` files are passed on.
+        """
+        self._consumers.append((extract, consume, finish, limit))
+
+    def run(self):
+        """Read all files, then call the `finish` callback of each consumer."""
+        global _consumers
+
+        maxfiles = max([len(self.files) if x[3] is None else x[3]
+                        for x in self._consumers] or [0])
+        files = self.files[:maxfiles]
+
+        _consumers = self._consumers
+        try:
+            pool = multiprocessing.get_context('fork').Pool(self.processes)
+            try:
+                results = pool.imap(_scan_file, enumerate(files),
+                                    chunksize=self.chunksize)
+                for eventfile, eventresults in tqdm(
+                        zip(files, results), total=len(files)):
+                    for (extract, consume, finish,
+                         limit), result in zip(self._consumers,
+                                               eventresults):
+                        if consume is not None and result is not None:
+                            consume(eventfile, result)
+            finally:
+                pool.close()
+                pool.join()
+        finally:
+            _consumers = []
+
+        for extract, consume, finish, limit in self._consumers:
+            if finish is not None:
+                finish()
+
+
+def _scan_file(args):
+    """Parse a file and return the result of each consumer's `extract`."""
+    fcnt, eventfile = args
+    results = [None] * len(_consumers)
+    if not os.path.isfile(eventfile):
+        return results
+    data = json.loads(get_event_text(eventfile),
+                      object_pairs_hook=OrderedDict)
+    for ci, (extract, consume, finish, limit) in enumerate(_consumers):
+        if limit is None or fcnt < limit:
+            results[ci] = extract(eventfile, data)
+    return results
@@ -1,16 +1,18 @@
 
-import gzip
 import json
 import os
 from collections import OrderedDict
 
 import ads
 
-from astrocats.catalog.utils import tprint, tq, listify
-from astrocats.supernovae.scripts.repos import repo_file_list
+from astrocats.catalog.utils import tprint, listify
+from astrocats.supernovae.scripts.scanner import CatalogScanner
 
 sentinel = OrderedDict()
 
+# Set once the ADS API limit has been reached.
+stopped = False
+
 outdir = 'astrocats/supernovae/output/'
 
 path = 'astrocats/supernovae/output/cache/bibauthors.json'
@@ -20,17 +22,18 @@ if os.path.isfile(path):
 else:
     bibauthordict = OrderedDict()
 
-files = repo_file_list(bones=False)
 
-path = 'ads.key'
-if os.path.isfile(path):
-    with open(path, 'r') as f:
-        ads.config.token = f.read().splitlines()[0]
-else:
-    raise IOError(
-        "Cannot find ads.key, please generate one at "
-        "https://ui.adsabs.harvard.edu/#user/settings/token and place it in "
-        "this file.")
+def load_ads_key():
+    path = 'ads.key'
+    if os.path.isfile(path):
+        with open(path, 'r') as f:
+            ads.config.token = f.read().splitlines()[0]
+    else:
+        raise IOError(
+            "Cannot find ads.key, please generate one at "
+            "https://ui.adsabs.harvard.edu/#user/settings/token and place it "
+            "in this file.")
+
 
 specterms = [
     "spectrum", "spectra", "spectroscopic", "spectroscopy"]
@@ -38,23 +41,11 @@ specterms = [
 photterms = [
     "photometry", "photometric", "light curve"]
 
-for fcnt, eventfile in enumerate(tq(sorted(files, key=lambda s: s.lower()))):
-    #if fcnt > 3000:
-    #   break
-    if not os.path.exists(eventfile):
-        continue
 
+def extract(eventfile, item):
     fileeventname = os.path.splitext(os.path.basename(eventfile))[0].replace(
         '.json', '').replace('.gz', '')
 
-    if eventfile.split('.')[-1] == 'gz':
-        with gzip.open(eventfile, 'rt') as f:
-            filetext = f.read()
-    else:
-        with open(eventfile, 'r') as f:
-            filetext = f.read()
-
-    item = json.loads(filetext, object_pairs_hook=OrderedDict)
     item = item[list(item.keys())[0]]
 
     hasspecred = False
@@ -82,15 +73,26 @@ for fcnt, eventfile in enumerate(tq(sorted(files, key=lambda s: s.lower()))):
     # search_spectra = False
 
     if not search_photometry and not search_spectra:
-        continue
+        return None
+
+    return (fileeventname, [x['value'] for x in item.get('alias', [])],
+            search_spectra, search_photometry)
+
+
+def consume(eventfile, result):
+    global stopped
+
+    if stopped:
+        return
+    fileeventname, aliases, search_spectra, search_photometry = result
 
     try:
         aliases = [
-            x['value'] for x in item['alias']
-            if (not any([y in x['value'] for y in ['GRB', 'SNR', 'SDSS-II']])
-                and len(x['value']) >= 5)]
+            x for x in aliases
+            if (not any([y in x for y in ['GRB', 'SNR', 'SDSS-II']])
+                and len(x) >= 5)]
         if not aliases:
-            continue
+            return
         # ADS treats queries with spaces differently, so must search for both
         # variations.
         for alias in aliases[:]:
@@ -108,7 +110,7 @@ for fcnt, eventfile in enumerate(tq(sorted(files, key=lambda s: s.lower()))):
             q=qstr, fl=['id', 'bibstem', 'bibcode', 'author'], max_pages=100)
     except:
         print('ADS query failed for {}, skipping'.format(fileeventname))
-        continue
+        return
 
     try:
         npapers = 0
@@ -124,24 +126,38 @@ for fcnt, eventfile in enumerate(tq(sorted(files, key=lambda s: s.lower()))):
             sentinel[bc]['events'].append(fileeventname)
             npapers += 1
         if not npapers:
-            continue
-        if int(rate_limits['remaining']) <= 10:
-            print('ADS API limit reached, terminating early.')
-            break
+            return
 
         rate_limits = allpapers.response.get_ratelimits()
 
         tprint('{:<30} (papers found: {}, remaining API calls: {})'.format(
             fileeventname, npapers, rate_limits['remaining']))
+
+        if int(rate_limits['remaining']) <= 10:
+            print('ADS API limit reached, terminating early.')
+            stopped = True
     except Exception as e:
         print(repr(e))
         print('Failed to parse ADS output for {}, skipping'.format(fileeventname))
         print(allpapers.response.get_ratelimits())
-        continue
-
-# Convert to array since that's what datatables expects
-sentinel = list(sentinel.values())
-jsonstring = json.dumps(
-    sentinel, indent='\t', separators=(',', ':'), ensure_ascii=False)
-with open(outdir + 'sentinel.json', 'w') as f:
-    f.write(jsonstring)
+        return
+
+
+def finish():
+    # Convert to array since that's what datatables expects
+    jsonstring = json.dumps(
+        list(sentinel.values()), indent='\t', separators=(',', ':'),
+        ensure_ascii=False)
+    with open(outdir + 'sentinel.json', 'w') as f:
+        f.write(jsonstring)
+
+
+def register(scanner):
+    load_ads_key()
+    scanner.register(extract, consume, finish)
+
+
+if __name__ == '__main__':
+    scanner = CatalogScanner()
+    register(scanner)
+    scanner.run()
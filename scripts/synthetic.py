@@ -0,0 +1,260 @@
+"""Seeded synthetic supernova entries, for benchmarking without a network.
+
+`SyntheticCatalog` is a `SupernovaCatalog` that never queries a service and
+journals its entries to a temporary directory, and `populate` fills it with
+made-up entries resembling those of a real import: several aliases from the
+surveys `set_preferred_name` knows about, sources with bibcodes, redshifts and
+claimed types from several of them, and photometry and spectra whose sizes
+follow a long-tailed distribution from 10 up to 10^5 points. The same seed
+always produces the same entries.
+"""
+import argparse
+import os
+import string
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+
+from astrocats.catalog.utils import logger
+from astrocats.supernovae.supernova import SUPERNOVA
+from astrocats.supernovae.supernovacatalog import SupernovaCatalog
+
+__all__ = ['SyntheticCatalog', 'populate', 'synthetic_entry', 'draw_size']
+
+# Surveys as (discoverer, alias prefix), see `Supernova.set_preferred_name`.
+SURVEYS = [('ASAS-SN', 'ASASSN-'), ('OGLE', 'OGLE-'), ('CRTS', 'CSS'),
+           ('PS1', 'PS1-'), ('PTF', 'PTF'), ('La Silla-QUEST', 'LSQ'),
+           ('Gaia', 'Gaia'), ('ATLAS', 'ATLAS')]
+TYPES = ['Ia', 'Ia', 'Ia', 'II', 'II P', 'IIn', 'IIb', 'Ib', 'Ic', 'Ic BL',
+         'Ib/c', 'SLSN-I', 'Ia-91bg', 'Ia-91T', 'Candidate', 'I', 'CC', 'CV',
+         'AGN', 'LBV']
+REDSHIFT_KINDS = ['heliocentric', 'cmb', 'host', 'spectroscopic',
+                  'photometric']
+JOURNALS = ['ApJ', 'ApJL', 'MNRAS', 'A&A', 'AJ', 'PASP', 'Natur', 'CBET',
+            'ATel']
+BANDS = ['U', 'B', 'V', 'R', 'I', 'u', 'g', 'r', 'i', 'z', 'J', 'H', 'Ks',
+         'W1', 'W2', 'M2', 'C', 'o']
+TELESCOPES = ['Swift', 'PS1', 'Gaia', 'ATLAS', 'KAIT', 'LCO 1m', 'P48']
+
+
+def draw_size(rng, scale=0.4, minimum=10, maximum=100000):
+    """Draw a number of points, mostly small with a tail up to `maximum`."""
+    size = minimum * 10 ** rng.exponential(scale)
+    return int(min(size, maximum))
+
+
+def _suffix(index):
+    """Return an IAU-like letter suffix unique to `index`."""
+    letters = ''
+    index += 26 * 27
+    while index:
+        index, rem = divmod(index, 26)
+        letters = string.ascii_lowercase[rem] + letters
+    return letters
+
+
+def _sexagesimal(value, hours=False):
+    """Format degrees as 'hh:mm:ss.ss' or '+dd:mm:ss.s'."""
+    if hours:
+        value = value / 15.
+    sign = '-' if value < 0 else '+'
+    value = abs(value)
+    deg = int(value)
+    minutes = int((value - deg) * 60.)
+    seconds = ((value - deg) * 60. - minutes) * 60.
+    if hours:
+        return '{:02d}:{:02d}:{:05.2f}'.format(deg, minutes, seconds)
+    return '{}{:02d}:{:02d}:{:04.1f}'.format(sign, deg, minutes, seconds)
+
+
+def _bibcode(rng, year):
+    """Return a random (but well-formed) 19-character bibcode."""
+    journal = JOURNALS[rng.randint(len(JOURNALS))]
+    return '{}{:.<5}{:.>4d}.{:.>4d}{}'.format(
+        year, journal, rng.randint(1, 1000), rng.randint(1, 10000),
+        string.ascii_uppercase[rng.randint(26)])
+
+
+def synthetic_entry(catalog, rng, index, nphoto=None, nspec=None,
+                    specsize=None):
+    """Add a synthetic entry to `catalog`, returning its name.
+
+    `index` makes the names of the entry unique, the numbers of photometric
+    points, spectra and points per spectrum are drawn from `rng` unless
+    given.
+    """
+    year = int(rng.randint(1995, 2021))
+    suffix = _suffix(index)
+    aliases = [('SN' if year < 2016 or rng.rand() < 0.3 else 'AT') +
+               str(year) + suffix]
+    discoverer, prefix = SURVEYS[rng.randint(len(SURVEYS))]
+    ra = rng.uniform(0., 360.)
+    dec = np.degrees(np.arcsin(rng.uniform(-1., 1.)))
+    month, day = int(rng.randint(1, 13)), int(rng.randint(1, 29))
+    if prefix == 'CSS':
+        # CRTS designations encode the discovery date and position.
+        aliases.append('CSS{:02d}{:02d}{:02d}:{}{}'.format(
+            year % 100, month, day,
+            _sexagesimal(ra, True).replace(':', '')[:6],
+            _sexagesimal(dec).replace(':', '')[:7]))
+    else:
+        aliases.append(prefix + str(year)[2:] + suffix)
+    if rng.rand() < 0.3:
+        aliases.append('PSN J{}{}'.format(
+            _sexagesimal(ra, True).replace(':', '')[:8],
+            _sexagesimal(dec).replace(':', '')[:7]))
+    name = catalog.add_entry(aliases[rng.randint(len(aliases))], load=False)
+    entry = catalog.entries[name]
+
+    sources = []
+    for i in range(1 + rng.poisson(2.)):
+        if rng.rand() < 0.8:
+            sources.append(entry.add_source(
+                bibcode=_bibcode(rng, year + rng.randint(3))))
+        else:
+            sources.append(entry.add_source(
+                name='ATel #{}'.format(rng.randint(1000, 15000)),
+                url='http://www.astronomerstelegram.org/'))
+
+    def pick():
+        """Return a comma-separated set of 1-3 of the entry's sources."""
+        count = min(len(sources), 1 + rng.poisson(0.5))
+        return ','.join(rng.choice(sources, count, replace=False))
+
+    for alias in aliases:
+        entry.add_quantity(SUPERNOVA.ALIAS, alias, sources[0])
+    for i in range(1 + rng.poisson(0.3)):
+        entry.add_quantity(SUPERNOVA.RA, _sexagesimal(
+            ra + rng.normal(0., 1e-4), True), pick())
+        entry.add_quantity(SUPERNOVA.DEC, _sexagesimal(
+            dec + rng.normal(0., 1e-4)), pick())
+    if rng.rand() < 0.8:
+        entry.add_quantity(SUPERNOVA.DISCOVER_DATE, '{}/{:02d}/{:02d}'.format(
+            year, month, day), pick())
+        entry.add_quantity(SUPERNOVA.DISCOVERER, discoverer, pick())
+    redshift = 10 ** rng.uniform(-2.5, 0.)
+    for i in range(rng.poisson(1.5)):
+        entry.add_quantity(
+            SUPERNOVA.REDSHIFT, '{:.{}f}'.format(
+                redshift * (1. + rng.normal(0., 1e-3)), rng.randint(2, 6)),
+            pick(), kind=REDSHIFT_KINDS[rng.randint(len(REDSHIFT_KINDS))])
+    for i in range(1 + rng.poisson(0.7)):
+        entry.add_quantity(SUPERNOVA.CLAIMED_TYPE,
+                           TYPES[rng.randint(len(TYPES))], pick())
+    if rng.rand() < 0.6:
+        entry.add_quantity(SUPERNOVA.HOST, 'NGC {}'.format(
+            rng.randint(1, 7840)), pick())
+
+    if nphoto is None:
+        nphoto = draw_size(rng) if rng.rand() < 0.7 else 0
+    if nphoto:
+        bands = rng.choice(BANDS, 1 + rng.randint(5), replace=False)
+        peak = 50000. + (year - 1995) * 365.25 + rng.uniform(0., 365.)
+        times = peak + np.sort(rng.uniform(-20., 300., nphoto))
+        mags = (16. + 3. * rng.rand() + 0.02 * np.abs(times - peak) +
+                rng.normal(0., 0.05, nphoto))
+        for i in range(nphoto):
+            photodict = {
+                'time': '{:.3f}'.format(times[i]),
+                'u_time': 'MJD',
+                'magnitude': '{:.2f}'.format(mags[i]),
+                'e_magnitude': '{:.2f}'.format(0.01 + 0.1 * rng.rand()),
+                'telescope': TELESCOPES[rng.randint(len(TELESCOPES))],
+                'source': pick()
+            }
+            roll = rng.rand()
+            if roll > 0.05:
+                photodict['band'] = str(bands[rng.randint(len(bands))])
+            if roll > 0.95:
+                photodict['upperlimit'] = True
+            elif roll > 0.93:
+                photodict['includeshost'] = True
+            entry.add_photometry(compare_to_existing=False, **photodict)
+
+    if nspec is None:
+        nspec = rng.poisson(0.8)
+    for i in range(nspec):
+        size = specsize or draw_size(rng, scale=0.6)
+        wavelengths = np.linspace(3000., 10000., size)
+        fluxes = 1e-15 * (1. + 0.1 * rng.normal(size=size))
+        entry.add_spectrum(
+            compare_to_existing=False,
+            u_wavelengths='Angstrom',
+            u_fluxes='erg/s/cm^2/Angstrom',
+            u_time='MJD',
+            time='{:.2f}'.format(50000. + (year - 1995) * 365.25 +
+                                 rng.uniform(0., 400.)),
+            wavelengths=wavelengths,
+            fluxes=fluxes,
+            formats=['{:.2f}', '{:.4e}'],
+            source=pick())
+
+    return name
+
+
+def populate(catalog, size, seed=0):
+    """Add `size` synthetic entries to `catalog`, returning their names."""
+    rng = np.random.RandomState(seed)
+    return [synthetic_entry(catalog, rng, i) for i in range(size)]
+
+
+class SyntheticCatalog(SupernovaCatalog):
+    """Catalog of synthetic entries that works offline.
+
+    Bibcode authors and extinctions are made up instead of queried, and
+    entries are journaled to (and loaded back from) output repositories in
+    a temporary directory, removed by `close`.
+    """
+
+    HTTP_STORE = False
+    PERF_REPORT = False
+    # Compressing entries also `git add`s them, which we can't do here.
+    COMPRESS_ABOVE_FILESIZE = float('inf')
+
+    def __init__(self, log=None):
+        """Initialize an empty catalog."""
+        args = argparse.Namespace(
+            base_path='', travis=False, verbose=False, write_entries=True,
+            private=False, update=False, archived=False, load_stubs=False)
+        if log is None:
+            log = logger.get_logger(stream_level=logger.WARNING)
+        super(SyntheticCatalog, self).__init__(args, log)
+        self._output = tempfile.TemporaryDirectory(prefix='synthetic-')
+        self.PATHS.PATH_OUTPUT = self._output.name
+        for folder in self.PATHS.get_repo_output_folders():
+            os.makedirs(folder)
+        # Start from empty caches rather than those of a real import.
+        self.bibauthor_dict = {}
+        self.extinctions_dict = {}
+        self.nedd_dict = OrderedDict()
+        self._extinction_resolver = SyntheticExtinctions()
+
+    def close(self):
+        """Remove the journaled entries."""
+        self._output.cleanup()
+
+    def get_current_task_str(self):
+        """Return the task description shown in progress bars."""
+        return 'Synthetic'
+
+    def resolve_bibauthors(self, bibcodes):
+        """Make up authors for the bibcodes missing from the cache."""
+        for bibcode in bibcodes:
+            if bibcode not in self.bibauthor_dict:
+                self.bibauthor_dict[bibcode] = 'Author et al.'
+
+    def save_caches(self):
+        """Keep the caches in memory only."""
+        pass
+
+
+class SyntheticExtinctions(object):
+    """Stand-in for `ExtinctionResolver` returning made-up extinctions."""
+
+    def resolve(self, ra_decs, coords, good):
+        """Return `[ebv, ebverr]` (or `None`) for each position."""
+        ebvs = 0.01 + 0.5 * np.abs(np.sin(np.radians(
+            np.atleast_1d(coords.ra.deg))))
+        return [[round(float(x), 4), 0.002] if g else None
+                for x, g in zip(ebvs, good)]
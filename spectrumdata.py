@@ -0,0 +1,90 @@
+"""Spectrum data kept as NumPy arrays until the entry is written.
+
+`Spectrum` stores its `data` as rows of `[wavelength, flux(, error)]`
+strings, so every point of a spectrum took up three Python strings and a
+list from the time it was imported until its entry was written.
+`Supernova.add_spectrum` instead accepts the columns as arrays and keeps
+them in a `SpectrumData`, which formats them to the same strings only when
+the entry is saved (or a row is looked at, e.g. to compare spectra).
+"""
+import numpy as np
+
+from astrocats.catalog.utils import round_sig
+
+__all__ = ['SpectrumData']
+
+
+class SpectrumData(object):
+    """Rows of strings of a spectrum, kept as one array per column.
+
+    A column is formatted to strings with its format (a `str.format`
+    string), or as `str` formats its elements if it has none: for an array
+    of numbers, that is what `[str(x) for x in array]` gives, and an array
+    of strings is kept as is. The strings are then trimmed as
+    `trim_str_arr` trims the lists of strings a `Spectrum` is given.
+    """
+
+    # Values longer than this are rounded to as many significant digits,
+    # if that makes them shorter, as done by `trim_str_arr`...
+    TRIM_LENGTH = 10
+    # ...but only if one of the first rows needs it.
+    TRIM_ROWS = 10
+
+    def __init__(self, columns, formats=None):
+        """Initialize from a list of arrays of wavelengths, fluxes (and
+        errors), and optionally a format for each of them.
+        """
+        self.columns = [np.asarray(x) for x in columns]
+        if any(len(x) != len(self.columns[0]) for x in self.columns):
+            raise ValueError('Spectrum columns have different lengths.')
+        self.formats = list(formats or [None] * len(self.columns))
+        self._trimmed = [None] * len(self.columns)
+
+    def __len__(self):
+        return len(self.columns[0])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('Spectrum row out of range.')
+        return [self._strings(ci, index, index + 1)[0]
+                for ci in range(len(self.columns))]
+
+    def __iter__(self):
+        # Rows are formatted as they are reached, as comparisons of spectra
+        # only look at the first few.
+        for index in range(len(self)):
+            yield self[index]
+
+    def rows(self):
+        """Return the data as a list of rows of strings."""
+        columns = [self._strings(ci, 0, len(self))
+                   for ci in range(len(self.columns))]
+        return [list(x) for x in zip(*columns)]
+
+    def _strings(self, ci, start, stop):
+        """Return the strings of rows `start` to `stop` of column `ci`."""
+        strings = self._format(ci, start, stop)
+        if self._trimmed[ci] is None:
+            self._trimmed[ci] = any(
+                self._trim(x) != x
+                for x in self._format(ci, 0, self.TRIM_ROWS))
+        if self._trimmed[ci]:
+            strings = [self._trim(x) for x in strings]
+        return strings
+
+    def _format(self, ci, start, stop):
+        values = self.columns[ci][start:stop]
+        if self.formats[ci] is None:
+            return list(map(str, values))
+        return [self.formats[ci].format(x) for x in values]
+
+    def _trim(self, value):
+        """Return `value` as trimmed by `trim_str_arr`."""
+        if len(value) <= self.TRIM_LENGTH:
+            return value
+        rounded = str(round_sig(float(value), self.TRIM_LENGTH))
+        return rounded if len(rounded) < len(value) else value
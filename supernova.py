@@ -1,14 +1,16 @@
 """Supernova transient class."""
-import warnings
+import sys
 from collections import OrderedDict
 from decimal import Decimal
 
 import numpy as np
+from astrocats.catalog.catdict import CatDictError
 from astrocats.catalog.entry import ENTRY, Entry
 from astrocats.catalog.key import KEY_TYPES, Key
-from astrocats.catalog.photometry import PHOTOMETRY
-from astrocats.catalog.quantity import QUANTITY
+from astrocats.catalog.photometry import PHOTOMETRY, Photometry
+from astrocats.catalog.quantity import QUANTITY, Quantity
 from astrocats.catalog.source import SOURCE
+from astrocats.catalog.spectrum import SPECTRUM
 from astrocats.catalog.utils import (bib_priority, get_sig_digits,
                                      get_source_year, is_integer, is_number,
                                      jd_to_mjd, listify, make_date_string,
@@ -16,10 +18,30 @@ from astrocats.catalog.utils import (bib_priority, get_sig_digits,
 from astropy.time import Time as astrotime
 from six import string_types
 
+from .bibauthors import clean_bibcode
 from .constants import MAX_VISUAL_BANDS
+from .photometrycolumns import PHOTOMETRY_CATEGORIES, PhotometryColumns
+from .photometrytable import table_photometry
+from .quantityindex import PhotometryIndex, QuantityIndex
+from .spectrumdata import SpectrumData
 from .utils import frame_priority, host_clean, radec_clean
 
 
+def _first_min(values, mask, exact):
+    """Return the index of the first minimum of `values` within `mask`.
+
+    Values that tie as floats are compared again as `exact(index)`, which
+    returns the `Decimal` the float was derived from.
+    """
+    indices = np.flatnonzero(mask)
+    masked = values[indices]
+    candidates = indices[masked == masked.min()]
+    if len(candidates) == 1:
+        return candidates[0]
+    exacts = [exact(i) for i in candidates]
+    return candidates[exacts.index(min(exacts))]
+
+
 class SUPERNOVA(ENTRY):
     """Supernova `Key` child class."""
 
@@ -54,8 +76,22 @@ class Supernova(Entry):
     def __init__(self, catalog, name=None, stub=False):
         """Initialize `Supernova`."""
         super(Supernova, self).__init__(catalog, name, stub=stub)
+        self._quantity_indexes = {}
         return
 
+    @classmethod
+    def init_from_file(cls, catalog, name=None, path=None, **kwargs):
+        """Construct a new `Supernova` instance from an input file.
+
+        If the entry is found by `name`, waits for its file to be written if
+        it was journaled in the background.
+        """
+        if name is not None and path is None and hasattr(
+                catalog, 'wait_for_journal'):
+            catalog.wait_for_journal(name)
+        return super(Supernova, cls).init_from_file(
+            catalog, name=name, path=path, **kwargs)
+
     def _append_additional_tags(self, name, sources, quantity):
         """Append additional bits of data to an existing quantity when a newly
         added quantity is found to be a duplicate
@@ -65,19 +101,88 @@ class Supernova(Entry):
         sprob = quantity.get(QUANTITY.PROB, '')
         skind = quantity.get(QUANTITY.KIND, '')
 
-        for ii, ct in enumerate(self[name]):
-            if ct[QUANTITY.VALUE] == svalue and sources:
-                if ct.get(QUANTITY.KIND, '') != skind:
-                    return
-                for source in sources.split(','):
-                    if (source not in
-                            self[name][ii][QUANTITY.SOURCE].split(',')):
-                        self[name][ii][QUANTITY.SOURCE] += ',' + source
-                        if serror and QUANTITY.E_VALUE not in self[name][ii]:
-                            self[name][ii][QUANTITY.E_VALUE] = serror
-                        if sprob and QUANTITY.PROB not in self[name][ii]:
-                            self[name][ii][QUANTITY.PROB] = sprob
+        if not sources:
+            return
+        index = self.quantity_index(name)
+        for ct in index.find(svalue)[:1]:
+            if ct.get(QUANTITY.KIND, '') != skind:
                 return
+            for source in sources.split(','):
+                if source not in ct[QUANTITY.SOURCE].split(','):
+                    ct[QUANTITY.SOURCE] += ',' + source
+                    if serror and QUANTITY.E_VALUE not in ct:
+                        ct[QUANTITY.E_VALUE] = serror
+                        index.reset()
+                    if sprob and QUANTITY.PROB not in ct:
+                        ct[QUANTITY.PROB] = sprob
+            return
+
+    def _add_cat_dict(self,
+                      cat_dict_class,
+                      key_in_self,
+                      check_for_dupes=True,
+                      compare_to_existing=True,
+                      **kwargs):
+        """Add a `CatDict` to this entry, unless it duplicates one in it.
+
+        Quantities are compared only to the stored quantities having the
+        same value, found through the `QuantityIndex` of their key, and
+        photometry to the points having the same time, band and measurement.
+        """
+        if (cat_dict_class not in (Quantity, Photometry) or
+                not compare_to_existing):
+            added = super(Supernova, self)._add_cat_dict(
+                cat_dict_class, key_in_self, check_for_dupes=check_for_dupes,
+                compare_to_existing=compare_to_existing, **kwargs)
+            if added is True and cat_dict_class == Photometry:
+                self._photometry_added()
+            return added
+
+        try:
+            source = self._check_cat_dict_source(cat_dict_class, key_in_self,
+                                                 **kwargs)
+        except CatDictError as err:
+            if err.warn:
+                self._log.info("'{}' Not adding '{}': '{}'".format(self[
+                    self._KEYS.NAME], key_in_self, str(err)))
+            return False
+        if source is None:
+            return False
+
+        new_entry = self._init_cat_dict(cat_dict_class, key_in_self, **kwargs)
+        if new_entry is None:
+            return False
+
+        if isinstance(self.get(key_in_self), PhotometryColumns):
+            if self[key_in_self].add_sources_of_duplicate(new_entry):
+                return new_entry
+        else:
+            item = self.quantity_index(key_in_self).duplicate_of(new_entry)
+            if item is not None:
+                item.append_sources_from(new_entry)
+                return new_entry
+
+        if key_in_self == self._KEYS.ALIAS:
+            # Note if adding this alias makes this entry a duplicate.
+            if (check_for_dupes and 'aliases' in dir(self.catalog) and
+                    new_entry[QUANTITY.VALUE] in self.catalog.aliases):
+                possible_dupe = self.catalog.aliases[new_entry[QUANTITY.VALUE]]
+                if (possible_dupe != self[self._KEYS.NAME] and
+                        possible_dupe in self.catalog.entries):
+                    self.dupe_of.append(possible_dupe)
+            if 'aliases' in dir(self.catalog):
+                self.catalog.aliases[new_entry[QUANTITY.VALUE]] = self[
+                    self._KEYS.NAME]
+
+        self.setdefault(key_in_self, []).append(new_entry)
+        if cat_dict_class == Photometry:
+            self._photometry_added()
+
+        if (key_in_self == self._KEYS.ALIAS and check_for_dupes and
+                self.dupe_of):
+            self.merge_dupes()
+
+        return True
 
     def _clean_quantity(self, quantity):
         """Clean quantity value before it is added to entry."""
@@ -187,12 +292,18 @@ class Supernova(Entry):
                      forcereplacebetter=False,
                      **kwargs):
         """Add `Quantity` to `Supernova`."""
+        profiler = self._profiler()
+        if profiler is not None:
+            profiler.count('add_quantity')
         success = super(Supernova, self).add_quantity(
             quantities, value, source, **kwargs)
 
         if not success:
             return
 
+        if profiler is not None:
+            profiler.entry_touched(self.name())
+
         for quantity in listify(quantities):
             my_quantity_list = self.get(quantity, [])
 
@@ -200,109 +311,12 @@ class Supernova(Entry):
                     len(my_quantity_list) > 1):
 
                 # The quantity that was just added should be last in the list
-                added_quantity = my_quantity_list.pop()
-
-                newquantities = []
-                isworse = True
-                if quantity in [self._KEYS.DISCOVER_DATE, self._KEYS.MAX_DATE]:
-                    for ct in my_quantity_list:
-                        ctsplit = ct[QUANTITY.VALUE].split('/')
-                        svsplit = added_quantity[QUANTITY.VALUE].split('/')
-                        if len(ctsplit) < len(svsplit):
-                            isworse = False
-                            continue
-                        elif len(ctsplit) < len(svsplit) and len(svsplit) == 3:
-                            val_one = max(
-                                2, get_sig_digits(ctsplit[-1].lstrip('0')))
-                            val_two = max(
-                                2, get_sig_digits(svsplit[-1].lstrip('0')))
-                            if val_one < val_two:
-                                isworse = False
-                                continue
-                        newquantities.append(ct)
-                else:
-                    if type(quantity) != Key:
-                        isworse = False
-                    elif quantity.type == KEY_TYPES.NUMERIC:
-                        newsig = get_sig_digits(added_quantity[QUANTITY.VALUE])
-                        for ct in my_quantity_list:
-                            addct = False
-                            checke = False
-                            if (len(quantity.kind_preference) > 0 and not set(
-                                    listify(ct.get(QUANTITY.KIND, [])))
-                                    .isdisjoint(quantity.kind_preference) and
-                                    not set(
-                                        listify(
-                                            added_quantity.get(QUANTITY.KIND,
-                                                               [])))
-                                    .isdisjoint(quantity.kind_preference)):
-                                aqi = min([
-                                    quantity.kind_preference.index(x)
-                                    for x in listify(added_quantity[
-                                        QUANTITY.KIND])
-                                ])
-                                qqi = min([
-                                    quantity.kind_preference.index(x)
-                                    for x in listify(ct[QUANTITY.KIND])
-                                ])
-                                if aqi > qqi:
-                                    addct = True
-                                if aqi == qqi:
-                                    checke = True
-                                if aqi <= qqi:
-                                    isworse = False
-                            else:
-                                checke = True
-                            if checke and QUANTITY.E_VALUE in ct:
-                                if QUANTITY.E_VALUE in added_quantity:
-                                    if (float(added_quantity[QUANTITY.E_VALUE])
-                                            >= float(ct[QUANTITY.E_VALUE])):
-                                        addct = True
-                                    if (float(added_quantity[QUANTITY.E_VALUE])
-                                            <= float(ct[QUANTITY.E_VALUE])):
-                                        isworse = False
-                            else:
-                                if (checke and
-                                        QUANTITY.E_VALUE in added_quantity):
-                                    isworse = False
-                                else:
-                                    oldsig = get_sig_digits(ct[QUANTITY.VALUE])
-                                    if oldsig >= newsig:
-                                        addct = True
-                                    if newsig >= oldsig:
-                                        isworse = False
-                            if addct:
-                                newquantities.append(ct)
-                    elif quantity.type == KEY_TYPES.STRING:
-                        for ct in my_quantity_list:
-                            addct = False
-                            if (len(quantity.kind_preference) > 0 and not set(
-                                    listify(ct.get(QUANTITY.KIND, [])))
-                                    .isdisjoint(quantity.kind_preference) and
-                                    not set(
-                                        listify(
-                                            added_quantity.get(QUANTITY.KIND,
-                                                               [])))
-                                    .isdisjoint(quantity.kind_preference)):
-                                aqi = min([
-                                    quantity.kind_preference.index(x)
-                                    for x in listify(added_quantity[
-                                        QUANTITY.KIND])
-                                ])
-                                qqi = min([
-                                    quantity.kind_preference.index(x)
-                                    for x in listify(ct[QUANTITY.KIND])
-                                ])
-                                if aqi >= qqi:
-                                    addct = True
-                                if aqi <= qqi:
-                                    isworse = False
-                            else:
-                                addct = True
-                                isworse = False
-                            if addct:
-                                newquantities.append(ct)
+                index = self.quantity_index(quantity)
+                added_quantity = index.pop()
 
+                isworse, kept = index.replace_better(
+                    added_quantity, dates=quantity in [
+                        self._KEYS.DISCOVER_DATE, self._KEYS.MAX_DATE])
                 if isworse:
                     self._log.info("Removing quantity '{}' with value '{}' "
                                    "and kind '{}' determined to be worse than "
@@ -310,10 +324,12 @@ class Supernova(Entry):
                                        quantity, added_quantity[
                                            QUANTITY.VALUE],
                                        added_quantity.get(QUANTITY.KIND, '')))
-                else:
-                    newquantities.append(added_quantity)
-                if len(newquantities) > 0:
-                    self[quantity] = newquantities
+                if kept is None:
+                    if not isworse:
+                        my_quantity_list.append(added_quantity)
+                elif kept or not isworse:
+                    self[quantity] = index.replace(kept + (
+                        [] if isworse else [added_quantity]))
 
             # As all SN####xx designations for 2016+ have corresponding AT
             # designations, add the AT alias when the SN alias is added.
@@ -326,9 +342,120 @@ class Supernova(Entry):
                         success = super(Supernova, self).add_quantity(
                             SUPERNOVA.ALIAS, 'AT' + cleaned_value[2:], source,
                             **kwargs)
+                self._index_aliases()
 
         return True
 
+    def _photometry_added(self):
+        """Store the point just added to the photometry of the entry.
+
+        With `COMPACT_PHOTOMETRY` set in the catalog, the photometry is kept
+        in a `PhotometryColumns`, otherwise the `PHOTOMETRY_CATEGORIES`
+        strings of the point are interned.
+        """
+        photometry = self[self._KEYS.PHOTOMETRY]
+        if isinstance(photometry, PhotometryColumns):
+            return
+        if getattr(self.catalog, 'COMPACT_PHOTOMETRY', False):
+            self[self._KEYS.PHOTOMETRY] = PhotometryColumns(photometry)
+            self._quantity_indexes.pop(self._KEYS.PHOTOMETRY, None)
+            return
+        photo = photometry[-1]
+        for key in PHOTOMETRY_CATEGORIES:
+            value = photo.get(key)
+            if isinstance(value, str):
+                photo[key] = sys.intern(value)
+
+    def add_photometry(self, compare_to_existing=True, **kwargs):
+        """Add a `Photometry` instance to this entry."""
+        profiler = self._profiler()
+        if profiler is not None:
+            profiler.count('add_photometry')
+            profiler.entry_touched(self.name())
+        return super(Supernova, self).add_photometry(
+            compare_to_existing=compare_to_existing, **kwargs)
+
+    def add_photometry_table(self, table, time, magnitudes,
+                             compare_to_existing=True, **kwargs):
+        """Add the magnitudes in astropy `Table` `table` as photometry.
+
+        `time` is the column of the times of the rows and `magnitudes` the
+        magnitude columns; see `table_photometry` for the other keyword
+        arguments. Returns the number of points made.
+        """
+        points = table_photometry(table, time, magnitudes, **kwargs)
+        for photodict in points:
+            self.add_photometry(
+                compare_to_existing=compare_to_existing, **photodict)
+        return len(points)
+
+    def add_spectrum(self, compare_to_existing=True, formats=None, **kwargs):
+        """Add a `Spectrum` instance to this entry.
+
+        `wavelengths`, `fluxes` and `errors` can be given as NumPy arrays,
+        with the `formats` of their strings (see `SpectrumData`), in which
+        case they are kept as arrays until the entry is written.
+        """
+        profiler = self._profiler()
+        if profiler is not None:
+            profiler.count('add_spectrum')
+            profiler.entry_touched(self.name())
+        if any(isinstance(kwargs.get(x), np.ndarray) for x in [
+                SPECTRUM.WAVELENGTHS, SPECTRUM.FLUXES, SPECTRUM.ERRORS]):
+            kwargs = self._spectrum_data(kwargs, formats)
+        return super(Supernova, self).add_spectrum(
+            compare_to_existing=compare_to_existing, **kwargs)
+
+    def _spectrum_data(self, kwargs, formats):
+        """Replace the data columns in `kwargs` with a `SpectrumData`.
+
+        As in `Spectrum`, errors are only kept if one of them is positive.
+        """
+        if SPECTRUM.DATA in kwargs:
+            return kwargs
+        kwargs = dict(kwargs)
+        columns = [kwargs.pop(SPECTRUM.WAVELENGTHS, None),
+                   kwargs.pop(SPECTRUM.FLUXES, None)]
+        if any(x is None or not len(x) for x in columns):
+            raise ValueError("Neither data nor (wavelengths and fluxes) given")
+        errors = kwargs.pop(SPECTRUM.ERRORS, None)
+        if (errors is not None and len(errors) and
+                np.max(np.asarray(errors, dtype=float)) > 0.0):
+            if SPECTRUM.U_ERRORS not in kwargs:
+                raise ValueError(
+                    "Without `{}`,".format(SPECTRUM.DATA) +
+                    " but with `{}`,".format(SPECTRUM.ERRORS) +
+                    " `{}` also required".format(SPECTRUM.U_ERRORS))
+            columns.append(errors)
+        kwargs[SPECTRUM.DATA] = SpectrumData(
+            columns, formats=formats[:len(columns)] if formats else None)
+        return kwargs
+
+    def _ordered(self, odict):
+        """Convert the object into a plain OrderedDict.
+
+        Spectrum data kept as arrays is formatted to rows of strings, and
+        photometry kept as `PhotometryColumns` to a list of points.
+        """
+        ndict = super(Supernova, self)._ordered(odict)
+        if isinstance(ndict.get(SPECTRUM.DATA), SpectrumData):
+            ndict[SPECTRUM.DATA] = ndict[SPECTRUM.DATA].rows()
+        if isinstance(ndict.get(self._KEYS.PHOTOMETRY), PhotometryColumns):
+            ndict[self._KEYS.PHOTOMETRY] = ndict[
+                self._KEYS.PHOTOMETRY].ordered()
+        return ndict
+
+    def _profiler(self):
+        """Return the catalog's `TaskProfiler`, `None` if not profiling."""
+        return getattr(self.catalog, 'profiler', None)
+
+    def _index_aliases(self):
+        """Update the alias index of the catalog if this entry is stored."""
+        index = getattr(self.catalog, 'alias_index', None)
+        name = self[self._KEYS.NAME]
+        if index is not None and self.catalog.entries.get(name) is self:
+            index.update(name, self.get_aliases(includename=False))
+
     def add_source(self, **kwargs):
         # Sanitize some fields before adding source
         # Replace reference names and URLs using dictionaries.
@@ -478,40 +605,13 @@ class Supernova(Entry):
         if self._KEYS.SOURCES in self:
             for source in self[self._KEYS.SOURCES]:
                 if SOURCE.BIBCODE in source:
-                    import urllib
-                    from html import unescape
-                    # First sanitize the bibcode
-                    if len(source[SOURCE.BIBCODE]) != 19:
-                        source[SOURCE.BIBCODE] = urllib.parse.unquote(
-                            unescape(source[SOURCE.BIBCODE])).replace('A.A.',
-                                                                      'A&A')
-                    if source[SOURCE.BIBCODE] in self.catalog.biberror_dict:
-                        source[SOURCE.BIBCODE] = \
-                            self.catalog.biberror_dict[source[SOURCE.BIBCODE]]
-
-                    if (source[SOURCE.BIBCODE] not in
-                            self.catalog.bibauthor_dict):
-                        bibcode = source[SOURCE.BIBCODE]
-                        adsquery = (self.catalog.ADS_BIB_URL +
-                                    urllib.parse.quote(bibcode) +
-                                    '&data_type=Custom&format=%253m%20%25(y)')
-                        bibcodeauthor = ''
-                        try:
-                            response = urllib.request.urlopen(adsquery)
-                            html = response.read().decode('utf-8')
-                            hsplit = html.split("\n")
-                            if len(hsplit) > 5:
-                                bibcodeauthor = hsplit[5]
-                        except:
-                            pass
-
-                        if not bibcodeauthor:
-                            warnings.warn(
-                                "Bibcode didn't return authors, not converting"
-                                "this bibcode.")
-
-                        self.catalog.bibauthor_dict[bibcode] = unescape(
-                            bibcodeauthor).strip()
+                    source[SOURCE.BIBCODE] = clean_bibcode(
+                        source[SOURCE.BIBCODE], self.catalog.biberror_dict)
+            # Usually already resolved for all entries before cleanup, only
+            # sources added since then should need a query here.
+            self.catalog.resolve_bibauthors([
+                x[SOURCE.BIBCODE] for x in self[self._KEYS.SOURCES]
+                if SOURCE.BIBCODE in x])
 
             for source in self[self._KEYS.SOURCES]:
                 if (SOURCE.BIBCODE in source and
@@ -557,7 +657,8 @@ class Supernova(Entry):
             for key in self.keys():
                 if self._KEYS.get_key_by_name(key).no_source:
                     continue
-                for item in self[key]:
+                items = self[key]
+                for i, item in enumerate(items):
                     aliases = [
                         str(y)
                         for y in sorted(
@@ -565,6 +666,9 @@ class Supernova(Entry):
                             for x in item[item._KEYS.SOURCE].split(','))
                     ]
                     item[item._KEYS.SOURCE] = ','.join(aliases)
+                    if isinstance(items, PhotometryColumns):
+                        # Its points are copies, store the change back.
+                        items[i] = item
 
     def clean_internal(self, data):
         """Clean input data from the 'Supernovae/input/internal' repository.
@@ -650,87 +754,97 @@ class Supernova(Entry):
 
         return data
 
+    def photometry_columns(self):
+        """Return the photometry of the entry as `PhotometryColumns`.
+
+        Photometry kept as a list of points is copied into new columns.
+        """
+        photometry = self[self._KEYS.PHOTOMETRY]
+        if isinstance(photometry, PhotometryColumns):
+            return photometry
+        return PhotometryColumns(photometry)
+
+    def quantity_index(self, key):
+        """Return the `QuantityIndex` of the quantities of `key` (a
+        `PhotometryIndex` for photometry).
+
+        The index is kept with the entry, and only quantities added since it
+        was last returned are indexed.
+        """
+        if key not in self._quantity_indexes:
+            # Entries loaded from JSON add their quantities under plain `str`
+            # keys, which do not say how values of the key are compared.
+            if type(key) != Key:
+                key = self._KEYS.get_key_by_name(key)
+            self._quantity_indexes[key] = (
+                PhotometryIndex(key) if key == self._KEYS.PHOTOMETRY else
+                QuantityIndex(key))
+        return self._quantity_indexes[key].update(self.get(key, []))
+
     def _get_max_light(self, visual=False):
         if self._KEYS.PHOTOMETRY not in self:
             return (None, None, None, None)
 
-        eventphoto = [
-            (x[PHOTOMETRY.U_TIME], Decimal(x[PHOTOMETRY.TIME])
-             if not isinstance(x[PHOTOMETRY.TIME], list) else
-             Decimal(np.mean([float(y) for y in x[PHOTOMETRY.TIME]])),
-             Decimal(x[PHOTOMETRY.MAGNITUDE]), x.get(PHOTOMETRY.BAND, ''),
-             x[PHOTOMETRY.SOURCE]) for x in self[self._KEYS.PHOTOMETRY]
-            if (PHOTOMETRY.MAGNITUDE in x and PHOTOMETRY.TIME in x and x.get(
-                PHOTOMETRY.U_TIME, '') == 'MJD' and PHOTOMETRY.UPPER_LIMIT
-                not in x and not x.get(PHOTOMETRY.INCLUDES_HOST, False))
-        ]
-        # Use photometry that includes host if no other photometry available.
-        if not eventphoto:
-            eventphoto = [
-                (x[PHOTOMETRY.U_TIME], Decimal(x[PHOTOMETRY.TIME])
-                 if not isinstance(x[PHOTOMETRY.TIME], list) else
-                 Decimal(np.mean([float(y) for y in x[PHOTOMETRY.TIME]])),
-                 Decimal(x[PHOTOMETRY.MAGNITUDE]), x.get(PHOTOMETRY.BAND, ''),
-                 x[PHOTOMETRY.SOURCE]) for x in self[self._KEYS.PHOTOMETRY]
-                if (PHOTOMETRY.MAGNITUDE in x and PHOTOMETRY.TIME in x and
-                    x.get(PHOTOMETRY.U_TIME, '') == 'MJD' and not x.get(
-                        PHOTOMETRY.INCLUDES_HOST, False))
-            ]
-        if not eventphoto:
+        photometry = self[self._KEYS.PHOTOMETRY]
+        columns = self.photometry_columns()
+        magnitudes = columns.values(PHOTOMETRY.MAGNITUDE)
+        times = columns.values(PHOTOMETRY.TIME)
+        usable = (columns.has(PHOTOMETRY.MAGNITUDE) &
+                  columns.has(PHOTOMETRY.TIME) &
+                  columns.isin(PHOTOMETRY.U_TIME, ['MJD']) &
+                  ~np.isnan(magnitudes) & ~np.isnan(times))
+        usable &= ~columns.flag(PHOTOMETRY.INCLUDES_HOST)
+        mask = usable & ~columns.has(PHOTOMETRY.UPPER_LIMIT)
+        # Use upper limits if no other photometry available.
+        if not mask.any():
+            mask = usable
+        if not mask.any():
             return None, None, None, None
 
-        mlmag = None
-
         if visual:
             for mb in MAX_VISUAL_BANDS:
-                leventphoto = [x for x in eventphoto if x[3] in mb]
-                if leventphoto:
-                    mlmag = min([x[2] for x in leventphoto])
-                    eventphoto = leventphoto
+                lmask = mask & columns.isin(PHOTOMETRY.BAND, mb)
+                if lmask.any():
+                    mask = lmask
                     break
 
-        if not mlmag:
-            mlmag = min([x[2] for x in eventphoto])
-
-        mlindex = [x[2] for x in eventphoto].index(mlmag)
-        mlband = eventphoto[mlindex][3]
-        mlsource = eventphoto[mlindex][4]
+        mlindex = _first_min(magnitudes, mask,
+                             lambda i: Decimal(
+                                 photometry[i][PHOTOMETRY.MAGNITUDE]))
+        photo = photometry[mlindex]
+        mlmag = Decimal(photo[PHOTOMETRY.MAGNITUDE])
+        mlband = photo.get(PHOTOMETRY.BAND, '')
+        mlsource = photo[PHOTOMETRY.SOURCE]
 
-        if eventphoto[mlindex][0] == 'MJD':
-            mlmjd = float(eventphoto[mlindex][1])
-            mlmjd = astrotime(mlmjd, format='mjd').datetime
-            return mlmjd, mlmag, mlband, mlsource
-        else:
-            return None, mlmag, mlband, mlsource
+        mlmjd = astrotime(float(times[mlindex]), format='mjd').datetime
+        return mlmjd, mlmag, mlband, mlsource
 
     def _get_first_light(self):
         if self._KEYS.PHOTOMETRY not in self:
             return None, None
 
-        eventphoto = [(Decimal(x[PHOTOMETRY.TIME])
-                       if not isinstance(x[PHOTOMETRY.TIME], list) else
-                       Decimal(min(float(y) for y in x[PHOTOMETRY.TIME])),
-                       x[PHOTOMETRY.SOURCE])
-                      for x in self[self._KEYS.PHOTOMETRY]
-                      if PHOTOMETRY.UPPER_LIMIT not in x and PHOTOMETRY.TIME in
-                      x and x.get(PHOTOMETRY.U_TIME, '') == 'MJD' and
-                      PHOTOMETRY.INCLUDES_HOST not in x]
+        photometry = self[self._KEYS.PHOTOMETRY]
+        columns = self.photometry_columns()
+        min_times = columns.values(PHOTOMETRY.TIME, min)
+        usable = (columns.has(PHOTOMETRY.TIME) &
+                  columns.isin(PHOTOMETRY.U_TIME, ['MJD']) &
+                  ~columns.has(PHOTOMETRY.UPPER_LIMIT) & ~np.isnan(min_times))
+        mask = usable & ~columns.has(PHOTOMETRY.INCLUDES_HOST)
         # Use photometry that includes host if no other photometry available.
-        if not eventphoto:
-            eventphoto = [
-                (Decimal(x[PHOTOMETRY.TIME])
-                 if not isinstance(x[PHOTOMETRY.TIME], list) else
-                 Decimal(min(float(y) for y in x[PHOTOMETRY.TIME])),
-                 x[PHOTOMETRY.SOURCE]) for x in self[self._KEYS.PHOTOMETRY]
-                if PHOTOMETRY.UPPER_LIMIT not in x and PHOTOMETRY.TIME in x and
-                x.get(PHOTOMETRY.U_TIME, '') == 'MJD'
-            ]
-        if not eventphoto:
+        if not mask.any():
+            mask = usable
+        if not mask.any():
             return None, None
-        flmjd = min([x[0] for x in eventphoto])
-        flindex = [x[0] for x in eventphoto].index(flmjd)
-        flmjd = astrotime(float(flmjd), format='mjd').datetime
-        flsource = eventphoto[flindex][1]
+
+        def exact_time(i):
+            time = photometry[i][PHOTOMETRY.TIME]
+            if isinstance(time, list):
+                return Decimal(min(float(y) for y in time))
+            return Decimal(time)
+
+        flindex = _first_min(min_times, mask, exact_time)
+        flmjd = astrotime(float(exact_time(flindex)), format='mjd').datetime
+        flsource = photometry[flindex][PHOTOMETRY.SOURCE]
         return flmjd, flsource
 
     def set_first_max_light(self):
@@ -824,32 +938,34 @@ class Supernova(Entry):
         """
         if SUPERNOVA.PHOTOMETRY not in self:
             return
-        mjds = [
-            np.mean([float(x) for x in listify(
-                x[PHOTOMETRY.TIME])]) for x in self[SUPERNOVA.PHOTOMETRY]
-            if (PHOTOMETRY.TIME in x and x.get(PHOTOMETRY.U_TIME, '') == 'MJD'
-                and PHOTOMETRY.MAGNITUDE in x and PHOTOMETRY.BAND in x)
-        ]
-        if not mjds:
+        photometry = self[SUPERNOVA.PHOTOMETRY]
+        columns = self.photometry_columns()
+        times = columns.values(PHOTOMETRY.TIME)
+        has_time = columns.has(PHOTOMETRY.TIME)
+        has_magnitude = columns.has(PHOTOMETRY.MAGNITUDE)
+        has_band = columns.has(PHOTOMETRY.BAND)
+        banded = (has_time & columns.isin(PHOTOMETRY.U_TIME, ['MJD']) &
+                  has_magnitude & has_band & ~np.isnan(times))
+        if not banded.any():
             return
-        minmjd = min(mjds) - 1
-        maxmjd = max(mjds) + 1
-        newphotos = []
-        for photo in self[SUPERNOVA.PHOTOMETRY]:
-            ptime = np.mean([float(x) for x in listify(
-                photo[PHOTOMETRY.TIME])]) if PHOTOMETRY.TIME in photo else None
-            if (PHOTOMETRY.MAGNITUDE in photo and
-                    PHOTOMETRY.BAND not in photo and
-                (PHOTOMETRY.TIME not in photo or
-                 PHOTOMETRY.U_TIME not in photo or
-                 (float(ptime) >= minmjd and float(ptime) <= maxmjd))):
-                self._log.info("Purging photometry without band information, "
-                               "MJD: {}, Mag: {}".format(
-                                   'N/A' if ptime is None else ptime,
-                                   photo.get(PHOTOMETRY.MAGNITUDE, 'N/A')))
-                continue
-            newphotos.append(photo)
-        self[SUPERNOVA.PHOTOMETRY] = newphotos
+        minmjd = times[banded].min() - 1
+        maxmjd = times[banded].max() + 1
+        purge = (has_magnitude & ~has_band &
+                 (~has_time | ~columns.has(PHOTOMETRY.U_TIME) |
+                  ((times >= minmjd) & (times <= maxmjd))))
+        if not purge.any():
+            return
+        for i in np.flatnonzero(purge):
+            self._log.info("Purging photometry without band information, "
+                           "MJD: {}, Mag: {}".format(
+                               float(times[i]) if has_time[i] else 'N/A',
+                               photometry[i].get(PHOTOMETRY.MAGNITUDE,
+                                                 'N/A')))
+        keep = np.flatnonzero(~purge)
+        if isinstance(photometry, PhotometryColumns):
+            self[SUPERNOVA.PHOTOMETRY] = columns.take(keep)
+        else:
+            self[SUPERNOVA.PHOTOMETRY] = [photometry[i] for i in keep]
         return
 
     def get_best_redshift(self, key=SUPERNOVA.REDSHIFT):
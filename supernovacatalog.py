@@ -2,21 +2,101 @@
 import codecs
 import json
 import os
+import warnings
 from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime
-from subprocess import check_output
+from subprocess import call, check_output
 
 from astrocats.catalog.catalog import Catalog
+from astrocats.catalog.entry import ENTRY
 from astrocats.catalog.quantity import QUANTITY
-from astrocats.catalog.utils import read_json_arr, read_json_dict
+from astrocats.catalog.task import Task
+from astrocats.catalog.utils import (compress_gz, read_json_arr,
+                                     read_json_dict)
 
+from .aliasindex import AliasIndex, EntryDict
+from .bibauthors import BibcodeResolver, clean_bibcode
+from .cosmology import CosmologyTables
+from .extinction import ExtinctionResolver, coordinate_cell, parse_coords
+from .journalbuffer import JournalBuffer
+from .perfreport import TaskProfiler
 from .supernova import SUPERNOVA, Supernova
+from .responsestore import ResponseStore
+from .taskprefetch import TaskPrefetcher, url_key
+from .tnsclient import TNSClient, load_tns_key
+from .urlprefetch import URLPrefetcher
 from .utils import name_clean
 
 
+@contextmanager
+def _untimed():
+    """Context manager doing nothing, used when no profiler is running."""
+    yield
+
+
 class SupernovaCatalog(Catalog):
     """Catalog class for `Supernova` objects."""
 
+    # Number of worker processes used by the sharded cleanup task, `None` to
+    # use one per available core.
+    CLEANUP_PROCESSES = None
+
+    # Number of worker processes reading FITS spectra (see `fitsspectra.py`),
+    # `None` to use one per available core.
+    FITS_PROCESSES = None
+
+    # Number of worker processes parsing HTML pages (see `htmltables.py`),
+    # `None` to use one per available core.
+    HTML_PROCESSES = None
+
+    # Number of worker processes reading text spectra (see `textspectra.py`),
+    # `None` to use one per available core.
+    TEXT_PROCESSES = None
+
+    # Directory holding the SFD dust maps (`SFD_dust_4096_[ns]gp.fits`) to
+    # read extinctions from instead of querying IRSA, `None` to use IRSA.
+    SFD_MAP_PATH = None
+
+    # Number of concurrent requests made to the TNS object API, `None` for
+    # the `TNSClient` default.
+    TNS_CONCURRENCY = None
+
+    # Number of threads downloading the URLs of upcoming import tasks ahead
+    # of time (see `taskprefetch.py`), `None` to only download them when
+    # asked to.
+    PREFETCH_WORKERS = None
+
+    # Number of threads downloading the per-object files a task lists with
+    # `prefetch_urls` ahead of its loop (see `urlprefetch.py`), `None` to
+    # download them one at a time as they are loaded.
+    URL_PREFETCH_WORKERS = 4
+
+    # Whether downloads go through the shared response store (see
+    # `responsestore.py`).
+    HTTP_STORE = True
+
+    # Whether `import_data` writes a per-task performance report (see
+    # `perfreport.py`) to `PATHS.PERF_REPORTS`.
+    PERF_REPORT = True
+
+    # Whether entries keep their photometry as compact rows (see
+    # `photometrycolumns.py`) rather than as a list of `Photometry` dicts.
+    COMPACT_PHOTOMETRY = True
+
+    # Estimated memory, in MB, that journaled entries may take up during an
+    # import before they are written out (see `journalbuffer.py`), `None` to
+    # write them on every call of `journal_entries`.
+    JOURNAL_BUDGET_MB = 1024
+
+    _current_task = None
+    _entry_files_known = False
+    _journal = None
+    _profiler = None
+    _prefetcher = None
+    _response_store = None
+    _url_prefetcher = None
+
     class PATHS(Catalog.PATHS):
         """Paths to catalog inputs/outputs."""
 
@@ -45,6 +125,12 @@ class SupernovaCatalog(Catalog):
                 self.PATH_OUTPUT, 'cache', 'bibauthors.json')
             self.EXTINCT = os.path.join(
                 self.PATH_OUTPUT, 'cache', 'extinctions.json')
+            self.COSMOLOGY = os.path.join(
+                self.PATH_OUTPUT, 'cache', 'cosmology.npz')
+            self.TASK_URLS = os.path.join(
+                self.PATH_OUTPUT, 'cache', 'task-urls.json')
+            self.HTTP_STORE = os.path.join(self.PATH_OUTPUT, 'cache', 'http')
+            self.PERF_REPORTS = os.path.join(self.PATH_OUTPUT, 'perf')
 
         def get_repo_years(self):
             """Return an array of years based upon output repositories."""
@@ -69,9 +155,370 @@ class SupernovaCatalog(Catalog):
         # Initialize super `astrocats.catalog.catalog.Catalog` object
         super(SupernovaCatalog, self).__init__(args, log)
         self.proto = Supernova
+        # Look up names through an index of aliases (see `aliasindex.py`).
+        self.alias_index = AliasIndex()
+        self.entries = EntryDict(self.alias_index, self.entries)
         self._load_aux_data()
         return
 
+    @property
+    def current_task(self):
+        """The running import task."""
+        return self._current_task
+
+    @current_task.setter
+    def current_task(self, task):
+        # Tasks start with all entries written, as if journaled right away.
+        self.flush_journal()
+        self._close_url_prefetcher()
+        self._current_task = task
+        if self._profiler is not None and task is not None:
+            self._profiler.start_task(task.name)
+        if self._prefetcher is not None and task is not None:
+            self._prefetcher.task_started(task.name)
+
+    @property
+    def profiler(self):
+        """The `TaskProfiler` of the running import, `None` if none."""
+        return self._profiler
+
+    def network_timer(self):
+        """Return a context manager timing a block as blocked on HTTP."""
+        if self._profiler is None:
+            return _untimed()
+        return self._profiler.timed('http')
+
+    def import_data(self):
+        """Run all of the import tasks.
+
+        The URLs downloaded by each task are recorded, so that they can be
+        prefetched the next time if `PREFETCH_WORKERS` is set, and if
+        `PERF_REPORT` is set a report of the time and memory each task took
+        is saved.
+        """
+        self._task_requests = OrderedDict()
+        # With old files deleted or loaded as stubs, every entry file is
+        # that of an entry in `entries`.
+        self._entry_files_known = bool(
+            getattr(self.args, 'delete_old', False) or self.args.load_stubs or
+            self.args.update)
+        if self.PERF_REPORT:
+            self._profiler = TaskProfiler()
+        if self.JOURNAL_BUDGET_MB:
+            self._journal = JournalBuffer(
+                self._write_entry, self.JOURNAL_BUDGET_MB * 1024 ** 2)
+        try:
+            super(SupernovaCatalog, self).import_data()
+        finally:
+            self._entry_files_known = False
+            if self._journal is not None:
+                try:
+                    self.flush_journal()
+                finally:
+                    self._journal.close()
+                    self._journal = None
+            self._close_url_prefetcher()
+            if self._prefetcher is not None:
+                self._prefetcher.close()
+                self._prefetcher = None
+            self._save_task_requests()
+            if self._response_store is not None:
+                self._response_store.save()
+            if self._profiler is not None:
+                path = self._profiler.save(self.PATHS.PERF_REPORTS)
+                self.log.warning(
+                    "Performance report written to '{}'.".format(path))
+                self._profiler = None
+
+    def load_task_list(self):
+        """Load the list of tasks, and start prefetching for active ones."""
+        tasks_list = super(SupernovaCatalog, self).load_task_list()
+        if self.PREFETCH_WORKERS:
+            # Opened here, before it is shared with the prefetch threads.
+            self.response_store
+            self._prefetcher = TaskPrefetcher(
+                self._prefetch_url,
+                [(name, self._task_schedule[name])
+                 for name, task in tasks_list.items() if task.active],
+                read_json_dict(self.PATHS.TASK_URLS),
+                max_workers=self.PREFETCH_WORKERS)
+            self._prefetcher.start()
+        return tasks_list
+
+    def _load_task_list_from_file(self):
+        """Load tasks, setting aside their prefetch `depends`/`resources`."""
+        self.log.debug(
+            "Loading task-list from '{}'".format(self.PATHS.TASK_LIST))
+        with codecs.open(self.PATHS.TASK_LIST, 'r') as f:
+            data = json.load(f)
+        tasks = {}
+        task_names = []
+        self._task_schedule = {}
+        for key, val in data.items():
+            self._task_schedule[key] = (val.pop('depends', []),
+                                        val.pop('resources', []))
+            tasks[key] = Task(name=key, **val)
+            task_names.append(key)
+        return tasks, task_names
+
+    def add_entry(self, name, load=True, delete=True):
+        """Find or add an entry, noting new entries in the profiler.
+
+        During an import in which every entry file belongs to a known entry,
+        names matching no entry are not looked for on disk.
+        """
+        if (load and self._entry_files_known and
+                not self._is_known_name(name)):
+            load = False
+        newname = super(SupernovaCatalog, self).add_entry(
+            name, load=load, delete=delete)
+        if self._profiler is not None:
+            entry = self.entries.get(newname)
+            if entry is not None and entry.filename is None:
+                self._profiler.entry_created(newname)
+        if self._journal is not None:
+            self._journal.touch(newname)
+        return newname
+
+    def entry_exists(self, name):
+        """Return whether an entry has the name or alias `name`."""
+        return name in self.entries or name in self.alias_index
+
+    def get_preferred_name(self, name):
+        """Return the name of the entry with name or alias `name`.
+
+        Only entries with more than one alias are matched by alias, `name`
+        itself is returned if no entry matches.
+        """
+        if name in self.entries:
+            return name
+        match = self._first_entry_name(
+            x for x in self.alias_index.names(name)
+            if len(self.entries[x].get_aliases(includename=False)) > 1)
+        return name if match is None else match
+
+    def find_entry_name_of_alias(self, alias):
+        """Return the name of the entry with `alias`, `None` if none.
+
+        The entry which last added `alias` is preferred, as in `Catalog`.
+        """
+        if alias not in self.aliases:
+            return None
+        name = self.aliases[alias]
+        if name in self.entries:
+            return name
+        # Merged or deleted, fall back on the first entry having `alias`.
+        return self._first_entry_name(
+            x for x in self.alias_index.names(alias)
+            if (ENTRY.DISTINCT_FROM not in self.entries[x] or
+                alias not in self.entries[x][ENTRY.DISTINCT_FROM]))
+
+    def _first_entry_name(self, names):
+        """Return the first of `names` in the order of `entries`, if any."""
+        names = list(names)
+        if len(names) < 2:
+            return names[0] if names else None
+        names = set(names)
+        return next(x for x in self.entries if x in names)
+
+    def _is_known_name(self, name):
+        """Return whether `name`, as is or cleaned, names or aliases an entry.
+        """
+        return any(self.entry_exists(x)
+                   for x in (name, self.clean_entry_name(name)))
+
+    def journal_entries(self, clear=True, gz=False, bury=False,
+                        write_stubs=False, final=False):
+        """Write all entries to files, and replace them with stubs.
+
+        During an import, calls with the default arguments only write the
+        least recently used entries, once the journal budget is exceeded.
+        """
+        timer = (_untimed() if self._profiler is None else
+                 self._profiler.timed('journal_entries'))
+        with timer:
+            if self._journal is not None:
+                if clear and not (gz or bury or write_stubs or final):
+                    for name in self._journal.evictions(self.entries):
+                        self._journal_entry(name)
+                    return
+                self._journal.wait_all()
+            return super(SupernovaCatalog, self).journal_entries(
+                clear=clear, gz=gz, bury=bury, write_stubs=write_stubs,
+                final=final)
+
+    def compress_entry_file(self, save_name):
+        """Compress entry file `save_name` if it is larger than
+        `COMPRESS_ABOVE_FILESIZE`, and stage the compressed file in git in
+        its place, as `journal_entries` does if passed `gz`.
+
+        Returns the name of the file the entry is left in.
+        """
+        if os.path.getsize(save_name) <= self.COMPRESS_ABOVE_FILESIZE:
+            return save_name
+        gz_name = compress_gz(save_name)
+        self.log.debug("Compressed '{}' to '{}'".format(save_name, gz_name))
+        outdir, filename = os.path.split(save_name)
+        for command in (['rm', '--cached', '--quiet', '--ignore-unmatch',
+                         filename], ['add', '-f', filename + '.gz']):
+            if call(['git', '-C', outdir] + command) != 0:
+                self.log.warning("`git {}` failed in '{}'.".format(
+                    ' '.join(command), outdir))
+        return gz_name
+
+    def flush_journal(self):
+        """Write all entries kept in memory by the journal, and wait."""
+        if self._journal is None:
+            return
+        for name in [x for x in self.entries if not self.entries[x]._stub]:
+            self._journal_entry(name)
+        self._journal.wait_all()
+
+    def wait_for_journal(self, name):
+        """Wait for the file of entry `name` if it is being written."""
+        if self._journal is not None:
+            self._journal.wait(name)
+
+    def _journal_entry(self, name):
+        """Replace entry `name` with its stub, writing it in the background.
+
+        The entry is serialized here, so that the writer thread is only
+        handed the bytes to write, never the entry itself.
+        """
+        entry = self.entries[name]
+        if self.args.write_entries:
+            self._journal.submit(name, *self._serialize_entry(entry))
+        self.entries[name] = entry.get_stub()
+
+    def _serialize_entry(self, entry):
+        """Return the file `entry.save()` writes `entry` to, and the UTF-8
+        encoded JSON it writes.
+        """
+        outdir, filename = entry._get_save_path(bury=False)
+        if not os.path.isdir(outdir):
+            raise RuntimeError("Output directory '{}' for event '{}' does "
+                               "not exist.".format(outdir, entry[
+                                   entry._KEYS.NAME]))
+        jsonstring = json.dumps(
+            {entry[entry._KEYS.NAME]: entry._ordered(entry)},
+            indent='\t', separators=(',', ':'), ensure_ascii=False)
+        return (os.path.join(outdir, filename + '.json'),
+                jsonstring.encode('utf-8'))
+
+    def _write_entry(self, save_name, data):
+        with open(save_name, 'wb') as f:
+            f.write(data)
+        self.log.info("Saved entry to '{}'.".format(save_name))
+
+    def load_url(self, *args, **kwargs):
+        """Load text from a url or its cached file, timing it."""
+        if self._profiler is None:
+            return super(SupernovaCatalog, self).load_url(*args, **kwargs)
+        with self._profiler.timed('load_url'):
+            return super(SupernovaCatalog, self).load_url(*args, **kwargs)
+
+    def download_url(self, url, timeout, fail=False, post=None, verify=True):
+        """Download text from the given url, unless it was prefetched."""
+        with self.network_timer():
+            task = self.current_task.name if self.current_task else None
+            if task is not None and hasattr(self, '_task_requests'):
+                self._task_requests.setdefault(task, []).append(
+                    [url, post, timeout, verify])
+            if self._url_prefetcher is not None:
+                url_txt = self._url_prefetcher.take(url, post)
+                if url_txt is not None:
+                    return url_txt
+            if self._prefetcher is not None and task is not None:
+                url_txt = self._prefetcher.take(task, url, post)
+                if url_txt is not None:
+                    return url_txt
+            return self._download_url(url, timeout, fail=fail, post=post,
+                                      verify=verify)
+
+    def _prefetch_url(self, url, timeout, post, verify):
+        return self._download_url(url, timeout, post=post, verify=verify)
+
+    def prefetch_urls(self, requests, repo=None, timeout=120, post=None,
+                      archived_mode=None, verify=False):
+        """Start downloading the `[url, fname]` pairs the running task is
+        about to pass to `load_url`, in that order.
+
+        The arguments are those the task passes to `load_url`; pairs whose
+        cached file `load_url` would read instead are not downloaded. Each
+        download is taken by the `load_url` call of its URL, the URLs not
+        loaded before it being taken as skipped. Prefetching stops when the
+        task ends or `prefetch_urls` is next called.
+        """
+        self._close_url_prefetcher()
+        if not self.URL_PREFETCH_WORKERS:
+            return
+        repo = repo or self.get_current_task_repo()
+        if archived_mode is None:
+            archived_mode = self.args.archived
+        cached = archived_mode or (self.current_task.archived and
+                                   not self.args.update)
+        requests = [[url, post, timeout, verify] for url, fname in requests
+                    if not (cached and
+                            os.path.isfile(os.path.join(repo, fname)))]
+        if not requests:
+            return
+        # Opened here, before it is shared with the prefetch threads.
+        self.response_store
+        self._url_prefetcher = URLPrefetcher(
+            self._prefetch_url, requests,
+            max_workers=self.URL_PREFETCH_WORKERS)
+
+    def _close_url_prefetcher(self):
+        if self._url_prefetcher is not None:
+            self._url_prefetcher.close()
+            self._url_prefetcher = None
+
+    @property
+    def response_store(self):
+        """The `ResponseStore` downloads go through, `None` if disabled."""
+        if self._response_store is None and self.HTTP_STORE:
+            self._response_store = ResponseStore(self.PATHS.HTTP_STORE)
+        return self._response_store
+
+    def _download_url(self, url, timeout, fail=False, post=None,
+                      verify=True):
+        """Download text from `url` through the response store."""
+        if self.response_store is None:
+            return super(SupernovaCatalog, self).download_url(
+                url, timeout, fail=fail, post=post, verify=verify)
+        try:
+            url_txt = self.response_store.fetch(
+                url, timeout, post=post, verify=verify)
+            if url_txt is None:
+                raise RuntimeError('not in the response store (replay mode)')
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except Exception as err:
+            err_str = ("URL Download of '{}' failed ('{}')."
+                       .format(url, str(err)))
+            if fail:
+                err_str += " and `fail` is set."
+                self.log.error(err_str)
+                raise RuntimeError(err_str)
+            self.log.warning(err_str)
+            return None
+        return url_txt
+
+    def _save_task_requests(self):
+        """Save the URLs downloaded by the tasks that ran."""
+        if not self._task_requests:
+            return
+        requests = read_json_dict(self.PATHS.TASK_URLS)
+        for task, task_requests in self._task_requests.items():
+            unique = OrderedDict()
+            for request in task_requests:
+                unique.setdefault(url_key(request[0], request[1]), request)
+            requests[task] = list(unique.values())
+        jsonstring = json.dumps(requests, indent='\t',
+                                separators=(',', ':'), ensure_ascii=False)
+        with codecs.open(self.PATHS.TASK_URLS, 'w', encoding='utf8') as f:
+            f.write(jsonstring)
+
     def should_bury(self, name):
         """Determine whether an entry should be "buried".
 
@@ -147,8 +594,103 @@ class SupernovaCatalog(Catalog):
         self.nonsneprefixes_dict = read_json_arr(
             self.PATHS.NON_SNE_PREFIXES)
         self.nonsnetypes = read_json_arr(self.PATHS.NON_SNE_TYPES)
+        # Distance tables are only built (or loaded) when first needed
+        self._cosmology = None
+        self._extinction_resolver = None
+        self._tns_clients = {}
         return
 
+    @property
+    def cosmology(self):
+        """Interpolation tables of distances in the catalog cosmology."""
+        if self._cosmology is None:
+            self._cosmology = CosmologyTables(self.PATHS.COSMOLOGY)
+        return self._cosmology
+
+    def resolve_bibauthors(self, bibcodes):
+        """Add the authors of any of `bibcodes` missing from the cache.
+
+        All unknown bibcodes are resolved together in batched, concurrent
+        queries to `ADS_BIB_URL`.
+        """
+        missing = []
+        for bibcode in bibcodes:
+            bibcode = clean_bibcode(bibcode, self.biberror_dict)
+            if bibcode not in self.bibauthor_dict:
+                missing.append(bibcode)
+        if not missing:
+            return
+        resolver = BibcodeResolver(self.ADS_BIB_URL)
+        self.bibauthor_dict.update(resolver.resolve(missing))
+
+    def get_tns_client(self, tns_url):
+        """Return the `TNSClient` for `tns_url`, shared by all tasks."""
+        if tns_url not in self._tns_clients:
+            tnskey = load_tns_key()
+            if tnskey is None:
+                self.log.warning('TNS API key not found, make sure a file '
+                                 'named `tns.key` containing the key is '
+                                 'placed the astrocats directory.')
+            self._tns_clients[tns_url] = TNSClient(
+                tns_url, tnskey, concurrency=self.TNS_CONCURRENCY)
+        return self._tns_clients[tns_url]
+
+    def prefetch_extinctions(self, names):
+        """Resolve the extinctions of all `names` missing from the cache."""
+        names = [x for x in names
+                 if SUPERNOVA.RA in self.entries[x] and
+                 SUPERNOVA.DEC in self.entries[x]]
+        self._resolve_extinctions(names)
+
+    def get_extinction(self, name):
+        """Return `[ebv, ebverr]` at the position of `name`, or `None`."""
+        return self.extinctions_dict.get(self._resolve_extinctions([name])[0])
+
+    def _resolve_extinctions(self, names):
+        """Fill the extinction cache for entries `names`, returning keys.
+
+        The cache is keyed by `coordinate_cell`; old caches keyed by entry
+        name are still used, and entries whose coordinates can't be parsed
+        keep being keyed by name.
+        """
+        if not names:
+            return []
+        ras = [self.entries[x][SUPERNOVA.RA][0][QUANTITY.VALUE]
+               for x in names]
+        decs = [self.entries[x][SUPERNOVA.DEC][0][QUANTITY.VALUE]
+                for x in names]
+        coords, good = parse_coords(ras, decs)
+
+        keys = []
+        missing = OrderedDict()
+        for i, name in enumerate(names):
+            if good[i]:
+                key = coordinate_cell(coords[i].ra.deg, coords[i].dec.deg)
+                if (key not in self.extinctions_dict and
+                        name in self.extinctions_dict):
+                    self.extinctions_dict[key] = self.extinctions_dict[name]
+            else:
+                key = name
+            keys.append(key)
+            if key not in self.extinctions_dict and key not in missing:
+                missing[key] = i
+
+        if missing:
+            if self._extinction_resolver is None:
+                self._extinction_resolver = ExtinctionResolver(
+                    self.SFD_MAP_PATH)
+            inds = list(missing.values())
+            results = self._extinction_resolver.resolve(
+                [ras[i] + " " + decs[i] for i in inds], coords[inds],
+                good[inds])
+            for key, i, result in zip(missing, inds, results):
+                if result is None:
+                    warnings.warn("Coordinate lookup for " + names[i] +
+                                  " failed in IRSA.")
+                else:
+                    self.extinctions_dict[key] = result
+        return keys
+
     def save_caches(self):
         """Save caches to JSON files."""
         jsonstring = json.dumps(self.bibauthor_dict, indent='\t',
@@ -0,0 +1,166 @@
+"""Concurrent prefetching of the URLs downloaded by the import tasks.
+
+Import tasks run one after another and spend much of their time waiting on
+`Catalog.download_url`. Which URLs a task downloads hardly changes from one
+run to the next, so `TaskPrefetcher` downloads the URLs each task asked for
+in the previous run (see `SupernovaCatalog.PATHS.TASK_URLS`) in a pool of
+threads while earlier tasks are still running. The tasks themselves still
+run, and change the catalog, one at a time in priority order; they just
+find their downloads already done.
+
+Two optional keys of `input/tasks.json` order the prefetching:
+
+    "depends": ["tns"]      prefetch only once these tasks have finished,
+                            e.g. if the task's URLs depend on their entries
+    "resources": ["tns"]    tasks sharing a resource (typically a server) are
+                            not prefetched at the same time
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+__all__ = ['TaskPrefetcher', 'url_key']
+
+
+def url_key(url, post=None):
+    """Return a hashable key for a request of `url` with `post` data."""
+    if post:
+        post = tuple(sorted((str(k), str(v)) for k, v in post.items()))
+    return (url, post or None)
+
+
+class TaskPrefetcher(object):
+    """Download the URLs of upcoming tasks ahead of time.
+
+    `download(url, timeout, post, verify)` performs a download and returns
+    its text or `None`; `tasks` is an ordered dictionary of the names of the
+    tasks that will be run to `(depends, resources)`, and `requests` a
+    dictionary of task name to the list of `[url, post, timeout, verify]`
+    it requested last time.
+    """
+
+    MAX_WORKERS = 8
+    # Number of tasks after the running one whose URLs may be prefetched.
+    LOOKAHEAD = 4
+
+    def __init__(self, download, tasks, requests, max_workers=None,
+                 lookahead=None):
+        """Initialize the prefetcher, call `start` to begin downloading."""
+        self.download = download
+        self.tasks = OrderedDict(tasks)
+        self.requests = {x: requests.get(x, []) for x in self.tasks}
+        self.max_workers = max_workers or self.MAX_WORKERS
+        self.lookahead = self.LOOKAHEAD if lookahead is None else lookahead
+        self._order = list(self.tasks)
+        self._current = -1
+        self._finished = set()
+        self._pending = {}
+        self._busy = set()
+        self._responses = {}
+        self._closed = False
+        self._condition = threading.Condition()
+        self._executor = None
+        self._futures = set()
+        self._dispatcher = None
+
+    def start(self):
+        """Start prefetching in background threads."""
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        self._dispatcher = threading.Thread(target=self._dispatch,
+                                            daemon=True)
+        self._dispatcher.start()
+
+    def task_started(self, name):
+        """Note that task `name` is running, all previous ones finished."""
+        with self._condition:
+            if name in self.tasks:
+                index = self._order.index(name)
+                self._finished.update(self._order[:index])
+                self._current = index
+                # Drop anything left over from tasks that have finished.
+                for task in self._order[:index]:
+                    self._responses.pop(task, None)
+            self._condition.notify_all()
+
+    def take(self, name, url, post=None):
+        """Return the prefetched text of `url` for task `name`.
+
+        Waits for the download if it is in progress; returns `None` if `url`
+        was not prefetched or its download failed.
+        """
+        key = url_key(url, post)
+        with self._condition:
+            while (key in self._pending.get(name, ()) and
+                   key not in self._responses.get(name, {}) and
+                   not self._closed):
+                self._condition.wait()
+            return self._responses.get(name, {}).pop(key, None)
+
+    def close(self):
+        """Stop prefetching and drop anything not yet used."""
+        with self._condition:
+            self._closed = True
+            self._responses.clear()
+            self._condition.notify_all()
+        if self._dispatcher is not None:
+            self._dispatcher.join()
+        if self._executor is not None:
+            for future in list(self._futures):
+                future.cancel()
+            self._executor.shutdown(wait=False)
+
+    def _ready(self, index):
+        """Whether the task at `index` can be prefetched now."""
+        name = self._order[index]
+        depends, resources = self.tasks[name]
+        if index - self._current > self.lookahead:
+            return False
+        if any(x in self.tasks and x not in self._finished for x in depends):
+            return False
+        return not any(set(resources) & set(self.tasks[x][1])
+                       for x in self._busy)
+
+    def _dispatch(self):
+        queued = [i for i, x in enumerate(self._order) if self.requests[x]]
+        with self._condition:
+            while queued and not self._closed:
+                ready = [i for i in queued if i > self._current and
+                         self._ready(i)]
+                if not ready:
+                    # Tasks that have started download their own URLs.
+                    queued = [i for i in queued if i > self._current]
+                    self._condition.wait()
+                    continue
+                index = ready[0]
+                queued.remove(index)
+                self._submit(self._order[index])
+
+    def _submit(self, name):
+        requests = OrderedDict()
+        for url, post, timeout, verify in self.requests[name]:
+            requests.setdefault(url_key(url, post),
+                                (url, post, timeout, verify))
+        self._pending[name] = set(requests)
+        self._responses[name] = {}
+        self._busy.add(name)
+        remaining = [len(requests)]
+
+        def fetch(key, url, post, timeout, verify):
+            try:
+                text = self.download(url, timeout, post, verify)
+            except Exception:
+                text = None
+            with self._condition:
+                if not self._closed and name in self._responses:
+                    self._responses[name][key] = text
+                self._pending[name].discard(key)
+                remaining[0] -= 1
+                if not remaining[0]:
+                    self._busy.discard(name)
+                self._condition.notify_all()
+
+        for key, (url, post, timeout, verify) in requests.items():
+            future = self._executor.submit(
+                fetch, key, url, post, timeout, verify)
+            self._futures.add(future)
+            future.add_done_callback(self._futures.discard)
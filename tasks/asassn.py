@@ -7,8 +7,7 @@ from decimal import Decimal
 from astrocats.catalog.photometry import PHOTOMETRY
 from astrocats.catalog.utils import jd_to_mjd, pbar
 from astropy.io.ascii import read
-from bs4 import BeautifulSoup
-
+from ..htmltables import table_rows
 from ..supernova import SUPERNOVA
 
 
@@ -20,9 +19,8 @@ def do_asassn(catalog):
         catalog.get_current_task_repo(), 'ASASSN/sn_list.html'))
     if not html:
         return
-    bs = BeautifulSoup(html, 'html5lib')
-    trs = bs.find('table').findAll('tr')
-    for tri, tr in enumerate(pbar(trs, task_str)):
+    trs = list(table_rows(html, table=0))
+    for tri, tds in enumerate(pbar(trs, task_str)):
         name = ''
         ra = ''
         dec = ''
@@ -34,7 +32,6 @@ def do_asassn(catalog):
         typelink = ''
         if tri == 0:
             continue
-        tds = tr.findAll('td')
         if not len(tds):
             continue
         for tdi, td in enumerate(tds):
@@ -19,6 +19,7 @@ from astropy.coordinates import SkyCoord as coord
 from astropy.io.ascii import read
 from astropy.time import Time as astrotime
 
+from ..photometrytable import band_columns, table_groups
 from ..supernova import SUPERNOVA
 
 
@@ -83,18 +84,10 @@ def do_ascii(catalog):
     datafile = os.path.join(catalog.get_current_task_repo(), 'ASCII',
                             '2017ApJ...836...60L-tab1.cds')
     data = read(datafile, format='cds')
-    for row in pbar(data, task_str):
-        oname = row['ID']
+    for oname, rows in pbar(list(table_groups(data, 'ID')), task_str):
         name, source = catalog.new_entry(oname, bibcode='2017ApJ...836...60L')
-        photodict = {
-            PHOTOMETRY.TIME: str(row['MJD']),
-            PHOTOMETRY.BAND: row['Filter'],
-            PHOTOMETRY.U_TIME: 'MJD',
-            PHOTOMETRY.MAGNITUDE: row['mag'],
-            PHOTOMETRY.E_MAGNITUDE: row['e_mag'],
-            PHOTOMETRY.SOURCE: source
-        }
-        catalog.entries[name].add_photometry(**photodict)
+        catalog.entries[name].add_photometry_table(
+            rows, 'MJD', ['mag'], band='Filter', source=source)
     catalog.journal_entries()
 
     # 2017ApJS..233....6H
@@ -626,23 +619,11 @@ def do_ascii(catalog):
     datafile = os.path.join(catalog.get_current_task_repo(), 'ASCII',
                             '2006AJ....132.2024L-tab1.txt')
     data = read(datafile, format='cds')
-    for row in pbar(data, task_str):
+    for oname, rows in pbar(list(table_groups(data, 'Name')), task_str):
         name, source = catalog.new_entry(
-            row['Name'], bibcode='2006AJ....132.2024L')
-        for band in [
-                x for x in row.columns
-                if x.endswith('mag') and not x.startswith('e_')
-        ]:
-            if not is_number(row[band]):
-                continue
-            photodict = {
-                PHOTOMETRY.TIME: jd_to_mjd(Decimal(str(row['JD']))),
-                PHOTOMETRY.U_TIME: 'MJD',
-                PHOTOMETRY.MAGNITUDE: str(row[band]),
-                PHOTOMETRY.BAND: band.replace('mag', ''),
-                PHOTOMETRY.SOURCE: source
-            }
-            catalog.entries[name].add_photometry(**photodict)
+            oname, bibcode='2006AJ....132.2024L')
+        catalog.entries[name].add_photometry_table(
+            rows, 'JD', band_columns(rows.colnames), jd=True, source=source)
     catalog.journal_entries()
 
     # 2006AJ....132.1126N
@@ -2,6 +2,7 @@
 import csv
 import os
 from glob import glob
+from itertools import islice
 from math import floor
 
 from astrocats.catalog.photometry import PHOTOMETRY
@@ -12,6 +13,7 @@ from astropy.time import Time as astrotime
 from decimal import Decimal
 
 from ..supernova import SUPERNOVA
+from ..textspectra import read_text_spectra
 from ..utils import clean_snname
 
 ACKN_CFA = ("This research has made use of the CfA Supernova Archive, "
@@ -19,6 +21,21 @@ ACKN_CFA = ("This research has made use of the CfA Supernova Archive, "
             "through grant AST 0907903.")
 
 
+def _spectrum_files(path):
+    """Return the files in directory `path`, in the order they are added."""
+    return sorted(glob(path + '/*'), key=lambda s: s.lower())
+
+
+def _is_extra_spectrum(path):
+    """Return whether `path` is one of the spectra of the extra CfA spectra.
+    """
+    filename = os.path.basename(path)
+    return (os.path.isfile(path) and filename.startswith('sn') and
+            filename.endswith('flm') and not any(
+                x in filename
+                for x in ['-interp', '-z', '-dered', '-obj', '-gal']))
+
+
 def do_cfa_photo(catalog):
     """Import photometry from the CfA archive."""
     from html import unescape
@@ -179,11 +196,15 @@ def do_cfa_spectra(catalog):
     task_str = catalog.get_current_task_str()
     # II spectra
     oldname = ''
-    file_names = next(
-        os.walk(os.path.join(catalog.get_current_task_repo(), 'CfA_SNII')))[1]
+    file_names = sorted(next(
+        os.walk(os.path.join(catalog.get_current_task_repo(), 'CfA_SNII')))[1],
+        key=lambda s: s.lower())
+    spectra_files = [_spectrum_files(os.path.join(
+        catalog.get_current_task_repo(), 'CfA_SNII', x)) for x in file_names]
+    spectra = read_text_spectra(
+        [x for y in spectra_files for x in y],
+        processes=catalog.TEXT_PROCESSES)
     for ni, name in enumerate(pbar_strings(file_names, task_str)):
-        fullpath = os.path.join(catalog.get_current_task_repo(),
-                                'CfA_SNII/') + name
         origname = name
         if name.startswith('sn') and is_number(name[2:6]):
             name = 'SN' + name[2:]
@@ -200,10 +221,8 @@ def do_cfa_spectra(catalog):
             secondary=True,
             acknowledgment=ACKN_CFA)
         catalog.entries[name].add_quantity(SUPERNOVA.ALIAS, name, source)
-        for fi, fname in enumerate(
-                sorted(
-                    glob(fullpath + '/*'), key=lambda s: s.lower())):
-            filename = os.path.basename(fname)
+        for spectrum in islice(spectra, len(spectra_files[ni])):
+            filename = spectrum.filename
             fileparts = filename.split('-')
             if origname.startswith('sn') and is_number(origname[2:6]):
                 year = fileparts[1][:4]
@@ -218,12 +237,7 @@ def do_cfa_spectra(catalog):
             time = str(
                 astrotime(year + '-' + month + '-' + str(floor(float(day)))
                           .zfill(2)).mjd + float(day) - floor(float(day)))
-            f = open(fname, 'r')
-            data = csv.reader(f, delimiter=' ', skipinitialspace=True)
-            data = [list(i) for i in zip(*data)]
-            wavelengths = data[0]
-            fluxes = data[1]
-            errors = data[2]
+            wavelengths, fluxes, errors = spectrum.columns[:3]
             sources = uniq_cdl([
                 source,
                 (catalog.entries[name]
@@ -249,11 +263,15 @@ def do_cfa_spectra(catalog):
 
     # Ia spectra
     oldname = ''
-    file_names = next(
-        os.walk(os.path.join(catalog.get_current_task_repo(), 'CfA_SNIa')))[1]
+    file_names = sorted(next(
+        os.walk(os.path.join(catalog.get_current_task_repo(), 'CfA_SNIa')))[1],
+        key=lambda s: s.lower())
+    spectra_files = [_spectrum_files(os.path.join(
+        catalog.get_current_task_repo(), 'CfA_SNIa', x)) for x in file_names]
+    spectra = read_text_spectra(
+        [x for y in spectra_files for x in y],
+        processes=catalog.TEXT_PROCESSES)
     for ni, name in enumerate(pbar_strings(file_names, task_str)):
-        fullpath = os.path.join(catalog.get_current_task_repo(),
-                                'CfA_SNIa/') + name
         origname = name
         if name.startswith('sn') and is_number(name[2:6]):
             name = 'SN' + name[2:]
@@ -272,10 +290,8 @@ def do_cfa_spectra(catalog):
             secondary=True,
             acknowledgment=ACKN_CFA)
         catalog.entries[name].add_quantity(SUPERNOVA.ALIAS, name, source)
-        for fi, fname in enumerate(
-                sorted(
-                    glob(fullpath + '/*'), key=lambda s: s.lower())):
-            filename = os.path.basename(fname)
+        for spectrum in islice(spectra, len(spectra_files[ni])):
+            filename = spectrum.filename
             fileparts = filename.split('-')
             if origname.startswith('sn') and is_number(origname[2:6]):
                 year = fileparts[1][:4]
@@ -290,12 +306,7 @@ def do_cfa_spectra(catalog):
             time = str(
                 astrotime(year + '-' + month + '-' + str(floor(float(day)))
                           .zfill(2)).mjd + float(day) - floor(float(day)))
-            f = open(fname, 'r')
-            data = csv.reader(f, delimiter=' ', skipinitialspace=True)
-            data = [list(i) for i in zip(*data)]
-            wavelengths = data[0]
-            fluxes = data[1]
-            errors = data[2]
+            wavelengths, fluxes, errors = spectrum.columns[:3]
             sources = uniq_cdl([
                 source, (catalog.entries[name]
                          .add_source(bibcode='2012AJ....143..126B')),
@@ -324,9 +335,12 @@ def do_cfa_spectra(catalog):
     oldname = ''
     file_names = next(
         os.walk(os.path.join(catalog.get_current_task_repo(), 'CfA_SNIbc')))[1]
+    spectra_files = [_spectrum_files(os.path.join(
+        catalog.get_current_task_repo(), 'CfA_SNIbc', x)) for x in file_names]
+    spectra = read_text_spectra(
+        [x for y in spectra_files for x in y],
+        processes=catalog.TEXT_PROCESSES)
     for ni, name in enumerate(pbar(file_names, task_str)):
-        fullpath = os.path.join(catalog.get_current_task_repo(),
-                                'CfA_SNIbc/') + name
         if name.startswith('sn') and is_number(name[2:6]):
             name = 'SN' + name[2:]
         name = catalog.get_preferred_name(name)
@@ -342,10 +356,8 @@ def do_cfa_spectra(catalog):
             secondary=True,
             acknowledgment=ACKN_CFA)
         catalog.entries[name].add_quantity(SUPERNOVA.ALIAS, name, source)
-        for fi, fname in enumerate(
-                sorted(
-                    glob(fullpath + '/*'), key=lambda s: s.lower())):
-            filename = os.path.basename(fname)
+        for spectrum in islice(spectra, len(spectra_files[ni])):
+            filename = spectrum.filename
             fileparts = filename.split('-')
             instrument = ''
             year = fileparts[1][:4]
@@ -356,11 +368,7 @@ def do_cfa_spectra(catalog):
             time = str(
                 astrotime(year + '-' + month + '-' + str(floor(float(day)))
                           .zfill(2)).mjd + float(day) - floor(float(day)))
-            f = open(fname, 'r')
-            data = csv.reader(f, delimiter=' ', skipinitialspace=True)
-            data = [list(i) for i in zip(*data)]
-            wavelengths = data[0]
-            fluxes = data[1]
+            wavelengths, fluxes = spectrum.columns[:2]
             sources = uniq_cdl([
                 source, catalog.entries[name]
                 .add_source(bibcode='2014AJ....147...99M')
@@ -383,11 +391,16 @@ def do_cfa_spectra(catalog):
 
     # Other spectra
     oldname = ''
-    file_names = next(
-        os.walk(os.path.join(catalog.get_current_task_repo(), 'CfA_Extra')))[1]
+    file_names = sorted(next(
+        os.walk(os.path.join(catalog.get_current_task_repo(), 'CfA_Extra')))[1],
+        key=lambda s: s.lower())
+    spectra_files = [[x for x in _spectrum_files(os.path.join(
+        catalog.get_current_task_repo(), 'CfA_Extra', y))
+        if _is_extra_spectrum(x)] for y in file_names]
+    spectra = read_text_spectra(
+        [x for y in spectra_files for x in y],
+        processes=catalog.TEXT_PROCESSES)
     for ni, name in enumerate(pbar_strings(file_names, task_str)):
-        fullpath = os.path.join(catalog.get_current_task_repo(),
-                                'CfA_Extra/') + name
         if name.startswith('sn') and is_number(name[2:6]):
             name = 'SN' + name[2:]
         name = catalog.get_preferred_name(name)
@@ -403,17 +416,8 @@ def do_cfa_spectra(catalog):
             secondary=True,
             acknowledgment=ACKN_CFA)
         catalog.entries[name].add_quantity(SUPERNOVA.ALIAS, name, source)
-        for fi, fname in enumerate(
-                sorted(
-                    glob(fullpath + '/*'), key=lambda s: s.lower())):
-            if not os.path.isfile(fname):
-                continue
-            filename = os.path.basename(fname)
-            if ((not filename.startswith('sn') or
-                 not filename.endswith('flm') or any(
-                     x in filename
-                     for x in ['-interp', '-z', '-dered', '-obj', '-gal']))):
-                continue
+        for spectrum in islice(spectra, len(spectra_files[ni])):
+            filename = spectrum.filename
             fileparts = filename.split('.')[0].split('-')
             instrument = ''
             time = ''
@@ -428,11 +432,9 @@ def do_cfa_spectra(catalog):
                         astrotime(year + '-' + month + '-' + str(
                             floor(float(day))).zfill(2)).mjd + float(day) -
                         floor(float(day)))
-            f = open(fname, 'r')
-            data = csv.reader(f, delimiter=' ', skipinitialspace=True)
-            data = [list(i) for i in zip(*data)]
-            wavelengths = data[0]
-            fluxes = [str(Decimal(x) * Decimal(1.0e-15)) for x in data[1]]
+            wavelengths = spectrum.columns[0]
+            fluxes = [str(Decimal(x) * Decimal(1.0e-15))
+                      for x in spectrum.columns[1]]
             catalog.entries[name].add_spectrum(
                 u_wavelengths='Angstrom',
                 u_fluxes='erg/s/cm^2/Angstrom',
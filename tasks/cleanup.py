@@ -1,21 +1,27 @@
 """Cleanup catalog before final write to disk."""
+import json
+import multiprocessing
+import os
 import re
 import statistics
-import warnings
+import zlib
+from collections import OrderedDict
 from decimal import Decimal
 from math import log10, pi, sqrt
 
 from astrocats.catalog.quantity import QUANTITY
-from astrocats.catalog.utils import (get_sig_digits, is_number, pbar,
-                                     pretty_num, tprint, uniq_cdl)
+from astrocats.catalog.source import SOURCE
+from astrocats.catalog.utils import (get_sig_digits, is_integer, is_number,
+                                     pbar, pretty_num, tprint, uniq_cdl)
 from astropy import units as un
 from astropy.coordinates import SkyCoord as coord
-from astropy.cosmology import Planck15 as cosmo
-from astropy.cosmology import z_at_value
 
 from ..constants import CLIGHT, KM
 from ..supernova import SUPERNOVA
 
+# Catalog inherited by the forked workers of `do_cleanup_sharded`.
+_shard_catalog = None
+
 
 def do_cleanup(catalog):
     """Cleanup catalog after importing all data."""
@@ -24,6 +30,12 @@ def do_cleanup(catalog):
     # Set preferred names, calculate some columns based on imported data,
     # sanitize some fields
     keys = list(catalog.entries.keys())
+    if catalog.args.travis:
+        catalog.resolve_bibauthors(_stub_bibcodes(catalog, keys[:1000]))
+        catalog.prefetch_extinctions(keys[:1000])
+    else:
+        catalog.resolve_bibauthors(_stub_bibcodes(catalog, keys))
+        catalog.prefetch_extinctions(keys)
 
     cleanupcnt = 0
     for oname in pbar(keys, task_str):
@@ -37,96 +49,314 @@ def do_cleanup(catalog):
                 'process.'.format(oname))
             continue
 
-        # Set the preferred name, switching to that name if name changed.
-        name = catalog.entries[name].set_preferred_name()
-
-        aliases = catalog.entries[name].get_aliases()
-        catalog.entries[name].purge_bandless_photometry()
-        catalog.entries[name].set_first_max_light()
-
-        if SUPERNOVA.DISCOVER_DATE not in catalog.entries[name]:
-            prefixes = ['MLS', 'SSS', 'CSS', 'GRB ']
-            for alias in aliases:
-                for prefix in prefixes:
-                    if (alias.startswith(prefix) and
-                            is_number(alias.replace(prefix, '')[:2])):
-                        discoverdate = ('/'.join([
-                            '20' + alias.replace(prefix, '')[:2],
-                            alias.replace(prefix, '')[2:4],
-                            alias.replace(prefix, '')[4:6]
-                        ]))
-                        if catalog.args.verbose:
-                            tprint('Added discoverdate from name [' + alias +
-                                   ']: ' + discoverdate)
-                        source = catalog.entries[name].add_self_source()
-                        catalog.entries[name].add_quantity(
-                            SUPERNOVA.DISCOVER_DATE,
-                            discoverdate,
-                            source,
-                            derived=True)
-                        break
-                if SUPERNOVA.DISCOVER_DATE in catalog.entries[name]:
+        _clean_entry(catalog, name)
+
+        catalog.journal_entries(bury=True, final=True, gz=True)
+        cleanupcnt = cleanupcnt + 1
+        if catalog.args.travis and cleanupcnt % 1000 == 0:
+            break
+
+    catalog.save_caches()
+
+    return
+
+
+def do_cleanup_sharded(catalog):
+    """Cleanup catalog after importing all data, using a pool of processes.
+
+    Entries are split into shards by a hash of their name and cleaned in
+    forked worker processes.  Entries that share a name or alias with another
+    entry can be renamed into or merged with that entry by
+    `set_preferred_name`, so they are held back and cleaned afterwards in a
+    single-threaded pass, in the same order as `do_cleanup`.  All other
+    entries only ever touch their own file, which makes the written output
+    identical to that of the serial task.
+    """
+    global _shard_catalog
+
+    if catalog.args.travis:
+        do_cleanup(catalog)
+        return
+
+    task_str = catalog.get_current_task_str()
+
+    keys = list(catalog.entries.keys())
+    catalog.resolve_bibauthors(_stub_bibcodes(catalog, keys))
+    catalog.prefetch_extinctions(keys)
+    shared = _find_shared_names(catalog, keys)
+    nprocs = catalog.CLEANUP_PROCESSES or os.cpu_count() or 1
+    nshards = 4 * nprocs
+    shards = [[] for x in range(nshards)]
+    for name in keys:
+        if name in shared:
+            continue
+        shards[zlib.crc32(name.encode('utf-8')) % nshards].append(name)
+    shards = [x for x in shards if x]
+
+    catalog.log.info('Cleaning {} entries in {} shards, {} entries held back '
+                     'for the serial pass.'.format(
+                         len(keys) - len(shared), len(shards), len(shared)))
+
+    # Build the distance tables once here rather than in every worker.
+    catalog.cosmology
+    _shard_catalog = catalog
+    try:
+        pool = multiprocessing.get_context('fork').Pool(nprocs)
+        try:
+            for stubs, bibauthors, extinctions in pbar(
+                    pool.imap_unordered(_clean_shard, shards), task_str,
+                    total=len(shards)):
+                catalog.bibauthor_dict.update(bibauthors)
+                catalog.extinctions_dict.update(extinctions)
+                for oname, name, save_name, data in stubs:
+                    _replace_stub(catalog, oname, name, data)
+                    # Workers leave compressing and staging large files to
+                    # us, as they would race for the repo's git index.
+                    if save_name is not None:
+                        catalog.compress_entry_file(save_name)
+        finally:
+            pool.close()
+            pool.join()
+    finally:
+        _shard_catalog = None
+
+    # Entries which may be merged are cleaned last, in the original order.
+    for oname in pbar([x for x in keys if x in shared], task_str):
+        try:
+            name = catalog.add_entry(oname)
+        except Exception:
+            catalog.log.warning(
+                '"{}" was not found, suggests merge occurred in cleanup '
+                'process.'.format(oname))
+            continue
+
+        _clean_entry(catalog, name)
+
+        catalog.journal_entries(bury=True, final=True, gz=True)
+
+    catalog.save_caches()
+
+    return
+
+
+def _stub_bibcodes(catalog, keys):
+    """Return the bibcodes of all sources in the stubs of the given entries."""
+    bibcodes = []
+    for name in keys:
+        for source in catalog.entries[name].get(SUPERNOVA.SOURCES, []):
+            if SOURCE.BIBCODE in source:
+                bibcodes.append(source[SOURCE.BIBCODE])
+    return bibcodes
+
+
+def _find_shared_names(catalog, keys):
+    """Return the entries which share a name or alias with another entry.
+
+    Only the stub data (name and aliases) is used, including the extra `AT`
+    designations that may be added to `SN` names during cleanup.
+    """
+    owners = {}
+    for name in keys:
+        entry = catalog.entries[name]
+        names = set(entry.get_aliases() + entry.extra_aliases())
+        names.update(['AT' + x[2:] for x in names
+                      if x.startswith('SN') and is_integer(x[2:6])])
+        for alias in names:
+            owners.setdefault(alias, set()).add(name)
+
+    shared = set()
+    for alias_owners in owners.values():
+        if len(alias_owners) > 1:
+            shared.update(alias_owners)
+    return shared
+
+
+def _save_name(catalog, name):
+    """Return the file `journal_entries` will write entry `name` to, `None`
+    if it will not write it.
+    """
+    entry = catalog.entries[name]
+    if not catalog.args.write_entries or entry._stub:
+        return None
+    bury_entry, save_entry = catalog.should_bury(name)
+    if not save_entry:
+        return None
+    outdir, filename = entry._get_save_path(bury=bury_entry)
+    return os.path.join(outdir, filename + '.json')
+
+
+def _clean_shard(names):
+    """Clean a list of entries within a worker process.
+
+    Returns the stub data of the cleaned entries and the files they were
+    written to, uncompressed, along with the additions to the bibcode author
+    and extinction caches.
+    """
+    catalog = _shard_catalog
+    old_bibcodes = set(catalog.bibauthor_dict)
+    old_extinctions = set(catalog.extinctions_dict)
+
+    stubs = []
+    for oname in names:
+        try:
+            name = catalog.add_entry(oname)
+        except Exception:
+            catalog.log.warning(
+                '"{}" was not found, suggests merge occurred in cleanup '
+                'process.'.format(oname))
+            continue
+
+        name = _clean_entry(catalog, name)
+
+        save_name = _save_name(catalog, name)
+        catalog.journal_entries(bury=True, final=True)
+        # Stubs hold references to the catalog, only pass back plain data.
+        stubs.append((oname, name, save_name, json.loads(
+            json.dumps(catalog.entries[name]),
+            object_pairs_hook=OrderedDict)))
+
+    bibauthors = {x: catalog.bibauthor_dict[x]
+                  for x in catalog.bibauthor_dict if x not in old_bibcodes}
+    extinctions = {x: catalog.extinctions_dict[x]
+                   for x in catalog.extinctions_dict
+                   if x not in old_extinctions}
+    return stubs, bibauthors, extinctions
+
+
+def _replace_stub(catalog, oname, name, data):
+    """Replace the stub of a cleaned entry with the one from a worker."""
+    stub = catalog.proto(catalog=catalog, name=name, stub=True)
+    for key in data:
+        if key != stub._KEYS.NAME:
+            stub[key] = data[key]
+    if oname in catalog.entries:
+        del catalog.entries[oname]
+    catalog.entries[name] = stub
+    return
+
+
+def _clean_entry(catalog, name):
+    """Set preferred name of and derive quantities for a single entry.
+
+    Returns the (possibly changed) name of the entry.
+    """
+    # Set the preferred name, switching to that name if name changed.
+    name = catalog.entries[name].set_preferred_name()
+
+    aliases = catalog.entries[name].get_aliases()
+    catalog.entries[name].purge_bandless_photometry()
+    catalog.entries[name].set_first_max_light()
+
+    if SUPERNOVA.DISCOVER_DATE not in catalog.entries[name]:
+        prefixes = ['MLS', 'SSS', 'CSS', 'GRB ']
+        for alias in aliases:
+            for prefix in prefixes:
+                if (alias.startswith(prefix) and
+                        is_number(alias.replace(prefix, '')[:2])):
+                    discoverdate = ('/'.join([
+                        '20' + alias.replace(prefix, '')[:2],
+                        alias.replace(prefix, '')[2:4],
+                        alias.replace(prefix, '')[4:6]
+                    ]))
+                    if catalog.args.verbose:
+                        tprint('Added discoverdate from name [' + alias +
+                               ']: ' + discoverdate)
+                    source = catalog.entries[name].add_self_source()
+                    catalog.entries[name].add_quantity(
+                        SUPERNOVA.DISCOVER_DATE,
+                        discoverdate,
+                        source,
+                        derived=True)
                     break
-        if SUPERNOVA.DISCOVER_DATE not in catalog.entries[name]:
-            prefixes = [
-                'ASASSN-', 'PS1-', 'PS1', 'PS', 'iPTF', 'PTF', 'SCP-', 'SNLS-',
-                'SPIRITS', 'LSQ', 'DES', 'SNHiTS', 'Gaia', 'GND', 'GNW', 'GSD',
-                'GSW', 'EGS', 'COS', 'OGLE', 'HST'
-            ]
-            for alias in aliases:
-                for prefix in prefixes:
-                    if (alias.startswith(prefix) and
-                            is_number(alias.replace(prefix, '')[:2]) and
-                            is_number(alias.replace(prefix, '')[:1])):
-                        discoverdate = '20' + alias.replace(prefix, '')[:2]
-                        if catalog.args.verbose:
-                            tprint('Added discoverdate from name [' + alias +
-                                   ']: ' + discoverdate)
-                        source = catalog.entries[name].add_self_source()
-                        catalog.entries[name].add_quantity(
-                            SUPERNOVA.DISCOVER_DATE,
-                            discoverdate,
-                            source,
-                            derived=True)
-                        break
-                if SUPERNOVA.DISCOVER_DATE in catalog.entries[name]:
+            if SUPERNOVA.DISCOVER_DATE in catalog.entries[name]:
+                break
+    if SUPERNOVA.DISCOVER_DATE not in catalog.entries[name]:
+        prefixes = [
+            'ASASSN-', 'PS1-', 'PS1', 'PS', 'iPTF', 'PTF', 'SCP-', 'SNLS-',
+            'SPIRITS', 'LSQ', 'DES', 'SNHiTS', 'Gaia', 'GND', 'GNW', 'GSD',
+            'GSW', 'EGS', 'COS', 'OGLE', 'HST'
+        ]
+        for alias in aliases:
+            for prefix in prefixes:
+                if (alias.startswith(prefix) and
+                        is_number(alias.replace(prefix, '')[:2]) and
+                        is_number(alias.replace(prefix, '')[:1])):
+                    discoverdate = '20' + alias.replace(prefix, '')[:2]
+                    if catalog.args.verbose:
+                        tprint('Added discoverdate from name [' + alias +
+                               ']: ' + discoverdate)
+                    source = catalog.entries[name].add_self_source()
+                    catalog.entries[name].add_quantity(
+                        SUPERNOVA.DISCOVER_DATE,
+                        discoverdate,
+                        source,
+                        derived=True)
                     break
-        if SUPERNOVA.DISCOVER_DATE not in catalog.entries[name]:
-            prefixes = ['SNF']
-            for alias in aliases:
-                for prefix in prefixes:
-                    if (alias.startswith(prefix) and
-                            is_number(alias.replace(prefix, '')[:4])):
-                        discoverdate = ('/'.join([
-                            alias.replace(prefix, '')[:4],
-                            alias.replace(prefix, '')[4:6],
-                            alias.replace(prefix, '')[6:8]
-                        ]))
-                        if catalog.args.verbose:
-                            tprint('Added discoverdate from name [' + alias +
-                                   ']: ' + discoverdate)
-                        source = catalog.entries[name].add_self_source()
-                        catalog.entries[name].add_quantity(
-                            SUPERNOVA.DISCOVER_DATE,
-                            discoverdate,
-                            source,
-                            derived=True)
-                        break
-                if SUPERNOVA.DISCOVER_DATE in catalog.entries[name]:
+            if SUPERNOVA.DISCOVER_DATE in catalog.entries[name]:
+                break
+    if SUPERNOVA.DISCOVER_DATE not in catalog.entries[name]:
+        prefixes = ['SNF']
+        for alias in aliases:
+            for prefix in prefixes:
+                if (alias.startswith(prefix) and
+                        is_number(alias.replace(prefix, '')[:4])):
+                    discoverdate = ('/'.join([
+                        alias.replace(prefix, '')[:4],
+                        alias.replace(prefix, '')[4:6],
+                        alias.replace(prefix, '')[6:8]
+                    ]))
+                    if catalog.args.verbose:
+                        tprint('Added discoverdate from name [' + alias +
+                               ']: ' + discoverdate)
+                    source = catalog.entries[name].add_self_source()
+                    catalog.entries[name].add_quantity(
+                        SUPERNOVA.DISCOVER_DATE,
+                        discoverdate,
+                        source,
+                        derived=True)
+                    break
+            if SUPERNOVA.DISCOVER_DATE in catalog.entries[name]:
+                break
+    if SUPERNOVA.DISCOVER_DATE not in catalog.entries[name]:
+        prefixes = ['PTFS', 'SNSDF']
+        for alias in aliases:
+            for prefix in prefixes:
+                if (alias.startswith(prefix) and
+                        is_number(alias.replace(prefix, '')[:2])):
+                    discoverdate = ('/'.join([
+                        '20' + alias.replace(prefix, '')[:2],
+                        alias.replace(prefix, '')[2:4]
+                    ]))
+                    if catalog.args.verbose:
+                        tprint('Added discoverdate from name [' + alias +
+                               ']: ' + discoverdate)
+                    source = catalog.entries[name].add_self_source()
+                    catalog.entries[name].add_quantity(
+                        SUPERNOVA.DISCOVER_DATE,
+                        discoverdate,
+                        source,
+                        derived=True)
                     break
-        if SUPERNOVA.DISCOVER_DATE not in catalog.entries[name]:
-            prefixes = ['PTFS', 'SNSDF']
-            for alias in aliases:
-                for prefix in prefixes:
-                    if (alias.startswith(prefix) and
-                            is_number(alias.replace(prefix, '')[:2])):
-                        discoverdate = ('/'.join([
-                            '20' + alias.replace(prefix, '')[:2],
-                            alias.replace(prefix, '')[2:4]
-                        ]))
+            if SUPERNOVA.DISCOVER_DATE in catalog.entries[name]:
+                break
+    if SUPERNOVA.DISCOVER_DATE not in catalog.entries[name]:
+        prefixes = ['AT', 'SN', 'OGLE-', 'SM ', 'KSN']
+        for alias in aliases:
+            for prefix in prefixes:
+                if alias.startswith(prefix):
+                    year = re.findall(r'\d+', alias)
+                    if len(year) == 1:
+                        year = year[0]
+                    else:
+                        continue
+                    if alias.replace(prefix, '').index(year) != 0:
+                        continue
+                    if (year and is_number(year) and '.' not in year and
+                            len(year) <= 4):
+                        discoverdate = year
                         if catalog.args.verbose:
-                            tprint('Added discoverdate from name [' + alias +
-                                   ']: ' + discoverdate)
+                            tprint('Added discoverdate from name [' +
+                                   alias + ']: ' + discoverdate)
                         source = catalog.entries[name].add_self_source()
                         catalog.entries[name].add_quantity(
                             SUPERNOVA.DISCOVER_DATE,
@@ -134,115 +364,21 @@ def do_cleanup(catalog):
                             source,
                             derived=True)
                         break
-                if SUPERNOVA.DISCOVER_DATE in catalog.entries[name]:
-                    break
-        if SUPERNOVA.DISCOVER_DATE not in catalog.entries[name]:
-            prefixes = ['AT', 'SN', 'OGLE-', 'SM ', 'KSN']
-            for alias in aliases:
-                for prefix in prefixes:
-                    if alias.startswith(prefix):
-                        year = re.findall(r'\d+', alias)
-                        if len(year) == 1:
-                            year = year[0]
-                        else:
-                            continue
-                        if alias.replace(prefix, '').index(year) != 0:
-                            continue
-                        if (year and is_number(year) and '.' not in year and
-                                len(year) <= 4):
-                            discoverdate = year
-                            if catalog.args.verbose:
-                                tprint('Added discoverdate from name [' +
-                                       alias + ']: ' + discoverdate)
-                            source = catalog.entries[name].add_self_source()
-                            catalog.entries[name].add_quantity(
-                                SUPERNOVA.DISCOVER_DATE,
-                                discoverdate,
-                                source,
-                                derived=True)
-                            break
-                if SUPERNOVA.DISCOVER_DATE in catalog.entries[name]:
-                    break
+            if SUPERNOVA.DISCOVER_DATE in catalog.entries[name]:
+                break
 
-        if (SUPERNOVA.RA not in catalog.entries[name] or
-                SUPERNOVA.DEC not in catalog.entries[name]):
-            prefixes = [
-                'PSN J', 'MASJ', 'CSS', 'SSS', 'MASTER OT J', 'HST J', 'TCP J',
-                'MACS J', '2MASS J', 'EQ J', 'CRTS J', 'SMT J'
-            ]
-            for alias in aliases:
-                for prefix in prefixes:
-                    if (alias.startswith(prefix) and
-                            is_number(alias.replace(prefix, '')[:6])):
-                        noprefix = alias.split(':')[-1].replace(
-                            prefix, '').replace('.', '')
-                        decsign = '+' if '+' in noprefix else '-'
-                        noprefix = noprefix.replace('+', '|').replace('-', '|')
-                        nops = noprefix.split('|')
-                        if len(nops) < 2:
-                            continue
-                        rastr = nops[0]
-                        decstr = nops[1]
-                        ra = ':'.join([rastr[:2], rastr[2:4], rastr[4:6]]) + \
-                            ('.' + rastr[6:] if len(rastr) > 6 else '')
-                        dec = (
-                            decsign + ':'.join(
-                                [decstr[:2], decstr[2:4], decstr[4:6]]) +
-                            ('.' + decstr[6:] if len(decstr) > 6 else ''))
-                        if catalog.args.verbose:
-                            tprint('Added ra/dec from name: ' + ra + ' ' + dec)
-                        source = catalog.entries[name].add_self_source()
-                        catalog.entries[name].add_quantity(
-                            SUPERNOVA.RA, ra, source, derived=True)
-                        catalog.entries[name].add_quantity(
-                            SUPERNOVA.DEC, dec, source, derived=True)
-                        break
-                if SUPERNOVA.RA in catalog.entries[name]:
-                    break
-
-        no_host = (SUPERNOVA.HOST not in catalog.entries[name] or not any([
-            x[QUANTITY.VALUE] == 'Milky Way'
-            for x in catalog.entries[name][SUPERNOVA.HOST]
-        ]))
-        if (SUPERNOVA.RA in catalog.entries[name] and
-                SUPERNOVA.DEC in catalog.entries[name] and no_host):
-            from astroquery.irsa_dust import IrsaDust
-            if name not in catalog.extinctions_dict:
-                try:
-                    ra_dec = catalog.entries[name][
-                        SUPERNOVA.RA][0][QUANTITY.VALUE] + \
-                        " " + \
-                        catalog.entries[name][SUPERNOVA.DEC][0][QUANTITY.VALUE]
-                    result = IrsaDust.get_query_table(ra_dec, section='ebv')
-                except (KeyboardInterrupt, SystemExit):
-                    raise
-                except Exception:
-                    warnings.warn("Coordinate lookup for " + name +
-                                  " failed in IRSA.")
-                else:
-                    ebv = result['ext SandF mean'][0]
-                    ebverr = result['ext SandF std'][0]
-                    catalog.extinctions_dict[name] = [ebv, ebverr]
-            if name in catalog.extinctions_dict:
-                sources = uniq_cdl([
-                    catalog.entries[name].add_self_source(),
-                    catalog.entries[name]
-                    .add_source(bibcode='2011ApJ...737..103S')
-                ])
-                (catalog.entries[name].add_quantity(
-                    SUPERNOVA.EBV,
-                    str(catalog.extinctions_dict[name][0]),
-                    sources,
-                    e_value=str(catalog.extinctions_dict[name][1]),
-                    derived=True))
-        if ((SUPERNOVA.HOST in catalog.entries[name] and
-             (SUPERNOVA.HOST_RA not in catalog.entries[name] or
-              SUPERNOVA.HOST_DEC not in catalog.entries[name]))):
-            for host in catalog.entries[name][SUPERNOVA.HOST]:
-                alias = host[QUANTITY.VALUE]
-                if ' J' in alias and is_number(alias.split(' J')[-1][:6]):
-                    noprefix = alias.split(' J')[-1].split(':')[-1].replace(
-                        '.', '')
+    if (SUPERNOVA.RA not in catalog.entries[name] or
+            SUPERNOVA.DEC not in catalog.entries[name]):
+        prefixes = [
+            'PSN J', 'MASJ', 'CSS', 'SSS', 'MASTER OT J', 'HST J', 'TCP J',
+            'MACS J', '2MASS J', 'EQ J', 'CRTS J', 'SMT J'
+        ]
+        for alias in aliases:
+            for prefix in prefixes:
+                if (alias.startswith(prefix) and
+                        is_number(alias.replace(prefix, '')[:6])):
+                    noprefix = alias.split(':')[-1].replace(
+                        prefix, '').replace('.', '')
                     decsign = '+' if '+' in noprefix else '-'
                     noprefix = noprefix.replace('+', '|').replace('-', '|')
                     nops = noprefix.split('|')
@@ -250,324 +386,369 @@ def do_cleanup(catalog):
                         continue
                     rastr = nops[0]
                     decstr = nops[1]
-                    hostra = (':'.join([rastr[:2], rastr[2:4], rastr[4:6]]) +
-                              ('.' + rastr[6:] if len(rastr) > 6 else ''))
-                    hostdec = decsign + ':'.join([
-                        decstr[:2], decstr[2:4], decstr[4:6]
-                    ]) + ('.' + decstr[6:] if len(decstr) > 6 else '')
+                    ra = ':'.join([rastr[:2], rastr[2:4], rastr[4:6]]) + \
+                        ('.' + rastr[6:] if len(rastr) > 6 else '')
+                    dec = (
+                        decsign + ':'.join(
+                            [decstr[:2], decstr[2:4], decstr[4:6]]) +
+                        ('.' + decstr[6:] if len(decstr) > 6 else ''))
                     if catalog.args.verbose:
-                        tprint('Added hostra/hostdec from name: ' + hostra +
-                               ' ' + hostdec)
+                        tprint('Added ra/dec from name: ' + ra + ' ' + dec)
                     source = catalog.entries[name].add_self_source()
                     catalog.entries[name].add_quantity(
-                        SUPERNOVA.HOST_RA, hostra, source, derived=True)
+                        SUPERNOVA.RA, ra, source, derived=True)
                     catalog.entries[name].add_quantity(
-                        SUPERNOVA.HOST_DEC, hostdec, source, derived=True)
-                    break
-                if SUPERNOVA.HOST_RA in catalog.entries[name]:
+                        SUPERNOVA.DEC, dec, source, derived=True)
                     break
+            if SUPERNOVA.RA in catalog.entries[name]:
+                break
 
-        if (SUPERNOVA.REDSHIFT not in catalog.entries[name] and
-                SUPERNOVA.VELOCITY in catalog.entries[name]):
-            # Find the "best" velocity to use for this
-            bestsig = 0
-            for hv in catalog.entries[name][SUPERNOVA.VELOCITY]:
-                sig = get_sig_digits(hv[QUANTITY.VALUE])
-                if sig > bestsig:
-                    besthv = hv[QUANTITY.VALUE]
-                    bestsrc = hv['source']
-                    bestsig = sig
-            if bestsig > 0 and is_number(besthv):
-                voc = float(besthv) * 1.e5 / CLIGHT
+    no_host = (SUPERNOVA.HOST not in catalog.entries[name] or not any([
+        x[QUANTITY.VALUE] == 'Milky Way'
+        for x in catalog.entries[name][SUPERNOVA.HOST]
+    ]))
+    if (SUPERNOVA.RA in catalog.entries[name] and
+            SUPERNOVA.DEC in catalog.entries[name] and no_host):
+        extinction = catalog.get_extinction(name)
+        if extinction is not None:
+            sources = uniq_cdl([
+                catalog.entries[name].add_self_source(),
+                catalog.entries[name]
+                .add_source(bibcode='2011ApJ...737..103S')
+            ])
+            (catalog.entries[name].add_quantity(
+                SUPERNOVA.EBV,
+                str(extinction[0]),
+                sources,
+                e_value=str(extinction[1]),
+                derived=True))
+    if ((SUPERNOVA.HOST in catalog.entries[name] and
+         (SUPERNOVA.HOST_RA not in catalog.entries[name] or
+          SUPERNOVA.HOST_DEC not in catalog.entries[name]))):
+        for host in catalog.entries[name][SUPERNOVA.HOST]:
+            alias = host[QUANTITY.VALUE]
+            if ' J' in alias and is_number(alias.split(' J')[-1][:6]):
+                noprefix = alias.split(' J')[-1].split(':')[-1].replace(
+                    '.', '')
+                decsign = '+' if '+' in noprefix else '-'
+                noprefix = noprefix.replace('+', '|').replace('-', '|')
+                nops = noprefix.split('|')
+                if len(nops) < 2:
+                    continue
+                rastr = nops[0]
+                decstr = nops[1]
+                hostra = (':'.join([rastr[:2], rastr[2:4], rastr[4:6]]) +
+                          ('.' + rastr[6:] if len(rastr) > 6 else ''))
+                hostdec = decsign + ':'.join([
+                    decstr[:2], decstr[2:4], decstr[4:6]
+                ]) + ('.' + decstr[6:] if len(decstr) > 6 else '')
+                if catalog.args.verbose:
+                    tprint('Added hostra/hostdec from name: ' + hostra +
+                           ' ' + hostdec)
                 source = catalog.entries[name].add_self_source()
-                sources = uniq_cdl([source] + bestsrc.split(','))
-                (catalog.entries[name].add_quantity(
-                    SUPERNOVA.REDSHIFT,
-                    pretty_num(
-                        sqrt((1. + voc) / (1. - voc)) - 1., sig=bestsig),
-                    sources,
-                    kind='heliocentric',
-                    derived=True))
-        if (SUPERNOVA.REDSHIFT not in catalog.entries[name] and
-                len(catalog.nedd_dict) > 0 and
-                SUPERNOVA.HOST in catalog.entries[name]):
-            reference = "NED-D"
-            refurl = "http://ned.ipac.caltech.edu/Library/Distances/"
-            refbib = "1991ASSL..171...89H"
-            for host in catalog.entries[name][SUPERNOVA.HOST]:
-                if host[QUANTITY.VALUE] in catalog.nedd_dict:
-                    source = catalog.entries[name].add_source(
-                        bibcode='2016A&A...594A..13P')
-                    secondarysource = catalog.entries[name].add_source(
-                        name=reference, url=refurl, bibcode=refbib,
-                        secondary=True)
-                    meddist = statistics.median(catalog.nedd_dict[host[
-                        QUANTITY.VALUE]])
-                    redz = z_at_value(cosmo.comoving_distance,
-                                      float(meddist) * un.Mpc)
-                    redshift = pretty_num(
-                        redz, sig=get_sig_digits(str(meddist)))
-                    catalog.entries[name].add_quantity(
-                        [SUPERNOVA.REDSHIFT, SUPERNOVA.HOST_REDSHIFT],
-                        redshift,
-                        uniq_cdl([source, secondarysource]),
-                        kind='host',
-                        derived=True)
-        if (SUPERNOVA.MAX_ABS_MAG not in catalog.entries[name] and
-                SUPERNOVA.MAX_APP_MAG in catalog.entries[name] and
-                SUPERNOVA.LUM_DIST in catalog.entries[name]):
-            # Find the "best" distance to use for this
-            bestsig = 0
-            for ld in catalog.entries[name][SUPERNOVA.LUM_DIST]:
-                sig = get_sig_digits(ld[QUANTITY.VALUE])
-                if sig > bestsig:
-                    bestld = ld[QUANTITY.VALUE]
-                    bestsrc = ld[QUANTITY.SOURCE]
-                    bestsig = sig
-            if bestsig > 0 and is_number(bestld) and float(bestld) > 0.:
-                source = catalog.entries[name].add_self_source()
-                sources = uniq_cdl([source] + bestsrc.split(','))
-                bestldz = z_at_value(cosmo.luminosity_distance,
-                                     float(bestld) * un.Mpc)
-                pnum = (
-                    float(catalog.entries[name][SUPERNOVA.MAX_APP_MAG][0][
-                        QUANTITY.VALUE]) - 5.0 *
-                    (log10(float(bestld) * 1.0e6) - 1.0
-                     ) + 2.5 * log10(1.0 + bestldz))
-                pnum = pretty_num(pnum, sig=bestsig + 1)
                 catalog.entries[name].add_quantity(
-                    SUPERNOVA.MAX_ABS_MAG, pnum, sources, derived=True)
-        if (SUPERNOVA.MAX_VISUAL_ABS_MAG not in catalog.entries[name] and
-                SUPERNOVA.MAX_VISUAL_APP_MAG in catalog.entries[name] and
-                SUPERNOVA.LUM_DIST in catalog.entries[name]):
-            # Find the "best" distance to use for this
-            bestsig = 0
-            for ld in catalog.entries[name][SUPERNOVA.LUM_DIST]:
-                sig = get_sig_digits(ld[QUANTITY.VALUE])
-                if sig > bestsig:
-                    bestld = ld[QUANTITY.VALUE]
-                    bestsrc = ld[QUANTITY.SOURCE]
-                    bestsig = sig
-            if bestsig > 0 and is_number(bestld) and float(bestld) > 0.:
+                    SUPERNOVA.HOST_RA, hostra, source, derived=True)
+                catalog.entries[name].add_quantity(
+                    SUPERNOVA.HOST_DEC, hostdec, source, derived=True)
+                break
+            if SUPERNOVA.HOST_RA in catalog.entries[name]:
+                break
+
+    if (SUPERNOVA.REDSHIFT not in catalog.entries[name] and
+            SUPERNOVA.VELOCITY in catalog.entries[name]):
+        # Find the "best" velocity to use for this
+        bestsig = 0
+        for hv in catalog.entries[name][SUPERNOVA.VELOCITY]:
+            sig = get_sig_digits(hv[QUANTITY.VALUE])
+            if sig > bestsig:
+                besthv = hv[QUANTITY.VALUE]
+                bestsrc = hv['source']
+                bestsig = sig
+        if bestsig > 0 and is_number(besthv):
+            voc = float(besthv) * 1.e5 / CLIGHT
+            source = catalog.entries[name].add_self_source()
+            sources = uniq_cdl([source] + bestsrc.split(','))
+            (catalog.entries[name].add_quantity(
+                SUPERNOVA.REDSHIFT,
+                pretty_num(
+                    sqrt((1. + voc) / (1. - voc)) - 1., sig=bestsig),
+                sources,
+                kind='heliocentric',
+                derived=True))
+    if (SUPERNOVA.REDSHIFT not in catalog.entries[name] and
+            len(catalog.nedd_dict) > 0 and
+            SUPERNOVA.HOST in catalog.entries[name]):
+        reference = "NED-D"
+        refurl = "http://ned.ipac.caltech.edu/Library/Distances/"
+        refbib = "1991ASSL..171...89H"
+        for host in catalog.entries[name][SUPERNOVA.HOST]:
+            if host[QUANTITY.VALUE] in catalog.nedd_dict:
+                source = catalog.entries[name].add_source(
+                    bibcode='2016A&A...594A..13P')
+                secondarysource = catalog.entries[name].add_source(
+                    name=reference, url=refurl, bibcode=refbib,
+                    secondary=True)
+                meddist = statistics.median(catalog.nedd_dict[host[
+                    QUANTITY.VALUE]])
+                redz = catalog.cosmology.z_at_comoving_distance(
+                    float(meddist))
+                redshift = pretty_num(
+                    redz, sig=get_sig_digits(str(meddist)))
+                catalog.entries[name].add_quantity(
+                    [SUPERNOVA.REDSHIFT, SUPERNOVA.HOST_REDSHIFT],
+                    redshift,
+                    uniq_cdl([source, secondarysource]),
+                    kind='host',
+                    derived=True)
+    if (SUPERNOVA.MAX_ABS_MAG not in catalog.entries[name] and
+            SUPERNOVA.MAX_APP_MAG in catalog.entries[name] and
+            SUPERNOVA.LUM_DIST in catalog.entries[name]):
+        # Find the "best" distance to use for this
+        bestsig = 0
+        for ld in catalog.entries[name][SUPERNOVA.LUM_DIST]:
+            sig = get_sig_digits(ld[QUANTITY.VALUE])
+            if sig > bestsig:
+                bestld = ld[QUANTITY.VALUE]
+                bestsrc = ld[QUANTITY.SOURCE]
+                bestsig = sig
+        if bestsig > 0 and is_number(bestld) and float(bestld) > 0.:
+            source = catalog.entries[name].add_self_source()
+            sources = uniq_cdl([source] + bestsrc.split(','))
+            bestldz = catalog.cosmology.z_at_luminosity_distance(
+                float(bestld))
+            pnum = (
+                float(catalog.entries[name][SUPERNOVA.MAX_APP_MAG][0][
+                    QUANTITY.VALUE]) - 5.0 *
+                (log10(float(bestld) * 1.0e6) - 1.0
+                 ) + 2.5 * log10(1.0 + bestldz))
+            pnum = pretty_num(pnum, sig=bestsig + 1)
+            catalog.entries[name].add_quantity(
+                SUPERNOVA.MAX_ABS_MAG, pnum, sources, derived=True)
+    if (SUPERNOVA.MAX_VISUAL_ABS_MAG not in catalog.entries[name] and
+            SUPERNOVA.MAX_VISUAL_APP_MAG in catalog.entries[name] and
+            SUPERNOVA.LUM_DIST in catalog.entries[name]):
+        # Find the "best" distance to use for this
+        bestsig = 0
+        for ld in catalog.entries[name][SUPERNOVA.LUM_DIST]:
+            sig = get_sig_digits(ld[QUANTITY.VALUE])
+            if sig > bestsig:
+                bestld = ld[QUANTITY.VALUE]
+                bestsrc = ld[QUANTITY.SOURCE]
+                bestsig = sig
+        if bestsig > 0 and is_number(bestld) and float(bestld) > 0.:
+            source = catalog.entries[name].add_self_source()
+            sources = uniq_cdl([source] + bestsrc.split(','))
+            # FIX: what's happening here?!
+            pnum = (
+                float(catalog.entries[name][
+                    SUPERNOVA.MAX_VISUAL_APP_MAG][0][QUANTITY.VALUE]) -
+                5.0 * (log10(float(bestld) * 1.0e6) - 1.0))
+            pnum = pretty_num(pnum, sig=bestsig + 1)
+            catalog.entries[name].add_quantity(
+                SUPERNOVA.MAX_VISUAL_ABS_MAG, pnum, sources, derived=True)
+    if SUPERNOVA.REDSHIFT in catalog.entries[name]:
+        # Find the "best" redshift to use for this
+        bestz, bestkind, bestsig, bestsrc = catalog.entries[
+            name].get_best_redshift()
+        if bestsig > 0:
+            try:
+                bestz = float(bestz)
+            except Exception:
+                print(catalog.entries[name])
+                raise
+            if SUPERNOVA.VELOCITY not in catalog.entries[name]:
                 source = catalog.entries[name].add_self_source()
-                sources = uniq_cdl([source] + bestsrc.split(','))
                 # FIX: what's happening here?!
-                pnum = (
-                    float(catalog.entries[name][
-                        SUPERNOVA.MAX_VISUAL_APP_MAG][0][QUANTITY.VALUE]) -
-                    5.0 * (log10(float(bestld) * 1.0e6) - 1.0))
-                pnum = pretty_num(pnum, sig=bestsig + 1)
+                pnum = CLIGHT / KM * \
+                    ((bestz + 1.)**2. - 1.) / ((bestz + 1.)**2. + 1.)
+                pnum = pretty_num(pnum, sig=bestsig)
                 catalog.entries[name].add_quantity(
-                    SUPERNOVA.MAX_VISUAL_ABS_MAG, pnum, sources, derived=True)
-        if SUPERNOVA.REDSHIFT in catalog.entries[name]:
-            # Find the "best" redshift to use for this
-            bestz, bestkind, bestsig, bestsrc = catalog.entries[
-                name].get_best_redshift()
-            if bestsig > 0:
-                try:
-                    bestz = float(bestz)
-                except Exception:
-                    print(catalog.entries[name])
-                    raise
-                if SUPERNOVA.VELOCITY not in catalog.entries[name]:
-                    source = catalog.entries[name].add_self_source()
-                    # FIX: what's happening here?!
-                    pnum = CLIGHT / KM * \
-                        ((bestz + 1.)**2. - 1.) / ((bestz + 1.)**2. + 1.)
-                    pnum = pretty_num(pnum, sig=bestsig)
+                    SUPERNOVA.VELOCITY,
+                    pnum,
+                    source,
+                    kind=(SUPERNOVA.VELOCITY.kind_preference[bestkind]
+                          if bestkind else ''))
+            if bestz > 0.:
+                if SUPERNOVA.LUM_DIST not in catalog.entries[name]:
+                    dl = catalog.cosmology.luminosity_distance(bestz)
+                    sources = [
+                        catalog.entries[name].add_self_source(),
+                        catalog.entries[name]
+                        .add_source(bibcode='2016A&A...594A..13P')
+                    ]
+                    sources = uniq_cdl(sources + bestsrc.split(','))
                     catalog.entries[name].add_quantity(
-                        SUPERNOVA.VELOCITY,
-                        pnum,
-                        source,
-                        kind=(SUPERNOVA.VELOCITY.kind_preference[bestkind]
-                              if bestkind else ''))
-                if bestz > 0.:
-                    if SUPERNOVA.LUM_DIST not in catalog.entries[name]:
-                        dl = cosmo.luminosity_distance(bestz)
-                        sources = [
-                            catalog.entries[name].add_self_source(),
-                            catalog.entries[name]
-                            .add_source(bibcode='2016A&A...594A..13P')
-                        ]
-                        sources = uniq_cdl(sources + bestsrc.split(','))
+                        SUPERNOVA.LUM_DIST,
+                        pretty_num(
+                            dl, sig=bestsig + 1),
+                        sources,
+                        kind=(SUPERNOVA.LUM_DIST.kind_preference[bestkind]
+                              if bestkind else ''),
+                        derived=True)
+                    if (SUPERNOVA.MAX_ABS_MAG not in
+                        catalog.entries[name] and SUPERNOVA.MAX_APP_MAG in
+                            catalog.entries[name]):
+                        source = catalog.entries[name].add_self_source()
+                        pnum = pretty_num(
+                            float(catalog.entries[name][
+                                SUPERNOVA.MAX_APP_MAG][0][QUANTITY.VALUE])
+                            - 5.0 * (log10(dl * 1.0e6) - 1.0
+                                     ) + 2.5 * log10(1.0 + bestz),
+                            sig=bestsig + 1)
                         catalog.entries[name].add_quantity(
-                            SUPERNOVA.LUM_DIST,
-                            pretty_num(
-                                dl.value, sig=bestsig + 1),
+                            SUPERNOVA.MAX_ABS_MAG,
+                            pnum,
                             sources,
-                            kind=(SUPERNOVA.LUM_DIST.kind_preference[bestkind]
-                                  if bestkind else ''),
                             derived=True)
-                        if (SUPERNOVA.MAX_ABS_MAG not in
-                            catalog.entries[name] and SUPERNOVA.MAX_APP_MAG in
-                                catalog.entries[name]):
-                            source = catalog.entries[name].add_self_source()
-                            pnum = pretty_num(
-                                float(catalog.entries[name][
-                                    SUPERNOVA.MAX_APP_MAG][0][QUANTITY.VALUE])
-                                - 5.0 * (log10(dl.to('pc').value) - 1.0
-                                         ) + 2.5 * log10(1.0 + bestz),
-                                sig=bestsig + 1)
-                            catalog.entries[name].add_quantity(
-                                SUPERNOVA.MAX_ABS_MAG,
-                                pnum,
-                                sources,
-                                derived=True)
-                        if (SUPERNOVA.MAX_VISUAL_ABS_MAG not in
-                                catalog.entries[name] and
-                                SUPERNOVA.MAX_VISUAL_APP_MAG in
-                                catalog.entries[name]):
-                            source = catalog.entries[name].add_self_source()
-                            pnum = pretty_num(
-                                float(catalog.entries[name][
-                                    SUPERNOVA.MAX_VISUAL_APP_MAG][0][
-                                        QUANTITY.VALUE]) - 5.0 *
-                                (log10(dl.to('pc').value) - 1.0),
-                                sig=bestsig + 1)
-                            catalog.entries[name].add_quantity(
-                                SUPERNOVA.MAX_VISUAL_ABS_MAG,
-                                pnum,
-                                sources,
-                                derived=True)
-                    if SUPERNOVA.COMOVING_DIST not in catalog.entries[name]:
-                        cd = cosmo.comoving_distance(bestz)
-                        sources = [
-                            catalog.entries[name].add_self_source(),
-                            catalog.entries[name]
-                            .add_source(bibcode='2016A&A...594A..13P')
-                        ]
-                        sources = uniq_cdl(sources + bestsrc.split(','))
+                    if (SUPERNOVA.MAX_VISUAL_ABS_MAG not in
+                            catalog.entries[name] and
+                            SUPERNOVA.MAX_VISUAL_APP_MAG in
+                            catalog.entries[name]):
+                        source = catalog.entries[name].add_self_source()
+                        pnum = pretty_num(
+                            float(catalog.entries[name][
+                                SUPERNOVA.MAX_VISUAL_APP_MAG][0][
+                                    QUANTITY.VALUE]) - 5.0 *
+                            (log10(dl * 1.0e6) - 1.0),
+                            sig=bestsig + 1)
                         catalog.entries[name].add_quantity(
-                            SUPERNOVA.COMOVING_DIST,
-                            pretty_num(
-                                cd.value, sig=bestsig),
+                            SUPERNOVA.MAX_VISUAL_ABS_MAG,
+                            pnum,
                             sources,
                             derived=True)
-        if SUPERNOVA.HOST_REDSHIFT in catalog.entries[name]:
-            # Find the "best" redshift to use for this
-            bestz, bestkind, bestsig, bestsrc = catalog.entries[
-                name].get_best_redshift(SUPERNOVA.HOST_REDSHIFT)
-            if bestsig > 0:
-                try:
-                    bestz = float(bestz)
-                except Exception:
-                    print(catalog.entries[name])
-                    raise
-                if SUPERNOVA.HOST_VELOCITY not in catalog.entries[name]:
-                    source = catalog.entries[name].add_self_source()
-                    # FIX: what's happening here?!
-                    pnum = CLIGHT / KM * \
-                        ((bestz + 1.)**2. - 1.) / ((bestz + 1.)**2. + 1.)
-                    pnum = pretty_num(pnum, sig=bestsig)
+                if SUPERNOVA.COMOVING_DIST not in catalog.entries[name]:
+                    cd = catalog.cosmology.comoving_distance(bestz)
+                    sources = [
+                        catalog.entries[name].add_self_source(),
+                        catalog.entries[name]
+                        .add_source(bibcode='2016A&A...594A..13P')
+                    ]
+                    sources = uniq_cdl(sources + bestsrc.split(','))
                     catalog.entries[name].add_quantity(
-                        SUPERNOVA.HOST_VELOCITY,
-                        pnum,
-                        source,
-                        kind=(SUPERNOVA.HOST_VELOCITY.kind_preference[bestkind]
-                              if bestkind else ''))
-                if bestz > 0.:
-                    if SUPERNOVA.HOST_LUM_DIST not in catalog.entries[name]:
-                        dl = cosmo.luminosity_distance(bestz)
-                        sources = [
-                            catalog.entries[name].add_self_source(),
-                            catalog.entries[name]
-                            .add_source(bibcode='2016A&A...594A..13P')
-                        ]
-                        sources = uniq_cdl(sources + bestsrc.split(','))
-                        catalog.entries[name].add_quantity(
-                            SUPERNOVA.HOST_LUM_DIST,
-                            pretty_num(
-                                dl.value, sig=bestsig + 1),
-                            sources,
-                            kind=(SUPERNOVA.HOST_LUM_DIST.kind_preference[
-                                bestkind] if bestkind else ''),
-                            derived=True)
-                    if SUPERNOVA.HOST_COMOVING_DIST not in catalog.entries[
-                            name]:
-                        cd = cosmo.comoving_distance(bestz)
-                        sources = [
-                            catalog.entries[name].add_self_source(),
-                            catalog.entries[name]
-                            .add_source(bibcode='2016A&A...594A..13P')
-                        ]
-                        sources = uniq_cdl(sources + bestsrc.split(','))
-                        catalog.entries[name].add_quantity(
-                            SUPERNOVA.HOST_COMOVING_DIST,
-                            pretty_num(
-                                cd.value, sig=bestsig),
-                            sources,
-                            derived=True)
-        if all([
-                x in catalog.entries[name]
-                for x in [
-                    SUPERNOVA.RA, SUPERNOVA.DEC, SUPERNOVA.HOST_RA,
-                    SUPERNOVA.HOST_DEC
-                ]
-        ]):
-            # For now just using first coordinates that appear in entry
+                        SUPERNOVA.COMOVING_DIST,
+                        pretty_num(
+                            cd, sig=bestsig),
+                        sources,
+                        derived=True)
+    if SUPERNOVA.HOST_REDSHIFT in catalog.entries[name]:
+        # Find the "best" redshift to use for this
+        bestz, bestkind, bestsig, bestsrc = catalog.entries[
+            name].get_best_redshift(SUPERNOVA.HOST_REDSHIFT)
+        if bestsig > 0:
             try:
-                c1 = coord(
-                    ra=catalog.entries[name][SUPERNOVA.RA][0][QUANTITY.VALUE],
-                    dec=catalog.entries[name][SUPERNOVA.DEC][0][
-                        QUANTITY.VALUE],
-                    unit=(un.hourangle, un.deg))
-                c2 = coord(
-                    ra=catalog.entries[name][SUPERNOVA.HOST_RA][0][
-                        QUANTITY.VALUE],
-                    dec=catalog.entries[name][SUPERNOVA.HOST_DEC][0][
-                        QUANTITY.VALUE],
-                    unit=(un.hourangle, un.deg))
-            except (KeyboardInterrupt, SystemExit):
-                raise
+                bestz = float(bestz)
             except Exception:
-                pass
-            else:
-                sources = uniq_cdl(
-                    [catalog.entries[name].add_self_source()] + catalog.
-                    entries[name][SUPERNOVA.RA][0][QUANTITY.SOURCE].split(',')
-                    + catalog.entries[name][SUPERNOVA.DEC][0][QUANTITY.SOURCE]
-                    .split(',') + catalog.entries[name][SUPERNOVA.HOST_RA][0][
-                        QUANTITY.SOURCE].split(',') + catalog.entries[name][
-                            SUPERNOVA.HOST_DEC][0][QUANTITY.SOURCE].split(','))
-                if SUPERNOVA.HOST_OFFSET_ANG not in catalog.entries[name]:
-                    hosa = Decimal(c1.separation(c2).arcsecond)
-                    hosa = pretty_num(hosa)
+                print(catalog.entries[name])
+                raise
+            if SUPERNOVA.HOST_VELOCITY not in catalog.entries[name]:
+                source = catalog.entries[name].add_self_source()
+                # FIX: what's happening here?!
+                pnum = CLIGHT / KM * \
+                    ((bestz + 1.)**2. - 1.) / ((bestz + 1.)**2. + 1.)
+                pnum = pretty_num(pnum, sig=bestsig)
+                catalog.entries[name].add_quantity(
+                    SUPERNOVA.HOST_VELOCITY,
+                    pnum,
+                    source,
+                    kind=(SUPERNOVA.HOST_VELOCITY.kind_preference[bestkind]
+                          if bestkind else ''))
+            if bestz > 0.:
+                if SUPERNOVA.HOST_LUM_DIST not in catalog.entries[name]:
+                    dl = catalog.cosmology.luminosity_distance(bestz)
+                    sources = [
+                        catalog.entries[name].add_self_source(),
+                        catalog.entries[name]
+                        .add_source(bibcode='2016A&A...594A..13P')
+                    ]
+                    sources = uniq_cdl(sources + bestsrc.split(','))
                     catalog.entries[name].add_quantity(
-                        SUPERNOVA.HOST_OFFSET_ANG,
-                        hosa,
+                        SUPERNOVA.HOST_LUM_DIST,
+                        pretty_num(
+                            dl, sig=bestsig + 1),
                         sources,
-                        derived=True,
-                        u_value='arcseconds')
-                if (SUPERNOVA.COMOVING_DIST in catalog.entries[name] and
-                        SUPERNOVA.REDSHIFT in catalog.entries[name] and
-                        SUPERNOVA.HOST_OFFSET_DIST not in
-                        catalog.entries[name]):
-                    offsetsig = get_sig_digits(catalog.entries[name][
-                        SUPERNOVA.HOST_OFFSET_ANG][0][QUANTITY.VALUE])
-                    sources = uniq_cdl(
-                        sources.split(',') + (catalog.entries[name][
-                            SUPERNOVA.COMOVING_DIST][0][QUANTITY.SOURCE]).
-                        split(',') + (catalog.entries[name][SUPERNOVA.REDSHIFT]
-                                      [0][QUANTITY.SOURCE]).split(','))
-                    (catalog.entries[name].add_quantity(
-                        SUPERNOVA.HOST_OFFSET_DIST,
+                        kind=(SUPERNOVA.HOST_LUM_DIST.kind_preference[
+                            bestkind] if bestkind else ''),
+                        derived=True)
+                if SUPERNOVA.HOST_COMOVING_DIST not in catalog.entries[
+                        name]:
+                    cd = catalog.cosmology.comoving_distance(bestz)
+                    sources = [
+                        catalog.entries[name].add_self_source(),
+                        catalog.entries[name]
+                        .add_source(bibcode='2016A&A...594A..13P')
+                    ]
+                    sources = uniq_cdl(sources + bestsrc.split(','))
+                    catalog.entries[name].add_quantity(
+                        SUPERNOVA.HOST_COMOVING_DIST,
                         pretty_num(
-                            float(catalog.entries[name][
-                                SUPERNOVA.HOST_OFFSET_ANG][0][QUANTITY.VALUE])
-                            / 3600. * (pi / 180.) *
-                            float(catalog.entries[name][
-                                SUPERNOVA.COMOVING_DIST][0][QUANTITY.VALUE]) *
-                            1000. / (1.0 + float(catalog.entries[name][
-                                SUPERNOVA.REDSHIFT][0][QUANTITY.VALUE])),
-                            sig=offsetsig),
-                        sources))
-
-        catalog.entries[name].sanitize()
-        catalog.journal_entries(bury=True, final=True, gz=True)
-        cleanupcnt = cleanupcnt + 1
-        if catalog.args.travis and cleanupcnt % 1000 == 0:
-            break
+                            cd, sig=bestsig),
+                        sources,
+                        derived=True)
+    if all([
+            x in catalog.entries[name]
+            for x in [
+                SUPERNOVA.RA, SUPERNOVA.DEC, SUPERNOVA.HOST_RA,
+                SUPERNOVA.HOST_DEC
+            ]
+    ]):
+        # For now just using first coordinates that appear in entry
+        try:
+            c1 = coord(
+                ra=catalog.entries[name][SUPERNOVA.RA][0][QUANTITY.VALUE],
+                dec=catalog.entries[name][SUPERNOVA.DEC][0][
+                    QUANTITY.VALUE],
+                unit=(un.hourangle, un.deg))
+            c2 = coord(
+                ra=catalog.entries[name][SUPERNOVA.HOST_RA][0][
+                    QUANTITY.VALUE],
+                dec=catalog.entries[name][SUPERNOVA.HOST_DEC][0][
+                    QUANTITY.VALUE],
+                unit=(un.hourangle, un.deg))
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except Exception:
+            pass
+        else:
+            sources = uniq_cdl(
+                [catalog.entries[name].add_self_source()] + catalog.
+                entries[name][SUPERNOVA.RA][0][QUANTITY.SOURCE].split(',')
+                + catalog.entries[name][SUPERNOVA.DEC][0][QUANTITY.SOURCE]
+                .split(',') + catalog.entries[name][SUPERNOVA.HOST_RA][0][
+                    QUANTITY.SOURCE].split(',') + catalog.entries[name][
+                        SUPERNOVA.HOST_DEC][0][QUANTITY.SOURCE].split(','))
+            if SUPERNOVA.HOST_OFFSET_ANG not in catalog.entries[name]:
+                hosa = Decimal(c1.separation(c2).arcsecond)
+                hosa = pretty_num(hosa)
+                catalog.entries[name].add_quantity(
+                    SUPERNOVA.HOST_OFFSET_ANG,
+                    hosa,
+                    sources,
+                    derived=True,
+                    u_value='arcseconds')
+            if (SUPERNOVA.COMOVING_DIST in catalog.entries[name] and
+                    SUPERNOVA.REDSHIFT in catalog.entries[name] and
+                    SUPERNOVA.HOST_OFFSET_DIST not in
+                    catalog.entries[name]):
+                offsetsig = get_sig_digits(catalog.entries[name][
+                    SUPERNOVA.HOST_OFFSET_ANG][0][QUANTITY.VALUE])
+                sources = uniq_cdl(
+                    sources.split(',') + (catalog.entries[name][
+                        SUPERNOVA.COMOVING_DIST][0][QUANTITY.SOURCE]).
+                    split(',') + (catalog.entries[name][SUPERNOVA.REDSHIFT]
+                                  [0][QUANTITY.SOURCE]).split(','))
+                (catalog.entries[name].add_quantity(
+                    SUPERNOVA.HOST_OFFSET_DIST,
+                    pretty_num(
+                        float(catalog.entries[name][
+                            SUPERNOVA.HOST_OFFSET_ANG][0][QUANTITY.VALUE])
+                        / 3600. * (pi / 180.) *
+                        float(catalog.entries[name][
+                            SUPERNOVA.COMOVING_DIST][0][QUANTITY.VALUE]) *
+                        1000. / (1.0 + float(catalog.entries[name][
+                            SUPERNOVA.REDSHIFT][0][QUANTITY.VALUE])),
+                        sig=offsetsig),
+                    sources))
 
-    catalog.save_caches()
+    catalog.entries[name].sanitize()
 
-    return
+    return name
@@ -8,6 +8,30 @@ from astrocats.catalog.utils import is_number, pbar, round_sig, uniq_cdl
 from ..supernova import SUPERNOVA
 
 
+def _alert_name(name):
+    """Return the entry name of CPCS alert `name`, `None` if not imported."""
+    # Skip aa few weird entries
+    if name == 'ASASSNli':
+        return None
+    # Just use aa whitelist for now since naming seems inconsistent
+    white_list = [
+        'GAIA', 'OGLE', 'ASASSN', 'MASTER', 'OTJ', 'PS1', 'IPTF', 'CSS']
+    if True not in [xx in name.upper() for xx in white_list]:
+        return None
+    name = name.replace('Verif', '').replace('_', ' ')
+    if 'ASASSN' in name and name[6] != '-':
+        name = 'ASASSN-' + name[6:].lower()
+    if 'MASTEROTJ' in name:
+        name = name.replace('MASTEROTJ', 'MASTER OT J')
+    if 'OTJ' in name:
+        name = name.replace('OTJ', 'MASTER OT J')
+    if name.upper().startswith('IPTF'):
+        name = 'iPTF' + name[4:].lower()
+    if name.upper().startswith('PS1'):
+        name = 'PS1' + name[3:].lower()
+    return name
+
+
 def do_cpcs(catalog):
     """Import data from CPCS."""
     task_str = catalog.get_current_task_str()
@@ -21,33 +45,23 @@ def do_cpcs(catalog):
         return
     alertindex = json.loads(jsontxt, object_pairs_hook=OrderedDict)
     ids = [xx['id'] for xx in alertindex]
+    hashtag = '&hashtag=JG_530ad9462a0b8785bfb385614bf178c6'
+    alerturls = ['http://gsaweb.ast.cam.ac.uk/'
+                 'followup/get_alert_lc_data?alert_id=' + str(ai)
+                 for ai in ids]
+    fnames = [os.path.join(catalog.get_current_task_repo(), 'CPCS/alert-') +
+              str(ai).zfill(2) + '.json' for ai in ids]
+    names = [_alert_name(xx['ivorn'].split('/')[-1].strip())
+             for xx in alertindex]
+    catalog.prefetch_urls([
+        (alerturls[ii] + hashtag, fnames[ii]) for ii in range(len(ids))
+        if names[ii] is not None and catalog.entry_exists(names[ii])])
     for ii, ai in enumerate(pbar(ids, task_str)):
-        name = alertindex[ii]['ivorn'].split('/')[-1].strip()
-        # Skip aa few weird entries
-        if name == 'ASASSNli':
-            continue
-        # Just use aa whitelist for now since naming seems inconsistent
-        white_list = [
-            'GAIA', 'OGLE', 'ASASSN', 'MASTER', 'OTJ', 'PS1', 'IPTF', 'CSS']
-        if True in [xx in name.upper() for xx in white_list]:
-            name = name.replace('Verif', '').replace('_', ' ')
-            if 'ASASSN' in name and name[6] != '-':
-                name = 'ASASSN-' + name[6:].lower()
-            if 'MASTEROTJ' in name:
-                name = name.replace('MASTEROTJ', 'MASTER OT J')
-            if 'OTJ' in name:
-                name = name.replace('OTJ', 'MASTER OT J')
-            if name.upper().startswith('IPTF'):
-                name = 'iPTF' + name[4:].lower()
-            if name.upper().startswith('PS1'):
-                name = 'PS1' + name[3:].lower()
-            # Only add events that are classified as SN.
-            if not catalog.entry_exists(name):
-                continue
-            oldname = name
-            name = catalog.add_entry(name)
-        else:
+        # Only add events that are classified as SN.
+        if names[ii] is None or not catalog.entry_exists(names[ii]):
             continue
+        oldname = names[ii]
+        name = catalog.add_entry(oldname)
 
         sec_source = catalog.entries[name].add_source(
             name='Cambridge Photometric Calibration Server',
@@ -67,15 +81,10 @@ def do_cpcs(catalog):
             sec_source,
             u_value=unit_deg)
 
-        alerturl = ('http://gsaweb.ast.cam.ac.uk/'
-                    'followup/get_alert_lc_data?alert_id=' + str(ai))
         source = catalog.entries[name].add_source(
-            name='CPCS Alert ' + str(ai), url=alerturl)
-        fname = os.path.join(catalog.get_current_task_repo(),
-                             'CPCS/alert-') + str(ai).zfill(2) + '.json'
+            name='CPCS Alert ' + str(ai), url=alerturls[ii])
 
-        jsonstr = catalog.load_url(
-            alerturl + '&hashtag=JG_530ad9462a0b8785bfb385614bf178c6', fname)
+        jsonstr = catalog.load_url(alerturls[ii] + hashtag, fnames[ii])
 
         try:
             cpcsalert = json.loads(jsonstr)
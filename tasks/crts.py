@@ -4,31 +4,51 @@ import re
 
 from astrocats.catalog.utils import is_number, pbar
 from astrocats.catalog.photometry import PHOTOMETRY
-from bs4 import BeautifulSoup
 
 from decimal import Decimal
 
+from ..htmltables import page_rows
 from ..supernova import SUPERNOVA
 
 
+def _lightcurve_link(td):
+    """Return the URL of the light curve linked to from cell `td`."""
+    return td.find('a')['onclick'].split("'")[1]
+
+
+def _lightcurve_file(catalog, fold, lclink):
+    """Return the path light curve `lclink` of folder `fold` is cached at."""
+    return (catalog.get_current_task_repo() + '/' + fold + '/' +
+            lclink.split('.')[-2].rstrip('p').split('/')[-1] + '.html')
+
+
 def do_crts(catalog):
     """Import data from the Catalina Real-Time Transient Survey."""
     crtsnameerrors = ['2011ax']
     task_str = catalog.get_current_task_str()
     folders = ['catalina', 'MLS', 'MLS', 'SSS']
     files = ['AllSN.html', 'AllSN.arch.html', 'CRTSII_SN.html', 'AllSN.html']
-    for fi, fold in enumerate(pbar(folders, task_str)):
+    htmls = []
+    for fi, fold in enumerate(folders):
         html = catalog.load_url(
             'http://nesssi.cacr.caltech.edu/' + fold + '/' + files[fi],
             os.path.join(catalog.get_current_task_repo(), 'CRTS', fold + '-' +
                          files[fi]), archived_mode=('arch' in files[fi]))
-        html = html.replace('<ahref=', '<a href=')
-        if not html:
+        htmls.append(html.replace('<ahref=', '<a href='))
+    # Only the pages are parsed in worker processes, the light curves each
+    # row links to are downloaded ahead of the rows being read.
+    pages = page_rows([x for x in htmls if x],
+                      processes=catalog.HTML_PROCESSES)
+    for fi, fold in enumerate(pbar(folders, task_str)):
+        if not htmls[fi]:
             continue
-        bs = BeautifulSoup(html, 'html5lib')
-        trs = bs.findAll('tr')
-        for tri, tr in enumerate(pbar(trs, task_str)):
-            tds = tr.findAll('td')
+        trs = next(pages)
+        lcindex = 8 if files[fi] == 'CRTSII_SN.html' else 11
+        lclinks = [_lightcurve_link(tds[lcindex]) for tds in trs
+                   if len(tds) > lcindex]
+        catalog.prefetch_urls([(xx, _lightcurve_file(catalog, fold, xx))
+                               for xx in lclinks])
+        for tri, tds in enumerate(pbar(trs, task_str)):
             if not tds:
                 continue
             # refs = []
@@ -46,9 +66,8 @@ def do_crts(catalog):
                     ra = td.contents[0]
                 elif tdi == 2:
                     dec = td.contents[0]
-                elif tdi == (8 if files[fi] == 'CRTSII_SN.html' else 11):
-                    lclink = td.find('a')['onclick']
-                    lclink = lclink.split("'")[1]
+                elif tdi == lcindex:
+                    lclink = _lightcurve_link(td)
                 elif tdi == (10 if files[fi] == 'CRTSII_SN.html' else 13):
                     aliases = re.sub('[()]', '', re.sub(
                         '<[^<]+?>', '', td.contents[-1].strip()))
@@ -123,11 +142,8 @@ def do_crts(catalog):
                 }
                 catalog.entries[name].add_photometry(**photodict)
 
-            fname2 = (catalog.get_current_task_repo() + '/' + fold + '/' +
-                      lclink.split('.')[-2].rstrip('p').split('/')[-1] +
-                      '.html')
-
-            html2 = catalog.load_url(lclink, fname2)
+            html2 = catalog.load_url(
+                lclink, _lightcurve_file(catalog, fold, lclink))
             if not html2:
                 continue
 
@@ -114,23 +114,15 @@ def do_donated_photo(catalog):
         oname = path.split('/')[-1].split('_')[0]
         name, source = catalog.new_entry(
             oname, bibcode=metadict[oname]['bibcode'])
-        for row in pbar(data, task_str + ': Nicholl ' + oname):
-            photodict = {
-                PHOTOMETRY.TIME: str(row['MJD']),
-                PHOTOMETRY.U_TIME: 'MJD',
-                PHOTOMETRY.MAGNITUDE: str(row['mag']),
-                PHOTOMETRY.BAND: row['Filter'],
-                PHOTOMETRY.SOURCE: source
-            }
-            if 'system' in metadict[oname]:
-                photodict[PHOTOMETRY.SYSTEM] = metadict[oname]['system']
-            if 'l_mag' in row.columns and row['l_mag'] == '>':
-                photodict[PHOTOMETRY.UPPER_LIMIT] = True
-            elif 'e_mag' in row.columns:
-                photodict[PHOTOMETRY.E_MAGNITUDE] = str(row['e_mag'])
-            if 'Telescope' in row.columns:
-                photodict[PHOTOMETRY.TELESCOPE] = row['Telescope']
-            catalog.entries[name].add_photometry(**photodict)
+        fields = {}
+        if 'system' in metadict[oname]:
+            fields[PHOTOMETRY.SYSTEM] = metadict[oname]['system']
+        columns = {}
+        if 'Telescope' in data.colnames:
+            columns[PHOTOMETRY.TELESCOPE] = 'Telescope'
+        catalog.entries[name].add_photometry_table(
+            data, 'MJD', ['mag'], band='Filter', upper_limits=('>',),
+            columns=columns, source=source, **fields)
 
     # Arcavi 2016gkg donation
     path = os.path.join(catalog.get_current_task_repo(), 'Donations',
@@ -169,20 +161,9 @@ def do_donated_photo(catalog):
     data = read(path, format='cds')
     name, source = catalog.new_entry(
         'Gaia16apd', bibcode='2017ApJ...835L...8N')
-    for row in pbar(data, task_str + ': Nicholl Gaia16apd'):
-        photodict = {
-            PHOTOMETRY.TIME: str(row['MJD']),
-            PHOTOMETRY.U_TIME: 'MJD',
-            PHOTOMETRY.MAGNITUDE: str(row['mag']),
-            PHOTOMETRY.BAND: row['Filter'],
-            PHOTOMETRY.TELESCOPE: row['Telescope'],
-            PHOTOMETRY.SOURCE: source
-        }
-        if row['l_mag'] == '>':
-            photodict[PHOTOMETRY.UPPER_LIMIT] = True
-        else:
-            photodict[PHOTOMETRY.E_MAGNITUDE] = str(row['e_mag'])
-        catalog.entries[name].add_photometry(**photodict)
+    catalog.entries[name].add_photometry_table(
+        data, 'MJD', ['mag'], band='Filter', upper_limits=('>',),
+        columns={PHOTOMETRY.TELESCOPE: 'Telescope'}, source=source)
 
     # Kuncarayakti-01-09-17
     datafile = os.path.join(catalog.get_current_task_repo(), 'Donations',
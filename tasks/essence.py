@@ -14,6 +14,7 @@ from astropy.time import Time as astrotime
 from decimal import Decimal
 
 from ..supernova import SUPERNOVA
+from ..textspectra import read_text_spectra
 
 
 def do_essence_photo(catalog):
@@ -100,6 +101,17 @@ def do_essence_photo(catalog):
     return
 
 
+def _date_part(fileparts):
+    """Return the index of the date in the `_`-separated parts of the name
+    of an ESSENCE spectrum, `None` if it is not a spectrum.
+    """
+    if is_number(fileparts[1]):
+        return 1
+    if fileparts[1] == 'comb':
+        return 2
+    return None
+
+
 def do_essence_spectra(catalog):
     task_str = catalog.get_current_task_str()
 
@@ -129,8 +141,13 @@ def do_essence_spectra(catalog):
         "fast": "FLWO 1.5m"
     }
 
-    file_names = glob(
-        os.path.join(catalog.get_current_task_repo(), 'ESSENCE', '*'))
+    file_names = sorted(
+        glob(os.path.join(catalog.get_current_task_repo(), 'ESSENCE', '*')),
+        key=lambda s: s.lower())
+    spectra = read_text_spectra(
+        [x for x in file_names
+         if _date_part(os.path.basename(x).split('_')) is not None],
+        processes=catalog.TEXT_PROCESSES)
     oldname = ''
     for fi, fname in enumerate(pbar_strings(file_names, task_str)):
         filename = os.path.basename(fname)
@@ -141,12 +158,9 @@ def do_essence_spectra(catalog):
             catalog.journal_entries()
         oldname = name
 
-        if is_number(fileparts[1]):
-            doffset = 1
-        else:
-            if fileparts[1] != 'comb':
-                continue
-            doffset = 2
+        doffset = _date_part(fileparts)
+        if doffset is None:
+            continue
 
         dstr = fileparts[doffset]
         mjd = str(
@@ -161,11 +175,10 @@ def do_essence_spectra(catalog):
         telescope = teldict.get(instrument, '')
         instrument = insdict.get(instrument, '')
 
-        with open(fname, 'r') as f:
-            data = csv.reader(f, delimiter=' ', skipinitialspace=True)
-            data = [list(i) for i in zip(*data)]
-            wavelengths = data[0]
-            fluxes = [str(Decimal('1.0e-15') * Decimal(x)) for x in data[1]]
+        spectrum = next(spectra)
+        wavelengths = spectrum.columns[0]
+        fluxes = [str(Decimal('1.0e-15') * Decimal(x))
+                  for x in spectrum.columns[1]]
 
         name, source = catalog.new_entry(name, bibcode='2016ApJS..224....3N')
 
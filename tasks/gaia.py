@@ -23,6 +23,11 @@ def do_gaia(catalog):
             csvtxt.splitlines(), delimiter=',', skipinitialspace=True))
     reference = 'Gaia Photometric Science Alerts'
     refurl = 'http://gsaweb.ast.cam.ac.uk/alerts/alertsindex'
+    catalog.prefetch_urls([
+        ('http://gsaweb.ast.cam.ac.uk/alerts/alert/' + row[0] +
+         '/lightcurve.csv', os.path.join(
+             catalog.get_current_task_repo(), 'GAIA/') + row[0] + '.csv')
+        for row in tsvin[1:] if row])
     loopcnt = 0
     for ri, row in enumerate(pbar(tsvin, task_str)):
         if ri == 0 or not row:
@@ -7,9 +7,7 @@ from html import unescape
 
 from astrocats.catalog.utils import (get_sig_digits, is_number, pbar,
                                      pretty_num, uniq_cdl)
-from astropy import units as un
-from astropy.cosmology import Planck15 as cosmo
-from astropy.cosmology import z_at_value
+import numpy as np
 
 from decimal import Decimal
 
@@ -29,6 +27,14 @@ def do_nedd(catalog):
     reference = "NED-D v" + nedd_path.split('-')[-2]
     refurl = "http://ned.ipac.caltech.edu/Library/Distances/"
     nedbib = "1991ASSL..171...89H"
+
+    # Invert all distances lacking a redshift in a single lookup.
+    zdists = sorted(set(row[6] for row in data[13:]
+                        if not row[10] and is_number(row[6])))
+    zatvals = catalog.cosmology.z_at_comoving_distance(
+        np.array([float(x) for x in zdists]), zmax=5.0)
+    dist_zs = dict(zip(zdists, np.atleast_1d(zatvals)))
+
     olddistname = ''
     loopcnt = 0
     for r, row in enumerate(pbar(data, task_str)):
@@ -68,24 +74,17 @@ def do_nedd(catalog):
                 if dist:
                     catalog.entries[snname].add_quantity(
                         SUPERNOVA.COMOVING_DIST, dist, sources)
-                    if not redshift:
-                        try:
-                            zatval = z_at_value(cosmo.comoving_distance,
-                                                float(dist) * un.Mpc, zmax=5.0)
-                            sigd = get_sig_digits(str(dist))
-                            redshift = pretty_num(zatval, sig=sigd)
-                        except (KeyboardInterrupt, SystemExit):
-                            raise
-                        except Exception:
-                            pass
-                        else:
-                            cosmosource = catalog.entries[name].add_source(
-                                bibcode='2016A&A...594A..13P')
-                            combsources = uniq_cdl(sources.split(',') +
-                                                   [cosmosource])
-                            catalog.entries[snname].add_quantity(
-                                SUPERNOVA.REDSHIFT, redshift, combsources,
-                                derived=True)
+                    zatval = dist_zs.get(dist, np.nan)
+                    if not redshift and not np.isnan(zatval):
+                        sigd = get_sig_digits(str(dist))
+                        redshift = pretty_num(zatval, sig=sigd)
+                        cosmosource = catalog.entries[name].add_source(
+                            bibcode='2016A&A...594A..13P')
+                        combsources = uniq_cdl(sources.split(',') +
+                                               [cosmosource])
+                        catalog.entries[snname].add_quantity(
+                            SUPERNOVA.REDSHIFT, redshift, combsources,
+                            derived=True)
             if cleanhost:
                 catalog.entries[snname].add_quantity(
                     SUPERNOVA.HOST, cleanhost, sources)
@@ -4,10 +4,11 @@ import os
 import re
 
 from astrocats.catalog.utils import is_number, jd_to_mjd, pbar, uniq_cdl
-from bs4 import BeautifulSoup, NavigableString, Tag
+from bs4 import NavigableString, Tag
 
 from decimal import Decimal
 
+from ..htmltables import parse_html
 from ..supernova import SUPERNOVA
 
 
@@ -31,7 +32,7 @@ def do_ogle(catalog):
         if not htmltxt:
             continue
 
-        soup = BeautifulSoup(htmltxt, 'html5lib')
+        soup = parse_html(htmltxt)
         links = soup.findAll('a')
         breaks = soup.findAll('br')
         datalinks = []
@@ -44,6 +45,10 @@ def do_ogle(catalog):
                     datafnames.append(
                         bn.replace('/', '-') + '-' + a['href'].replace('/',
                                                                        '-'))
+        catalog.prefetch_urls([
+            (datalinks[ec], os.path.join(
+                catalog.get_current_task_repo(), 'OGLE/') + datafnames[ec])
+            for ec in range(len(datalinks))])
 
         ec = -1
         reference = 'OGLE-IV Transient Detection System'
@@ -11,8 +11,8 @@ import requests
 from astrocats.catalog.photometry import PHOTOMETRY
 from astrocats.catalog.utils import is_number, make_date_string, pbar, uniq_cdl
 from astropy.time import Time as astrotime
-from bs4 import BeautifulSoup
 
+from ..htmltables import parse_html, table_rows
 from ..supernova import SUPERNOVA
 
 
@@ -180,7 +180,7 @@ def do_ps_threepi(catalog):
         # Clean some common HTML manglings
         html = html.replace('ahref=', 'a href=')
 
-        bs = BeautifulSoup(html, 'html5lib')
+        bs = parse_html(html)
         div = bs.find('div', {'class': 'pagination'})
         if not div:
             offline = True
@@ -195,7 +195,7 @@ def do_ps_threepi(catalog):
         warnings.warn('Pan-STARRS 3pi offline, using local files only.')
         with open(fname, 'r') as f:
             html = f.read()
-        bs = BeautifulSoup(html, 'html5lib')
+        bs = parse_html(html)
         div = bs.find('div', {'class': 'pagination'})
         links = div.findAll('a')
     else:
@@ -230,10 +230,8 @@ def do_ps_threepi(catalog):
                     html = response.read().decode('utf-8')
                     f.write(html)
 
-        bs = BeautifulSoup(html, 'html5lib')
-        trs = bs.findAll('tr')
-        for tr in pbar(trs, task_str):
-            tds = tr.findAll('td')
+        trs = list(table_rows(html))
+        for tds in pbar(trs, task_str):
             if not tds:
                 continue
             refs = []
@@ -336,7 +334,7 @@ def do_ps_threepi(catalog):
                         with open(fname2, 'w') as f:
                             f.write(html2)
 
-            bs2 = BeautifulSoup(html2, 'html5lib')
+            bs2 = parse_html(html2)
             scripts = bs2.findAll('script')
             nslines = []
             nslabels = []
@@ -7,8 +7,7 @@ from string import ascii_letters
 
 from astrocats.catalog.utils import is_number, make_date_string, pbar, uniq_cdl
 from astropy.time import Time as astrotime
-from bs4 import BeautifulSoup
-
+from ..htmltables import page_rows
 from ..supernova import SUPERNOVA
 
 
@@ -27,8 +26,24 @@ def do_rochester(catalog):
     task_str = catalog.get_current_task_str()
     baddates = ['2440587', '2440587.292', '0001/01/01']
 
+    htmls = []
+    for pp, path in enumerate(rochesterpaths):
+        html = ''
+        if not catalog.args.update or rochesterupdate[pp]:
+            filepath = (os.path.join(catalog.get_current_task_repo(),
+                                     'rochester/') + path.replace('/', '-'))
+            for mirror in rochestermirrors:
+                html = catalog.load_url(
+                    mirror + path, filepath,
+                    fail=(mirror != rochestermirrors[-1]))
+                if html:
+                    break
+        htmls.append(html)
+    pages = page_rows([x for x in htmls if x],
+                      processes=catalog.HTML_PROCESSES)
+
     for pp, path in enumerate(pbar(rochesterpaths, task_str)):
-        if catalog.args.update and not rochesterupdate[pp]:
+        if not htmls[pp]:
             continue
 
         if 'snredboneyard.html' in path:
@@ -63,27 +78,14 @@ def do_rochester(catalog):
                 'aka': 15
             }
 
-        filepath = (os.path.join(catalog.get_current_task_repo(), 'rochester/')
-                    + path.replace('/', '-'))
-        for mirror in rochestermirrors:
-            html = catalog.load_url(
-                mirror + path, filepath, fail=(mirror != rochestermirrors[-1]))
-            if html:
-                break
-
-        if not html:
-            continue
-
-        soup = BeautifulSoup(html, 'html5lib')
-        rows = soup.findAll('tr')
+        rows = next(pages)
         sec_ref = 'Latest Supernovae'
         sec_refurl = ('http://www.rochesterastronomy.org/'
                       'snimages/snredshiftall.html')
         loopcnt = 0
-        for rr, row in enumerate(pbar(rows, task_str)):
+        for rr, cols in enumerate(pbar(rows, task_str)):
             if rr == 0:
                 continue
-            cols = row.findAll('td')
             if not len(cols):
                 continue
 
@@ -32,30 +32,27 @@ def do_sncosmo(catalog):
             ):
             catalog.entries[event] = catalog.entries[event].get_stub()
             continue
-        photodat = []
-        for photo in catalog.entries[event][SUPERNOVA.PHOTOMETRY]:
-            if (photo.get(PHOTOMETRY.BAND_SET, '') == 'SDSS' and
-                    PHOTOMETRY.TIME in photo and PHOTOMETRY.BAND in photo and
-                    PHOTOMETRY.FLUX_DENSITY in photo and
-                    PHOTOMETRY.E_FLUX_DENSITY in photo and
-                    PHOTOMETRY.UPPER_LIMIT not in photo):
-                photodat.append(
-                    (float(photo[PHOTOMETRY.TIME]),
-                     'sdss' + photo[PHOTOMETRY.BAND].replace("'", ''),
-                     float(photo[PHOTOMETRY.FLUX_DENSITY]),
-                     float(photo[PHOTOMETRY.E_FLUX_DENSITY]),
-                     float(photo[PHOTOMETRY.ZERO_POINT]), 'ab'))
-            elif (photo.get(PHOTOMETRY.BAND_SET, '') == 'MegaCam' and
-                  PHOTOMETRY.TIME in photo and PHOTOMETRY.BAND in photo and
-                  PHOTOMETRY.COUNT_RATE in photo and
-                  PHOTOMETRY.E_COUNT_RATE in photo and
-                  PHOTOMETRY.UPPER_LIMIT not in photo):
-                photodat.append(
-                    (float(photo[PHOTOMETRY.TIME]),
-                     'sdss' + photo[PHOTOMETRY.BAND].replace("'", ''),
-                     float(photo[PHOTOMETRY.COUNT_RATE]),
-                     float(photo[PHOTOMETRY.E_COUNT_RATE]),
-                     float(photo[PHOTOMETRY.ZERO_POINT]), 'bd17'))
+        photometry = catalog.entries[event][SUPERNOVA.PHOTOMETRY]
+        columns = catalog.entries[event].photometry_columns()
+        usable = (columns.has(PHOTOMETRY.TIME) &
+                  columns.has(PHOTOMETRY.BAND) &
+                  ~columns.has(PHOTOMETRY.UPPER_LIMIT))
+        sdss = (usable & columns.isin(PHOTOMETRY.BAND_SET, ['SDSS']) &
+                columns.has(PHOTOMETRY.FLUX_DENSITY) &
+                columns.has(PHOTOMETRY.E_FLUX_DENSITY))
+        megacam = (usable & columns.isin(PHOTOMETRY.BAND_SET, ['MegaCam']) &
+                   columns.has(PHOTOMETRY.COUNT_RATE) &
+                   columns.has(PHOTOMETRY.E_COUNT_RATE))
+        flux = np.where(sdss, columns.values(PHOTOMETRY.FLUX_DENSITY),
+                        columns.values(PHOTOMETRY.COUNT_RATE))
+        fluxerr = np.where(sdss, columns.values(PHOTOMETRY.E_FLUX_DENSITY),
+                           columns.values(PHOTOMETRY.E_COUNT_RATE))
+        photodat = [
+            (columns.values(PHOTOMETRY.TIME)[i],
+             'sdss' + photometry[i][PHOTOMETRY.BAND].replace("'", ''),
+             flux[i], fluxerr[i], columns.values(PHOTOMETRY.ZERO_POINT)[i],
+             'ab' if sdss[i] else 'bd17')
+            for i in np.flatnonzero(sdss | megacam)]
         if len(photodat) < 20:
             catalog.entries[event] = catalog.entries[event].get_stub()
             continue
@@ -13,6 +13,7 @@ from astrocats.catalog.utils import (get_sig_digits, pbar, pbar_strings,
                                      pretty_num)
 
 from ..supernova import SUPERNOVA
+from ..textspectra import read_text_spectra
 
 
 def do_snls_photo(catalog):
@@ -70,8 +71,14 @@ def do_snls_spectra(catalog):
         datedict['SNLS-' + row['SN']] = str(astrotime(row['Date']).mjd)
 
     oldname = ''
-    file_names = glob(os.path.join(catalog.get_current_task_repo(), 'SNLS/*'))
+    file_names = sorted(
+        glob(os.path.join(catalog.get_current_task_repo(), 'SNLS/*')),
+        key=lambda s: s.lower())
+    # The first 14 lines of the files are their header.
+    spectra = read_text_spectra(file_names, skip_rows=14,
+                                processes=catalog.TEXT_PROCESSES)
     for fi, fname in enumerate(pbar_strings(file_names, task_str)):
+        spectrum = next(spectra)
         filename = os.path.basename(fname)
         fileparts = filename.split('_')
         name = 'SNLS-' + fileparts[1]
@@ -87,19 +94,13 @@ def do_snls_spectra(catalog):
         catalog.entries[name].add_quantity(SUPERNOVA.DISCOVER_DATE,
                                            '20' + fileparts[1][:2], source)
 
-        f = open(fname, 'r')
-        data = csv.reader(f, delimiter=' ', skipinitialspace=True)
-        specdata = []
-        for r, row in enumerate(data):
-            if row[0] == '@TELESCOPE':
-                telescope = row[1].strip()
-            elif row[0] == '@REDSHIFT':
-                catalog.entries[name].add_quantity(SUPERNOVA.REDSHIFT,
-                                                   row[1].strip(), source)
-            if r < 14:
-                continue
-            specdata.append(list(filter(None, [x.strip(' \t') for x in row])))
-        specdata = [list(i) for i in zip(*specdata)]
+        for row in [x.split() for x in spectrum.header]:
+            if row and row[0] == '@TELESCOPE':
+                telescope = row[1]
+            elif row and row[0] == '@REDSHIFT':
+                catalog.entries[name].add_quantity(SUPERNOVA.REDSHIFT, row[1],
+                                                   source)
+        specdata = spectrum.columns
         wavelengths = specdata[1]
 
         fluxes = [
@@ -1,7 +1,6 @@
 """Import tasks for the spectra collected by the Superfit software package.
 """
 import os
-import re
 from glob import glob
 
 from astrocats.catalog.utils import pbar
@@ -10,6 +9,7 @@ from astropy.time import Time as astrotime
 from decimal import Decimal
 
 from ..supernova import SUPERNOVA
+from ..textspectra import read_text_spectra
 
 
 def do_superfit_spectra(catalog):
@@ -17,11 +17,14 @@ def do_superfit_spectra(catalog):
     task_str = catalog.get_current_task_str()
     sfdirs = list(
         glob(os.path.join(catalog.get_current_task_repo(), 'superfit/*')))
-    for sfdir in pbar(sfdirs, task_str):
-        sffiles = sorted(glob(sfdir + '/*.dat'))
+    sffiles = [sorted(glob(x + '/*.dat')) for x in sfdirs]
+    spectra = read_text_spectra([x for y in sffiles for x in y],
+                                processes=catalog.TEXT_PROCESSES)
+    for si, sfdir in enumerate(pbar(sfdirs, task_str)):
         lastname = ''
         oldname = ''
-        for sffile in pbar(sffiles, task_str):
+        for sffile in pbar(sffiles[si], task_str):
+            specdata = next(spectra)
             basename = os.path.basename(sffile)
             name = basename.split('.')[0]
             if name.startswith('sn'):
@@ -60,18 +63,7 @@ def do_superfit_spectra(catalog):
             catalog.entries[name].add_quantity(
                 SUPERNOVA.ALIAS, oldname, source)
 
-            with open(sffile) as ff:
-                rows = ff.read().splitlines()
-            specdata = []
-            for row in rows:
-                if row.strip():
-                    specdata.append(
-                        list(filter(None, re.split('\t+|\s+', row,
-                                                   maxsplit=0))))
-            specdata = [[xx.replace('D', 'E') for xx in list(ii)]
-                        for ii in zip(*specdata)]
-            wavelengths = specdata[0]
-            fluxes = specdata[1]
+            wavelengths, fluxes = specdata.columns[:2]
 
             if epoff != '':
                 mlmjd = astrotime(
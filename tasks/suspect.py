@@ -4,19 +4,38 @@ import csv
 import json
 import os
 import re
-import urllib
 from glob import glob
 from html import unescape
 from math import floor
 
 from astropy.time import Time as astrotime
-from bs4 import BeautifulSoup
 
 from astrocats.catalog.utils import (get_sig_digits, is_number, jd_to_mjd,
                                      pbar, pbar_strings, pretty_num, uniq_cdl)
 from decimal import Decimal
 
+from ..htmltables import Cell, parse_html, table_rows
 from ..supernova import SUPERNOVA
+from ..utils import process_map
+
+
+def _read_suspect_photo(datafile):
+    """Return the header texts, reference link and photometry rows of the
+    SUSPECT photometry page `datafile`.
+    """
+    with open(datafile, 'rb') as f:
+        bandsoup = parse_html(f.read())
+    texts = {}
+    for field in ['Name', 'Redshift', 'Type']:
+        texts[field] = [str(x) for x in bandsoup.body.findAll(
+            text=re.compile(field))]
+    reference = ''
+    for link in bandsoup.body.findAll('a'):
+        if 'adsabs' in link['href']:
+            reference = str(link).replace('"', "'")
+    rows = [tuple(Cell(x) for x in row)
+            for row in table_rows(bandsoup, table=0)]
+    return texts, reference, rows
 
 
 def do_suspect_photo(catalog):
@@ -29,12 +48,15 @@ def do_suspect_photo(catalog):
         for row in tsvin:
             suspectrefdict[row[0]] = row[1]
 
-    file_names = list(
-        sorted(
-            glob(
-                os.path.join(catalog.get_current_task_repo(),
-                             'SUSPECT/*.html'))))
+    file_names = sorted(
+        glob(os.path.join(catalog.get_current_task_repo(), 'SUSPECT/*.html')),
+        key=lambda s: s.lower())
+    # The pages are parsed in worker processes, in the order `pbar_strings`
+    # goes through them.
+    pages = process_map(_read_suspect_photo, file_names,
+                        processes=catalog.HTML_PROCESSES)
     for datafile in pbar_strings(file_names, task_str):
+        texts, reference, rows = next(pages)
         basename = os.path.basename(datafile)
         basesplit = basename.split('-')
         oldname = basesplit[1]
@@ -43,16 +65,7 @@ def do_suspect_photo(catalog):
             name = name + 'A'
         band = basesplit[3].split('.')[0]
         ei = int(basesplit[2])
-        bandlink = 'file://' + os.path.abspath(datafile)
-        bandresp = urllib.request.urlopen(bandlink)
-        bandsoup = BeautifulSoup(bandresp, 'html5lib')
-        bandtable = bandsoup.find('table')
-
-        names = bandsoup.body.findAll(text=re.compile('Name'))
-        reference = ''
-        for link in bandsoup.body.findAll('a'):
-            if 'adsabs' in link['href']:
-                reference = str(link).replace('"', "'")
+        names = texts['Name']
 
         bibcode = unescape(suspectrefdict[reference])
         source = catalog.entries[name].add_source(bibcode=bibcode)
@@ -71,7 +84,7 @@ def do_suspect_photo(catalog):
             catalog.entries[name].add_quantity(
                 SUPERNOVA.HOST, names[1].split(':')[1].strip(), sec_source)
 
-            redshifts = bandsoup.body.findAll(text=re.compile('Redshift'))
+            redshifts = texts['Redshift']
             if redshifts:
                 catalog.entries[name].add_quantity(
                     SUPERNOVA.REDSHIFT,
@@ -84,16 +97,15 @@ def do_suspect_photo(catalog):
             #     catalog.entries[name].add_quantity(SUPERNOVA.VELOCITY, vel,
             # sec_source,
             # kind='heliocentric')
-            types = bandsoup.body.findAll(text=re.compile('Type'))
+            types = texts['Type']
 
             catalog.entries[name].add_quantity(
                 SUPERNOVA.CLAIMED_TYPE,
                 types[0].split(':')[1].strip().split(' ')[0], sec_source)
 
-        for r, row in enumerate(bandtable.findAll('tr')):
+        for r, col in enumerate(rows):
             if r == 0:
                 continue
-            col = row.findAll('td')
             mjd = str(jd_to_mjd(Decimal(col[0].contents[0])))
             mag = col[3].contents[0]
             if mag.isspace():
@@ -4,10 +4,10 @@ import datetime
 import os
 
 # from astropy.time import Time as astrotime
-from bs4 import BeautifulSoup
 
 from astrocats.catalog.utils import pbar, utf8
 from astrocats.catalog.entry import ENTRY
+from astrocats.supernovae.htmltables import page_rows
 from astrocats.supernovae.utils import name_clean
 
 
@@ -17,6 +17,7 @@ def do_swift(catalog):
     url = 'https://www.swift.psu.edu/secure/toop/summary.php'
     reference = 'Swift TOOs'
     years = range(2005, int(now.year) + 1)
+    htmls = []
     for year in years:
         archived = True if year < years[-1] - 1 else False
         html = catalog.load_url(
@@ -26,17 +27,14 @@ def do_swift(catalog):
             post={'year': str(year)},
             archived_mode=archived,
             verify=False)
-        if not html:
-            continue
-
-        soup = BeautifulSoup(html, 'html5lib')
-        table = soup.findAll('table')[2]
+        if html:
+            htmls.append(html)
 
+    for rows in page_rows(htmls, table=2, processes=catalog.HTML_PROCESSES):
         records = []
-        for r, row in enumerate(table.findAll('tr')):
+        for r, col in enumerate(rows):
             if r == 0:
                 continue
-            col = row.findAll('td')
             records.append([utf8(x.renderContents()) for x in col])
 
         loopcnt = 0
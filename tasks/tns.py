@@ -2,168 +2,325 @@
 import csv
 import json
 import os
-import time
+import shutil
 import urllib
 import warnings
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from math import ceil
 
+import numpy as np
 import requests
 
 from astrocats.catalog.photometry import PHOTOMETRY
 from astrocats.catalog.spectrum import SPECTRUM
-from astrocats.catalog.utils import (is_integer, is_number, jd_to_mjd, pbar,
-                                     pretty_num, sortOD)
+from astrocats.catalog.utils import (is_integer, jd_to_mjd, pbar, pretty_num,
+                                     read_json_dict, sortOD)
 from decimal import Decimal
 
 from ..supernova import SUPERNOVA
+from ..textspectra import parse_text_spectrum
+
+
+# Rows of the TNS search, mirrored in `page-NN.csv` files of this many rows
+# sorted by TNS id.
+TNS_PAGE_SIZE = 1000
+# Objects discovered up to this many days before the last sync are fetched
+# again by an incremental sync, as they are the ones whose rows still change.
+TNS_RECHECK_DAYS = 90
+# Every page is fetched again when the last full sync is older than this.
+TNS_FULL_SYNC_DAYS = 30
+
+TNS_SEARCH_COLUMNS = ('&display[redshift]=1'
+                      '&display[hostname]=1&display[host_redshift]=1'
+                      '&display[source_group_name]=1'
+                      '&display[programs_name]=1'
+                      '&display[internal_name]=1'
+                      '&display[isTNS_AT]=1'
+                      '&display[public]=1'
+                      '&display[end_pop_period]=0'
+                      '&display[spectra_count]=1'
+                      '&display[discoverymag]=1&display[discmagfilter]=1'
+                      '&display[discoverydate]=1&display[discoverer]=1'
+                      '&display[sources]=1'
+                      '&display[bibcode]=1&format=csv')
+TNS_SYNC_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
 
 
 def do_tns(catalog):
-    """Load TNS metadata."""
-    session = requests.Session()
+    """Load TNS metadata.
+
+    The TNS search results are mirrored in the task repo and only rows of
+    new or recently discovered objects are fetched, unless the last full
+    fetch is more than `TNS_FULL_SYNC_DAYS` old (see `TNS/sync.json`). In
+    update mode only the rows that changed are added to the catalog.
+    """
     task_str = catalog.get_current_task_str()
     tns_url = 'https://www.wis-tns.org/'
+    tns_dir = os.path.join(catalog.get_current_task_repo(), 'TNS')
+    sync_path = os.path.join(tns_dir, 'sync.json')
+    sync = read_json_dict(sync_path)
+
+    header, pages = _read_tns_pages(tns_dir)
+    mirror = OrderedDict(
+        [(row[0], row) for page in pages for row in page])
+    now = datetime.now()
+    full_sync = (not mirror or 'full_synced' not in sync or (
+        now - datetime.strptime(sync['full_synced'],
+                                TNS_SYNC_DATE_FORMAT)).days >=
+                 TNS_FULL_SYNC_DAYS)
+
+    if full_sync:
+        fetched_header, fetched = _fetch_all_tns_rows(
+            catalog, tns_url, tns_dir, pages, task_str)
+    else:
+        fetched_header, fetched = _fetch_recent_tns_rows(
+            catalog, tns_url, int(sync['max_id']),
+            datetime.strptime(sync['synced'], TNS_SYNC_DATE_FORMAT) -
+            timedelta(days=TNS_RECHECK_DAYS))
+    if fetched is None:
+        catalog.log.warning('Could not sync TNS index, using mirrored rows.')
+        fetched = []
+    header = header or fetched_header
+
+    changed = []
+    for row in fetched:
+        if mirror.get(row[0]) != row:
+            changed.append(row[0])
+            mirror[row[0]] = row
+    if changed:
+        _write_tns_pages(tns_dir, header, pages, mirror)
+    if fetched:
+        sync['max_id'] = str(max(int(x) for x in mirror))
+        sync['synced'] = now.strftime(TNS_SYNC_DATE_FORMAT)
+        if full_sync:
+            sync['full_synced'] = sync['synced']
+        with open(sync_path, 'w') as f:
+            json.dump(sync, f, indent='\t', separators=(',', ':'))
+
+    if catalog.args.update:
+        changed = set(changed)
+        rows = [x for x in mirror.values() if x[0] in changed]
+    else:
+        rows = list(mirror.values())
+    rows.sort(key=lambda x: int(x[0]))
+    for pi in pbar(range(0, len(rows), TNS_PAGE_SIZE), task_str):
+        for ri, row in enumerate(pbar(rows[pi:pi + TNS_PAGE_SIZE], task_str,
+                                      leave=False)):
+            _add_tns_row(catalog, tns_url, row)
+            if catalog.args.travis and ri >= catalog.TRAVIS_QUERY_LIMIT:
+                break
+
+        catalog.journal_entries()
+
+    catalog.journal_entries()
+
+
+def _parse_tns_csv(csvtxt):
+    """Return the rows, including the header, of a TNS search CSV."""
+    return list(csv.reader([x.replace(
+        '[data validation error, please contact site admin]', '""')
+        for x in csvtxt.splitlines()], delimiter=','))
+
+
+def _read_tns_pages(tns_dir):
+    """Return the header and rows of each mirrored page of the TNS search."""
+    header = None
+    pages = []
+    page = 0
+    while True:
+        fname = os.path.join(tns_dir, 'page-') + str(page).zfill(2) + '.csv'
+        if not os.path.isfile(fname):
+            break
+        with open(fname, 'r') as tns_file:
+            rows = _parse_tns_csv(tns_file.read())
+        if rows:
+            header = rows[0]
+        pages.append([x for x in rows[1:] if x])
+        page += 1
+    return header, pages
+
+
+def _write_tns_pages(tns_dir, header, pages, mirror):
+    """Write the pages of the mirrored rows that differ from `pages`."""
+    rows = sorted(mirror.values(), key=lambda x: int(x[0]))
+    for page, pi in enumerate(range(0, len(rows), TNS_PAGE_SIZE)):
+        newpage = rows[pi:pi + TNS_PAGE_SIZE]
+        if page < len(pages) and pages[page] == newpage:
+            continue
+        fname = os.path.join(tns_dir, 'page-') + str(page).zfill(2) + '.csv'
+        with open(fname, 'w') as tns_file:
+            writer = csv.writer(tns_file, quoting=csv.QUOTE_ALL,
+                                lineterminator='\n')
+            writer.writerows([header] + newpage)
+
+
+def _fetch_tns_search(session, tns_url, query, page):
+    """Return the header and rows of a page of a TNS search, `None` if the
+    page could not be fetched."""
+    ses_url = (tns_url + 'search?&num_page=' + str(TNS_PAGE_SIZE) +
+               '&format=html&edit[type]=&edit[objname]=&edit[id]=' + query +
+               TNS_SEARCH_COLUMNS + '&page=' + str(page))
+    try:
+        response = session.get(ses_url, timeout=40)
+        response.raise_for_status()
+    except Exception:
+        return None, None
+    rows = _parse_tns_csv(response.text)
+    if not rows:
+        return None, None
+    return rows[0], [x for x in rows[1:] if x]
+
+
+def _fetch_all_tns_rows(catalog, tns_url, tns_dir, pages, task_str):
+    """Fetch every page of the TNS search.
+
+    Pages that can't be fetched, or the first seven in archived mode, are
+    taken from the mirror instead.
+    """
+    session = requests.Session()
     search_url = tns_url + \
         'search?&num_page=1&format=html&sort=desc&order=id&format=csv&page=0'
     csvtxt = catalog.load_url(search_url,
                               os.path.join(catalog.get_current_task_repo(),
-                                           'TNS', 'index.csv'))
+                                           'TNS', 'index.csv'),
+                              update_mode=False)
     if not csvtxt:
-        return
+        return None, None
     maxid = csvtxt.splitlines()[1].split(',')[0].strip('"')
-    maxpages = ceil(int(maxid) / 1000.)
+    maxpages = ceil(int(maxid) / float(TNS_PAGE_SIZE))
 
+    header = None
+    rows = []
     for page in pbar(range(maxpages), task_str):
-        fname = os.path.join(
-            catalog.get_current_task_repo(), 'TNS',
-            'page-') + str(page).zfill(2) + '.csv'
         if (catalog.current_task.load_archive(catalog.args) and
-                os.path.isfile(fname) and page < 7):
-            with open(fname, 'r') as tns_file:
-                csvtxt = tns_file.read()
-        else:
-            session = requests.Session()
-            ses_url = (tns_url + 'search?&num_page=1000&format=html&edit'
-                       '[type]=&edit[objname]=&edit[id]=&sort=asc&order=id'
-                       '&display[redshift]=1'
-                       '&display[hostname]=1&display[host_redshift]=1'
-                       '&display[source_group_name]=1'
-                       '&display[programs_name]=1'
-                       '&display[internal_name]=1'
-                       '&display[isTNS_AT]=1'
-                       '&display[public]=1'
-                       '&display[end_pop_period]=0'
-                       '&display[spectra_count]=1'
-                       '&display[discoverymag]=1&display[discmagfilter]=1'
-                       '&display[discoverydate]=1&display[discoverer]=1'
-                       '&display[sources]=1'
-                       '&display[bibcode]=1&format=csv&page=' + str(page))
-            try:
-                response = session.get(ses_url, timeout=40)
-                csvtxt = response.text
-            except Exception as e:
-                catalog.log.warning(
-                    'Could not download TNS page #{}.'.format(str(page)))
-                if os.path.isfile(fname):
-                    with open(fname, 'r') as tns_file:
-                        csvtxt = tns_file.read()
-                else:
-                    continue
-            else:
-                with open(fname, 'w') as tns_file:
-                    tns_file.write(csvtxt)
-
-        tsvin = list(csv.reader([x.replace('[data validation error, please contact site admin]',
-            '""') for x in csvtxt.splitlines()], delimiter=','))
-        for ri, row in enumerate(pbar(tsvin, task_str, leave=False)):
-            if ri == 0:
-                continue
-            if row[4] and 'SN' not in row[4]:
-                continue
-            name = row[1].replace(' ', '')
-            if len(name) < 5:
-                continue
-            name, source = catalog.new_entry(
-                name, srcname='Transient Name Server', url=tns_url)
-            if row[2] and row[2] != '00:00:00.00':
-                catalog.entries[name].add_quantity(SUPERNOVA.RA, row[2],
-                                                   source)
-            if row[3] and row[3] != '+00:00:00.00':
-                catalog.entries[name].add_quantity(SUPERNOVA.DEC, row[3],
-                                                   source)
-            if row[4]:
-                catalog.entries[name].add_quantity(
-                    SUPERNOVA.CLAIMED_TYPE, row[4].replace('SN', '').strip(),
-                    source)
-            if row[5]:
-                catalog.entries[name].add_quantity(
-                    SUPERNOVA.REDSHIFT, row[5], source, kind='spectroscopic')
-            if row[6]:
-                catalog.entries[name].add_quantity(SUPERNOVA.HOST, row[6],
-                                                   source)
-            if row[7]:
-                catalog.entries[name].add_quantity(
-                    [SUPERNOVA.REDSHIFT, SUPERNOVA.HOST_REDSHIFT],
-                    row[7],
-                    source,
-                    kind='host')
-            if row[8]:
-                catalog.entries[name].add_quantity(SUPERNOVA.DISCOVERER,
-                                                   row[8], source)
-            # Currently, all events listing all possible observers. TNS bug?
-            # if row[9]:
-            #    observers = row[9].split(',')
-            #    for observer in observers:
-            #        catalog.entries[name].add_quantity('observer',
-            #                                  observer.strip(),
-            #                                  source)
-            if row[12]:
-                catalog.entries[name].add_quantity(SUPERNOVA.ALIAS, row[12],
-                                                   source)
-            if row[20]:
-                date = row[20].split()[0].replace('-', '/')
-                if 'clear' in row[20].lower():
-                    print(row)
-                if date != '0000/00/00' and 'clear' not in row[20].lower():
-                    date = date.replace('/00', '')
-                    dsplit = row[20].split()
-                    if len(dsplit) >= 2:
-                        t = dsplit[1]
-                        if t != '00:00:00':
-                            ts = t.split(':')
-                            dt = timedelta(
-                                hours=int(ts[0]),
-                                minutes=int(ts[1]),
-                                seconds=float(ts[2]))
-                            date += pretty_num(
-                                dt.total_seconds() / (24 * 60 * 60),
-                                sig=6).lstrip('0')
-                    catalog.entries[name].add_quantity(SUPERNOVA.DISCOVER_DATE,
-                                                       date, source)
-            if catalog.args.travis and ri >= catalog.TRAVIS_QUERY_LIMIT:
-                break
+                page < len(pages) and page < 7):
+            rows.extend(pages[page])
+            continue
+        pheader, prows = _fetch_tns_search(
+            session, tns_url, '&sort=asc&order=id', page)
+        if prows is None:
+            catalog.log.warning(
+                'Could not download TNS page #{}.'.format(str(page)))
+            if page < len(pages):
+                rows.extend(pages[page])
+            continue
+        header = pheader
+        rows.extend(prows)
+    return header, rows
 
-        catalog.journal_entries()
 
-    catalog.journal_entries()
+def _fetch_recent_tns_rows(catalog, tns_url, max_id, since):
+    """Fetch the rows of objects newer than `max_id` or discovered `since`.
 
+    Returns `None` for the rows if any page could not be fetched.
+    """
+    session = requests.Session()
+    header = None
+    rows = []
+    # New objects, newest first, until those already mirrored are reached.
+    page = 0
+    while True:
+        pheader, prows = _fetch_tns_search(
+            session, tns_url, '&sort=desc&order=id', page)
+        if prows is None:
+            return None, None
+        header = pheader
+        rows.extend(x for x in prows if int(x[0]) > max_id)
+        if (len(prows) < TNS_PAGE_SIZE or
+                any(int(x[0]) <= max_id for x in prows)):
+            break
+        page += 1
+    # Recently discovered objects, whose rows may have changed.
+    page = 0
+    query = ('&sort=asc&order=id&date_start[date]=' +
+             since.strftime('%Y-%m-%d'))
+    while True:
+        pheader, prows = _fetch_tns_search(session, tns_url, query, page)
+        if prows is None:
+            return None, None
+        rows.extend(prows)
+        if len(prows) < TNS_PAGE_SIZE:
+            break
+        page += 1
+    catalog.log.info('Fetched {} recent TNS rows.'.format(len(rows)))
+    return header, rows
 
-def do_tns_photo(catalog):
-    """Load TNS photometry."""
-    task_str = catalog.get_current_task_str()
-    tns_url = 'https://www.wis-tns.org/'
-    try:
-        with open('tns.key', 'r') as f:
-            tnskey = f.read().splitlines()[0]
-    except Exception:
-        catalog.log.warning('TNS API key not found, make sure a file named '
-                            '`tns.key` containing the key is placed the '
-                            'astrocats directory.')
-        tnskey = ''
 
-    bandreps = {'Clear': 'C'}
-    fails = 0
+def _add_tns_row(catalog, tns_url, row):
+    """Add the data of a row of the TNS search to the catalog."""
+    if row[4] and 'SN' not in row[4]:
+        return
+    name = row[1].replace(' ', '')
+    if len(name) < 5:
+        return
+    name, source = catalog.new_entry(
+        name, srcname='Transient Name Server', url=tns_url)
+    if row[2] and row[2] != '00:00:00.00':
+        catalog.entries[name].add_quantity(SUPERNOVA.RA, row[2], source)
+    if row[3] and row[3] != '+00:00:00.00':
+        catalog.entries[name].add_quantity(SUPERNOVA.DEC, row[3], source)
+    if row[4]:
+        catalog.entries[name].add_quantity(
+            SUPERNOVA.CLAIMED_TYPE, row[4].replace('SN', '').strip(), source)
+    if row[5]:
+        catalog.entries[name].add_quantity(
+            SUPERNOVA.REDSHIFT, row[5], source, kind='spectroscopic')
+    if row[6]:
+        catalog.entries[name].add_quantity(SUPERNOVA.HOST, row[6], source)
+    if row[7]:
+        catalog.entries[name].add_quantity(
+            [SUPERNOVA.REDSHIFT, SUPERNOVA.HOST_REDSHIFT],
+            row[7],
+            source,
+            kind='host')
+    if row[8]:
+        catalog.entries[name].add_quantity(SUPERNOVA.DISCOVERER, row[8],
+                                           source)
+    # Currently, all events listing all possible observers. TNS bug?
+    # if row[9]:
+    #    observers = row[9].split(',')
+    #    for observer in observers:
+    #        catalog.entries[name].add_quantity('observer',
+    #                                  observer.strip(),
+    #                                  source)
+    if row[12]:
+        catalog.entries[name].add_quantity(SUPERNOVA.ALIAS, row[12], source)
+    if row[20]:
+        date = row[20].split()[0].replace('-', '/')
+        if 'clear' in row[20].lower():
+            print(row)
+        if date != '0000/00/00' and 'clear' not in row[20].lower():
+            date = date.replace('/00', '')
+            dsplit = row[20].split()
+            if len(dsplit) >= 2:
+                t = dsplit[1]
+                if t != '00:00:00':
+                    ts = t.split(':')
+                    dt = timedelta(
+                        hours=int(ts[0]),
+                        minutes=int(ts[1]),
+                        seconds=float(ts[2]))
+                    date += pretty_num(
+                        dt.total_seconds() / (24 * 60 * 60),
+                        sig=6).lstrip('0')
+            catalog.entries[name].add_quantity(SUPERNOVA.DISCOVER_DATE,
+                                               date, source)
+
+
+def _tns_objects(catalog, tns_url, cache_dir):
+    """Yield `(name, oname, objdict)` for the TNS objects of all entries.
+
+    `oname` is the entry's 2016+ SN/AT designation and `objdict` the TNS
+    object reply, read from `cache_dir` if the object was discovered over 90
+    days ago and cached, or from where another task saved it in this run.
+    The other objects are then requested from the TNS a chunk at a time, and
+    cached.
+    """
+    task_str = catalog.get_current_task_str()
+    client = catalog.get_tns_client(tns_url)
+    client.reset()
+    objects = []
     for name in pbar(list(catalog.entries.keys()), task_str):
         if name not in catalog.entries:
             continue
@@ -177,59 +334,79 @@ def do_tns_photo(catalog):
         if not oname:
             continue
         reqname = oname[2:]
-        jsonpath = os.path.join(catalog.get_current_task_repo(), 'TNS',
-                                reqname + '.json')
-        download_json = True
-        if os.path.isfile(jsonpath):
-            with open(jsonpath, 'r') as f:
-                objdict = json.load(f)
-            if 'discoverydate' in objdict:
-                discoverydate = objdict['discoverydate']
-                if '.' not in discoverydate:
-                    discoverydate += '.0'
-                try:
-                    if (datetime.now() - datetime.strptime(
-                            discoverydate, '%Y-%m-%d %H:%M:%S.%f')).days > 90:
-                        download_json = False
-                except ValueError:
-                    download_json = False
-        if download_json:
-            data = urllib.parse.urlencode({
-                'api_key': tnskey,
-                'data': json.dumps({
-                    'objname': reqname,
-                    'photometry': '1'
-                })
-            }).encode('ascii')
-            req = urllib.request.Request(
-                'https://www.wis-tns.org/api/get/object', data=data)
-            trys = 0
-            objdict = None
-            while trys < 3 and not objdict:
-                try:
-                    objdict = json.loads(
-                        urllib.request.urlopen(req, timeout=30).read().decode('ascii'))[
-                            'data']['reply']
-                except KeyboardInterrupt:
-                    raise
-                except Exception:
-                    catalog.log.warning('API request failed for `{}`.'.format(
-                        name))
-                    time.sleep(5)
-                trys = trys + 1
-            if (not objdict or 'objname' not in objdict or
-                    not isinstance(objdict['objname'], str)):
+        jsonpath = os.path.join(cache_dir, reqname + '.json')
+        if reqname in client.saved:
+            objdict = _cached_object(client.saved[reqname], recent=True)
+            if objdict is not None and client.saved[reqname] != jsonpath:
+                shutil.copyfile(client.saved[reqname], jsonpath)
+        else:
+            objdict = _cached_object(jsonpath)
+        if objdict is None:
+            objects.append((name, oname, reqname, jsonpath))
+            continue
+        yield name, oname, objdict
+
+    chunk = 25 * client.concurrency
+    fails = 0
+    for ci in pbar(range(0, len(objects), chunk), task_str + ' (requests)'):
+        with catalog.network_timer():
+            replies = client.get_objects(
+                [x[2] for x in objects[ci:ci + chunk]])
+        for name, oname, reqname, jsonpath in objects[ci:ci + chunk]:
+            if name not in catalog.entries:
+                continue
+            objdict = replies.get(reqname)
+            if objdict is None:
                 fails = fails + 1
                 catalog.log.warning('Object `{}` not found!'.format(name))
-                if fails >= 5:
-                    break
+                if fails >= client.max_failures:
+                    return
                 continue
             # Cache object here
             with open(jsonpath, 'w') as f:
                 json.dump(sortOD(objdict), f, indent='\t',
                           separators=(',', ':'), ensure_ascii=False,
                           sort_keys=True)
+            client.saved[reqname] = jsonpath
+            yield name, oname, objdict
+        if client.failed:
+            return
 
+
+def _cached_object(jsonpath, recent=False):
+    """Return the TNS reply cached at `jsonpath`, `None` if it should be
+    requested again.
+
+    Replies of objects discovered within the last 90 days are only used if
+    `recent` is set.
+    """
+    if not os.path.isfile(jsonpath):
+        return None
+    with open(jsonpath, 'r') as f:
+        objdict = json.load(f)
+    if recent:
+        return objdict
+    if 'discoverydate' not in objdict:
+        return None
+    discoverydate = objdict['discoverydate']
+    if '.' not in discoverydate:
+        discoverydate += '.0'
+    try:
+        if (datetime.now() - datetime.strptime(
+                discoverydate, '%Y-%m-%d %H:%M:%S.%f')).days <= 90:
+            return None
+    except ValueError:
+        pass
+    return objdict
+
+
+def do_tns_photo(catalog):
+    """Load TNS photometry."""
+    tns_url = 'https://www.wis-tns.org/'
+    bandreps = {'Clear': 'C'}
+    for name, oname, objdict in _tns_objects(
+            catalog, tns_url,
+            os.path.join(catalog.get_current_task_repo(), 'TNS')):
         if 'photometry' not in objdict:
             continue
         photoarr = objdict['photometry']
@@ -293,83 +470,9 @@ def do_wiserep2_spectra(catalog):
 def do_tns_spectra(catalog, tns_url='https://www.wis-tns.org/', directory='TNS'):
     """Load TNS spectra."""
     requests.packages.urllib3.disable_warnings()
-    task_str = catalog.get_current_task_str()
-    try:
-        with open('tns.key', 'r') as f:
-            tnskey = f.read().splitlines()[0]
-    except Exception:
-        catalog.log.warning('TNS API key not found, make sure a file named '
-                            '`tns.key` containing the key is placed the '
-                            'astrocats directory.')
-        tnskey = ''
-
-    fails = 0
-    for name in pbar(list(catalog.entries.keys()), task_str):
-        if name not in catalog.entries:
-            continue
-        aliases = catalog.entries[name].get_aliases()
-        oname = ''
-        for alias in aliases:
-            if (alias.startswith(('SN', 'AT')) and is_integer(alias[2:6]) and
-                    int(alias[2:6]) >= 2016) and alias[6:].isalpha():
-                oname = alias
-                break
-        if not oname:
-            continue
-        reqname = oname[2:]
-        jsonpath = os.path.join(catalog.get_current_task_repo(), directory, 'meta',
-                                reqname + '.json')
-        download_json = True
-        if os.path.isfile(jsonpath):
-            with open(jsonpath, 'r') as f:
-                objdict = json.load(f)
-            if 'discoverydate' in objdict:
-                discoverydate = objdict['discoverydate']
-                if '.' not in discoverydate:
-                    discoverydate += '.0'
-                try:
-                    if (datetime.now() - datetime.strptime(
-                            discoverydate, '%Y-%m-%d %H:%M:%S.%f')).days > 90:
-                        download_json = False
-                except ValueError:
-                    download_json = False
-        if download_json:
-            data = urllib.parse.urlencode({
-                'api_key': tnskey,
-                'data': json.dumps({
-                    'objname': reqname,
-                    'spectra': '1'
-                })
-            }).encode('ascii')
-            req = urllib.request.Request(
-                tns_url + 'api/get/object', data=data)
-            trys = 0
-            objdict = None
-            while trys < 3 and not objdict:
-                try:
-                    objdict = json.loads(
-                        urllib.request.urlopen(req, timeout=30).read().decode('ascii'))[
-                            'data']['reply']
-                except KeyboardInterrupt:
-                    raise
-                except Exception:
-                    catalog.log.warning('API request failed for `{}`.'.format(
-                        name))
-                    time.sleep(5)
-                trys = trys + 1
-            if (not objdict or 'objname' not in objdict or
-                    not isinstance(objdict['objname'], str)):
-                fails = fails + 1
-                catalog.log.warning('Object `{}` not found!'.format(name))
-                if fails >= 5:
-                    break
-                continue
-            # Cache object here
-            with open(jsonpath, 'w') as f:
-                json.dump(sortOD(objdict), f, indent='\t',
-                          separators=(',', ':'), ensure_ascii=False,
-                          sort_keys=True)
-
+    for name, oname, objdict in _tns_objects(
+            catalog, tns_url,
+            os.path.join(catalog.get_current_task_repo(), directory, 'meta')):
         if 'spectra' not in objdict:
             continue
         specarr = objdict['spectra']
@@ -408,30 +511,21 @@ def do_tns_spectra(catalog, tns_url='https://www.wis-tns.org/', directory='TNS')
                     os.path.join(
                         catalog.get_current_task_repo(), directory, 'spectra',
                         fname), archived_mode=True)
-                data = [x.split() for x in spectxt.splitlines()]
-
-                skipspec = False
-                newdata = []
-                oldval = ''
-                for row in data:
-                    if row and '#' not in row[0]:
-                        if (len(row) >= 2 and is_number(row[0]) and
-                                is_number(row[1]) and row[1] != oldval):
-                            newdata.append(row)
-                            oldval = row[1]
-
-                if skipspec or not newdata:
+                data = parse_text_spectrum(spectxt)
+                if not len(data):
                     warnings.warn('Skipped adding spectrum file ' + fname)
                     continue
 
-                data = [list(i) for i in zip(*newdata)]
-                wavelengths = data[0]
-                fluxes = data[1]
+                # Rows repeating the flux of the row before are left out.
+                keep = np.append(True, data.columns[1][1:] !=
+                                 data.columns[1][:-1])
+                wavelengths = data.columns[0][keep]
+                fluxes = data.columns[1][keep]
                 errors = ''
-                if len(data) == 3:
-                    errors = data[1]
+                if len(data.columns) == 3:
+                    errors = fluxes
 
-                if max([float(x) for x in fluxes]) < 1.0e-5:
+                if max(data.values[1][keep].tolist()) < 1.0e-5:
                     fluxunit = 'erg/s/cm^2/Angstrom'
                 else:
                     fluxunit = 'Uncalibrated'
@@ -440,7 +534,7 @@ def do_tns_spectra(catalog, tns_url='https://www.wis-tns.org/', directory='TNS')
                     SPECTRUM.U_WAVELENGTHS: 'Angstrom',
                     SPECTRUM.ERRORS: errors,
                     SPECTRUM.U_FLUXES: fluxunit,
-                    SPECTRUM.U_ERRORS: fluxunit if errors else '',
+                    SPECTRUM.U_ERRORS: fluxunit if len(errors) else '',
                     SPECTRUM.WAVELENGTHS: wavelengths,
                     SPECTRUM.FLUXES: fluxes
                 })
@@ -13,6 +13,7 @@ from astrocats.catalog.utils import (get_sig_digits, is_number, pbar,
                                      pretty_num, uniq_cdl)
 
 from ..supernova import SUPERNOVA
+from ..textspectra import parse_text_spectrum
 
 
 def do_ucb_photo(catalog):
@@ -30,6 +31,11 @@ def do_ucb_photo(catalog):
 
     photom = json.loads(jsontxt)
     photom = sorted(photom, key=lambda kk: kk['PhotID'])
+    catalog.prefetch_urls([
+        ('http://heracles.astro.berkeley.edu/sndb/download?id=dp:' +
+         str(phot['PhotID']), os.path.join(
+             catalog.get_current_task_repo(), 'SNDB/') + phot['Filename'])
+        for phot in photom if phot['Filename']])
     for phot in pbar(photom, task_str):
         oldname = phot['ObjName']
         name = catalog.add_entry(oldname)
@@ -117,6 +123,12 @@ def do_ucb_spectra(catalog):
 
     spectra = json.loads(jsontxt)
     spectra = sorted(spectra, key=lambda kk: kk['SpecID'])
+    catalog.prefetch_urls([
+        ('http://heracles.astro.berkeley.edu/sndb/download?id=ds:' +
+         str(spectrum['SpecID']), os.path.join(
+             catalog.get_current_task_repo(), 'UCB/') + spectrum['Filename'])
+        for spectrum in spectra if spectrum['Filename']],
+        archived_mode=True)
     oldname = ''
     for spectrum in pbar(spectra, task_str):
         name = spectrum['ObjName']
@@ -177,29 +189,12 @@ def do_ucb_spectra(catalog):
             filepath,
             archived_mode=True)
 
-        specdata = list(
-            csv.reader(
-                spectxt.splitlines(), delimiter=' ', skipinitialspace=True))
-        newspecdata = []
-        for row in specdata:
-            if not row or not row[0] or row[0][0] == '#':
-                continue
-            else:
-                newspecdata.append(row)
-        specdata = newspecdata
-
-        haserrors = len(specdata[0]) == 3 and specdata[0][2] and specdata[0][
-            2] != 'NaN'
-        specdata = [list(ii) for ii in zip(*specdata)]
-
-        wavelengths = specdata[0]
-        fluxes = specdata[1]
+        specdata = parse_text_spectrum(spectxt)
+        wavelengths, fluxes = specdata.columns[:2]
         errors = ''
-        if haserrors:
-            errors = specdata[2]
-
-        if not list(filter(None, errors)):
-            errors = ''
+        # Spectra without errors have a column of `NaN`s in their place.
+        if len(specdata.columns) == 3 and specdata.columns[2][0] != 'NaN':
+            errors = specdata.columns[2]
 
         units = 'Uncalibrated'
         catalog.entries[name].add_spectrum(
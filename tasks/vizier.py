@@ -9,21 +9,145 @@ from astrocats.catalog.utils import (convert_aq_output, get_sig_digits,
                                      is_number, jd_to_mjd, make_date_string,
                                      pbar, rep_chars, round_sig, uniq_cdl)
 from astropy.time import Time as astrotime
-from astroquery.vizier import Vizier
 from decimal import Decimal
 
 from ..constants import CLIGHT, KM
+from ..photometrytable import band_columns
 from ..supernova import SUPERNOVA
 from ..utils import radec_clean
+from ..viziercache import VizierCache
+
+# Catalogs read by `do_vizier`, in the order they are read, downloaded
+# ahead of the task if not already cached.
+VIZIER_CATALOGS = [
+    'J/ApJ/854/L14/ph17dio',
+    ['J/MNRAS/384/107/table3',
+     'J/MNRAS/384/107/table5',
+     'J/MNRAS/384/107/table4'],
+    'J/ApJ/824/6/table1',
+    'J/AJ/151/125/table2',
+    'J/A+A/592/A40/table2',
+    ['J/A+A/593/A68/ph12os', 'J/A+A/593/A68/ph13bvn'],
+    'J/ApJ/825/L22/table3',
+    'J/ApJ/826/144/table1',
+    ['J/ApJ/756/173/table2', 'J/ApJ/756/173/table3'],
+    'J/ApJ/819/35/table2',
+    'J/other/NewA/20.30/table1',
+    'J/other/NewA/20.30/table2',
+    'J/other/NewA/20.30/table3',
+    'J/ApJ/686/749/table10',
+    'J/ApJ/686/749/table12',
+    ['J/A+A/555/A10/table4', 'J/A+A/555/A10/table5'],
+    'J/ApJ/820/33/table1',
+    'J/ApJ/820/33/table2',
+    'J/ApJS/200/12/table1',
+    'J/ApJ/746/85/table1',
+    'J/ApJ/746/85/table2',
+    'J/ApJ/602/571/table8',
+    'J/MNRAS/444/3258/SNe',
+    'J/MNRAS/438/1391/table2',
+    'J/ApJ/749/18/table1',
+    'J/A+A/523/A7/table9',
+    'J/A+A/415/863/table1',
+    'J/AJ/136/2306/sources',
+    'J/ApJ/708/661/sn',
+    'J/ApJ/708/661/table1',
+    'J/ApJ/795/44/ps1_snIa',
+    'J/ApJ/795/44/table6',
+    'II/189/mag',
+    'VII/272/snrs',
+    'J/MNRAS/442/844/table1',
+    'J/MNRAS/442/844/table2',
+    'J/MNRAS/425/1789/table1',
+    'J/ApJS/219/13/table3',
+    'J/ApJS/219/13/table2',
+    'J/other/Nat/491.228/tablef1',
+    'J/other/Nat/491.228/tablef2',
+    'J/other/Nat/474.484/tables1',
+    'J/ApJ/736/159/table1',
+    'J/ApJ/760/L33/table1',
+    'J/ApJ/769/39/table1',
+    'J/MNRAS/394/2266/table2',
+    'J/MNRAS/394/2266/table3',
+    'J/MNRAS/394/2266/table4',
+    'J/AJ/145/99/table1',
+    'J/ApJ/729/143/table1',
+    'J/ApJ/729/143/table2',
+    'J/ApJ/729/143/table4',
+    'J/ApJ/729/143/table5',
+    'J/ApJ/728/14/table1',
+    'J/ApJ/728/14/table2',
+    'J/ApJ/728/14/table3',
+    'J/PAZh/37/837/table2',
+    'J/MNRAS/433/1871/table3a',
+    'J/MNRAS/433/1871/table3b',
+    'J/AJ/148/1/table2',
+    'J/AJ/148/1/table3',
+    'J/AJ/148/1/table5',
+    'J/ApJ/805/74/table1',
+    'J/ApJ/741/97/table2',
+    'J/MNRAS/448/1206/table3',
+    'J/MNRAS/448/1206/table4',
+    'J/MNRAS/448/1206/table5',
+    'J/MNRAS/448/1206/table6',
+    'J/MNRAS/448/1206/tablea2',
+    'J/MNRAS/448/1206/tablea3',
+    'J/AJ/143/126/table4',
+    'J/ApJS/220/9/table1',
+    'J/ApJS/220/9/table2',
+    'J/ApJS/220/9/table8',
+    'J/ApJ/673/999/table1',
+    'J/MNRAS/417/916/table2',
+    'J/MNRAS/430/1746/table4',
+    'J/AJ/148/13/high_z',
+    'J/AJ/148/13/low_z',
+    'J/ApJ/666/674/table3',
+    'J/AcA/63/1/table1',
+    'J/MNRAS/410/1262/tablea2',
+    'J/ApJ/755/61/table3',
+    'J/AJ/135/348/SNe',
+    'J/ApJ/713/1026/SNe',
+    'J/ApJ/770/107/galaxies',
+    'J/ApJ/738/162/table3',
+    'J/ApJ/738/162/table4',
+    'J/MNRAS/446/943/ngc2403',
+    'J/MNRAS/446/943/ngc2903',
+    'J/MNRAS/446/943/ngc300',
+    'J/MNRAS/446/943/ngc3077',
+    'J/MNRAS/446/943/ngc4214',
+    'J/MNRAS/446/943/ngc4395',
+    'J/MNRAS/446/943/ngc4449',
+    'J/MNRAS/446/943/ngc5204',
+    'J/MNRAS/446/943/ngc5585',
+    'J/MNRAS/446/943/ngc6946',
+    'J/MNRAS/446/943/ngc7793',
+    'J/MNRAS/446/943/m33',
+    'J/MNRAS/446/943/m74',
+    'J/MNRAS/446/943/m81',
+    'J/MNRAS/446/943/m82',
+    'J/MNRAS/446/943/m83',
+    'J/MNRAS/446/943/m101',
+    'J/MNRAS/446/943/m31',
+    'J/ApJ/703/370/tables',
+    'J/ApJ/821/57/table1',
+    'J/ApJ/821/57/table2',
+    'J/ApJ/821/57/table3',
+    'J/ApJ/821/57/table4',
+    'J/ApJ/607/665/table1',
+    'J/ApJ/607/665/table2',
+    'J/ApJ/607/665/table5',
+]
 
 
 def do_vizier(catalog):
     """Import data from Vizier catalogs."""
     task_str = catalog.get_current_task_str()
 
-    viz = Vizier(columns=['**'])
-    viz.ROW_LIMIT = -1
-    # viz.VIZIER_SERVER = 'vizier.cfa.harvard.edu'
+    viz = VizierCache(
+        os.path.join(catalog.get_current_task_repo(), 'VizieR'),
+        columns=['**'], row_limit=-1, log=catalog.log)
+    # server='vizier.cfa.harvard.edu'
+    viz.prefetch(VIZIER_CATALOGS)
 
     # 2018ApJ...854L..14K
     result = viz.get_catalogs('J/ApJ/854/L14/ph17dio')
@@ -31,25 +155,9 @@ def do_vizier(catalog):
     table.convert_bytestring_to_unicode()
     (name, source) = catalog.new_entry(
         'SN2017dio', bibcode='2018ApJ...854L..14K')
-    for row in pbar(table, task_str):
-        row = convert_aq_output(row)
-        bands = [
-            x for x in row if x.endswith('mag') and not x.startswith('e_')
-        ]
-        for bandtag in bands:
-            band = bandtag.replace('mag', '')
-            if (bandtag in row and is_number(row[bandtag]) and
-                    not isnan(float(row[bandtag]))):
-                photodict = {
-                    PHOTOMETRY.TIME: str(row['MJD']),
-                    PHOTOMETRY.U_TIME: 'MJD',
-                    PHOTOMETRY.BAND: band,
-                    PHOTOMETRY.MAGNITUDE: row[bandtag],
-                    PHOTOMETRY.E_MAGNITUDE: row['e_' + bandtag],
-                    PHOTOMETRY.TELESCOPE: row['Tel'],
-                    PHOTOMETRY.SOURCE: source
-                }
-                catalog.entries[name].add_photometry(**photodict)
+    catalog.entries[name].add_photometry_table(
+        table, 'MJD', band_columns(table.colnames),
+        columns={PHOTOMETRY.TELESCOPE: 'Tel'}, source=source)
     catalog.journal_entries()
 
     # 2008MNRAS.384..107E
@@ -61,32 +169,13 @@ def do_vizier(catalog):
         table.convert_bytestring_to_unicode()
         (name, source) = catalog.new_entry(
             'SN2002cv', bibcode='2008MNRAS.384..107E')
-        for row in pbar(table, task_str):
-            row = convert_aq_output(row)
-            bands = [
-                x for x in row if x.endswith('mag') and not x.startswith('e_')
-            ]
-            for bandtag in bands:
-                band = bandtag.replace('mag', '')
-                if (bandtag in row and is_number(row[bandtag]) and
-                        not isnan(float(row[bandtag]))):
-                    photodict = {
-                        PHOTOMETRY.TIME: jd_to_mjd(Decimal(str(row['JD']))),
-                        PHOTOMETRY.U_TIME: 'MJD',
-                        PHOTOMETRY.BAND: band,
-                        PHOTOMETRY.MAGNITUDE: row[bandtag],
-                        PHOTOMETRY.SOURCE: source,
-                        PHOTOMETRY.INSTRUMENT: row['Inst']
-                    }
-                    if ti == 2:
-                        photodict[PHOTOMETRY.SCORRECTED] = True
-                    if row.get('l_' + bandtag, '') in ['>', '>=']:
-                        photodict[PHOTOMETRY.UPPER_LIMIT] = True
-                    else:
-                        if ('e_' + bandtag) in row:
-                            photodict[PHOTOMETRY.E_MAGNITUDE] = row['e_' +
-                                                                    bandtag]
-                    catalog.entries[name].add_photometry(**photodict)
+        # The third table is of S-corrected magnitudes.
+        scorrected = {PHOTOMETRY.SCORRECTED: True} if ti == 2 else {}
+        catalog.entries[name].add_photometry_table(
+            table, 'JD', band_columns(table.colnames), jd=True,
+            upper_limits=('>', '>='),
+            columns={PHOTOMETRY.INSTRUMENT: 'Inst'}, source=source,
+            **scorrected)
     catalog.journal_entries()
 
     # 2016ApJ...824....6O
@@ -95,29 +184,10 @@ def do_vizier(catalog):
     table.convert_bytestring_to_unicode()
     (name, source) = catalog.new_entry(
         'SN2015bh', bibcode='2016ApJ...824....6O')
-    for row in pbar(table, task_str):
-        row = convert_aq_output(row)
-        bands = [
-            x for x in row if x.endswith('mag') and not x.startswith('e_')
-        ]
-        for bandtag in bands:
-            band = bandtag.replace('mag', '')
-            if (bandtag in row and is_number(row[bandtag]) and
-                    not isnan(float(row[bandtag]))):
-                photodict = {
-                    PHOTOMETRY.TIME: str(row['MJD']),
-                    PHOTOMETRY.U_TIME: 'MJD',
-                    PHOTOMETRY.BAND: band,
-                    PHOTOMETRY.COUNT_RATE: str(row['Cts']),
-                    PHOTOMETRY.E_COUNT_RATE: str(row['e_Cts']),
-                    PHOTOMETRY.MAGNITUDE: row[bandtag],
-                    PHOTOMETRY.SOURCE: source
-                }
-                if row.get('l_' + bandtag, '') == '>':
-                    photodict[PHOTOMETRY.UPPER_LIMIT] = True
-                else:
-                    photodict[PHOTOMETRY.E_MAGNITUDE] = row['e_' + bandtag]
-                catalog.entries[name].add_photometry(**photodict)
+    catalog.entries[name].add_photometry_table(
+        table, 'MJD', band_columns(table.colnames), upper_limits=('>',),
+        columns={PHOTOMETRY.COUNT_RATE: 'Cts',
+                 PHOTOMETRY.E_COUNT_RATE: 'e_Cts'}, source=source)
     catalog.journal_entries()
 
     # 2016AJ....151..125Z
@@ -197,28 +267,9 @@ def do_vizier(catalog):
     table.convert_bytestring_to_unicode()
     (name, source) = catalog.new_entry(
         'iPTF13bvn', bibcode='2016ApJ...825L..22F')
-    for row in pbar(table, task_str):
-        row = convert_aq_output(row)
-        bands = [
-            x for x in row if x.endswith('mag') and not x.startswith('e_')
-        ]
-        for bandtag in bands:
-            band = bandtag.replace('mag', '')
-            if (bandtag in row and is_number(row[bandtag]) and
-                    not isnan(float(row[bandtag]))):
-                photodict = {
-                    PHOTOMETRY.TIME: str(row['MJD']),
-                    PHOTOMETRY.U_TIME: 'MJD',
-                    PHOTOMETRY.BAND: band,
-                    PHOTOMETRY.MAGNITUDE: row[bandtag],
-                    PHOTOMETRY.SOURCE: source,
-                    PHOTOMETRY.TELESCOPE: row['Tel']
-                }
-                if row.get('l_' + bandtag, '') == '>':
-                    photodict[PHOTOMETRY.UPPER_LIMIT] = True
-                else:
-                    photodict[PHOTOMETRY.E_MAGNITUDE] = row['e_' + bandtag]
-                catalog.entries[name].add_photometry(**photodict)
+    catalog.entries[name].add_photometry_table(
+        table, 'MJD', band_columns(table.colnames), upper_limits=('>',),
+        columns={PHOTOMETRY.TELESCOPE: 'Tel'}, source=source)
     catalog.journal_entries()
 
     # 2016ApJ...826..144S
@@ -2483,9 +2534,10 @@ def do_vizier(catalog):
 def do_lennarz(catalog):
     """Import data from the Lennarz catalog."""
     task_str = catalog.get_current_task_str()
-    viz = Vizier(columns=['**'])
-    viz.ROW_LIMIT = -1
-    viz.VIZIER_SERVER = 'vizier.cfa.harvard.edu'
+    viz = VizierCache(
+        os.path.join(catalog.get_current_task_repo(), 'VizieR'),
+        columns=['**'], row_limit=-1, server='vizier.cfa.harvard.edu',
+        log=catalog.log)
     result = viz.get_catalogs('J/A+A/538/A120/usc')
     table = result[list(result.keys())[0]]
     table.convert_bytestring_to_unicode()
@@ -7,12 +7,14 @@ import warnings
 from glob import glob
 from html import unescape
 
+import numpy as np
 from astropy.time import Time as astrotime
 
 from astrocats.catalog.source import SOURCE
-from astrocats.catalog.utils import is_number, pbar, pbar_strings, uniq_cdl
+from astrocats.catalog.utils import pbar, pbar_strings, uniq_cdl
 
 from ..supernova import SUPERNOVA
+from ..textspectra import read_text_spectra
 
 
 def do_wiserep_spectra(catalog):
@@ -49,6 +51,25 @@ def do_wiserep_spectra(catalog):
                              '10.1093/mnras/stt1839': '2013MNRAS.436.3614S'}
 
     file_names = list(glob(os.path.join(catalog.get_current_task_repo(), '*')))
+    # The metadata of the events are read first, so that the spectra they
+    # list can be read in worker processes while the events are imported.
+    metadata = {}
+    spectrum_paths = []
+    for folder in sorted(file_names, key=lambda s: s.lower()):
+        readme_path = os.path.join(folder, 'README.json')
+        if ('.txt' in folder or '.json' in folder or
+                not os.path.exists(readme_path)):
+            continue
+        with open(readme_path, 'r') as f:
+            fileinfo = json.loads(f.read())
+        files = list(
+            set(glob(folder + '/*')) - set(glob(folder + '/README.json')))
+        metadata[folder] = fileinfo, files
+        spectrum_paths.extend(
+            x for x in files if os.path.basename(x) in fileinfo)
+    spectra = read_text_spectra(spectrum_paths,
+                                processes=catalog.TEXT_PROCESSES)
+
     for folder in pbar_strings(file_names, task_str):
         if '.txt' in folder or '.json' in folder:
             continue
@@ -71,17 +92,12 @@ def do_wiserep_spectra(catalog):
         catalog.entries[name].add_quantity(SUPERNOVA.ALIAS, name,
                                            secondarysource)
 
-        readme_path = os.path.join(folder, 'README.json')
-        if not os.path.exists(readme_path):
+        if folder not in metadata:
             catalog.log.warning(
                 'Metadata file not found for event "{}"'.format(name))
             continue
 
-        with open(readme_path, 'r') as f:
-            fileinfo = json.loads(f.read())
-
-        files = list(
-            set(glob(folder + '/*')) - set(glob(folder + '/README.json')))
+        fileinfo, files = metadata[folder]
         for fname in pbar(files, task_str):
             specfile = os.path.basename(fname)
             if specfile not in fileinfo:
@@ -121,53 +137,43 @@ def do_wiserep_spectra(catalog):
             catalog.entries[name].add_quantity(SUPERNOVA.REDSHIFT, redshift,
                                                secondarysource)
 
-            with open(fname, 'r') as f:
-                data = [x.split() for x in f]
-
-                skipspec = False
-                newdata = []
-                oldval = ''
-                for row in data:
-                    if row and '#' not in row[0]:
-                        if (len(row) >= 2 and is_number(row[0]) and
-                                is_number(row[1]) and row[1] != oldval):
-                            newdata.append(row)
-                            oldval = row[1]
-
-                if skipspec or not newdata:
-                    warnings.warn('Skipped adding spectrum file ' + specfile)
-                    continue
-
-                data = [list(i) for i in zip(*newdata)]
-                wavelengths = data[0]
-                fluxes = data[1]
-                errors = ''
-                if len(data) == 3:
-                    errors = data[1]
-                time = str(astrotime(epoch).mjd)
-
-                if max([float(x) for x in fluxes]) < 1.0e-5:
-                    fluxunit = 'erg/s/cm^2/Angstrom'
-                else:
-                    fluxunit = 'Uncalibrated'
-
-                catalog.entries[name].add_spectrum(
-                    u_wavelengths='Angstrom',
-                    errors=errors,
-                    u_fluxes=fluxunit,
-                    u_errors=fluxunit if errors else '',
-                    wavelengths=wavelengths,
-                    fluxes=fluxes,
-                    u_time='MJD',
-                    time=time,
-                    instrument=instrument,
-                    source=sources,
-                    observer=observer,
-                    reducer=reducer,
-                    reduction=reduction,
-                    filename=specfile,
-                    survey=survey,
-                    redshift=redshift)
+            data = next(spectra)
+            if not len(data):
+                warnings.warn('Skipped adding spectrum file ' + specfile)
+                continue
+
+            # Rows repeating the flux of the row before are left out.
+            keep = np.append(True, data.columns[1][1:] !=
+                             data.columns[1][:-1])
+            wavelengths = data.columns[0][keep]
+            fluxes = data.columns[1][keep]
+            errors = ''
+            if len(data.columns) == 3:
+                errors = fluxes
+            time = str(astrotime(epoch).mjd)
+
+            if max(data.values[1][keep].tolist()) < 1.0e-5:
+                fluxunit = 'erg/s/cm^2/Angstrom'
+            else:
+                fluxunit = 'Uncalibrated'
+
+            catalog.entries[name].add_spectrum(
+                u_wavelengths='Angstrom',
+                errors=errors,
+                u_fluxes=fluxunit,
+                u_errors=fluxunit if len(errors) else '',
+                wavelengths=wavelengths,
+                fluxes=fluxes,
+                u_time='MJD',
+                time=time,
+                instrument=instrument,
+                source=sources,
+                observer=observer,
+                reducer=reducer,
+                reduction=reduction,
+                filename=specfile,
+                survey=survey,
+                redshift=redshift)
 
         catalog.journal_entries()
 
@@ -0,0 +1,157 @@
+"""Reading of plain-text spectrum files.
+
+Each text spectrum task had a parser of its own, built from `csv.reader` or
+`str.split` calls, comment skipping and `zip(*rows)`, and checked which
+values were numbers one `float` call at a time. `parse_text_spectrum`
+splits a file into rows at the delimiter it finds in it, keeps the rows
+whose first two values are numbers (Fortran `D` exponents included), and
+returns each column both as an array of its strings, which keep the
+precision the values were given with, and as an array of floats.
+`read_text_spectra` reads a list of files in a pool of worker processes,
+returning them in order.
+"""
+import os
+import re
+from functools import partial
+
+import numpy as np
+
+from .utils import process_map
+
+__all__ = ['TextSpectrum', 'parse_text_spectrum', 'read_text_spectra',
+           'read_text_spectrum']
+
+# Characters starting a comment line.
+COMMENTS = ('#', '!', '%')
+# Delimiters looked for, in order, before splitting at whitespace.
+DELIMITERS = (',', '|', ';')
+# Numbers written with a Fortran `D` exponent.
+FORTRAN_NUMBER = re.compile(r'^[+-]?(\d+\.?\d*|\.\d+)[Dd][+-]?\d+$')
+
+
+class TextSpectrum(object):
+    """The columns of a plain-text spectrum.
+
+    `columns` holds the strings of each column as given in the file (with
+    Fortran `D` exponents written as `E`), and `values` their values as
+    floats, NaN for strings which are not numbers (such as `INDEF` or `--`
+    placeholders). The spectrum has as many columns as its shortest row.
+    `header` holds the lines of the file which are not rows of it.
+    """
+
+    def __init__(self, columns, values, header, path=None):
+        """Initialize from the parts found by `parse_text_spectrum`."""
+        self.path = path
+        self.filename = os.path.basename(path) if path else None
+        self.columns = columns
+        self.values = values
+        self.header = header
+
+    def __len__(self):
+        return len(self.columns[0]) if self.columns else 0
+
+
+def _numbers(strings):
+    """Return `strings` with Fortran exponents replaced, their values (NaN
+    where not numbers), and where they are numbers.
+    """
+    try:
+        values = strings.astype(float)
+        return strings, values, np.ones(len(strings), dtype=bool)
+    except ValueError:
+        pass
+    values = np.full(len(strings), np.nan)
+    valid = np.zeros(len(strings), dtype=bool)
+    fortran = []
+    for i, x in enumerate(strings):
+        if FORTRAN_NUMBER.match(x):
+            fortran.append(i)
+            x = x.replace('D', 'E').replace('d', 'e')
+        try:
+            values[i] = float(x)
+        except ValueError:
+            continue
+        valid[i] = True
+    if fortran:
+        strings = strings.copy()
+        strings[fortran] = np.char.replace(
+            np.char.replace(strings[fortran], 'D', 'E'), 'd', 'e')
+    return strings, values, valid
+
+
+def parse_text_spectrum(text, skip_rows=0, numeric=2, path=None):
+    """Parse the spectrum in `text`, returning a `TextSpectrum`.
+
+    The first `skip_rows` lines, blank lines, comment lines and rows whose
+    first `numeric` values are not numbers are not rows of the spectrum.
+    Values are separated by the first of `DELIMITERS` found in the middle
+    row of the file, by whitespace if none is.
+    """
+    lines = text.splitlines()
+    header = lines[:skip_rows]
+    body = []
+    for line in lines[skip_rows:]:
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if stripped.startswith(COMMENTS):
+            header.append(line)
+        else:
+            body.append(line)
+    if not body:
+        return TextSpectrum([], [], header, path=path)
+
+    middle = body[len(body) // 2]
+    delimiter = next((x for x in DELIMITERS if x in middle), None)
+    if delimiter is None:
+        rows = [x.split() for x in body]
+    else:
+        rows = [[y.strip() for y in x.split(delimiter)] for x in body]
+
+    # Rows too short to have `numeric` numbers are left out first, so that
+    # the numbers can be checked one column at a time.
+    keep = np.array([len(x) >= numeric for x in rows])
+    candidates = [x for x, k in zip(rows, keep) if k]
+    firsts = []
+    valid = np.ones(len(candidates), dtype=bool)
+    for ci in range(numeric):
+        strings, values, isnumber = _numbers(
+            np.array([x[ci] for x in candidates]))
+        firsts.append((strings, values))
+        valid &= isnumber
+    keep[keep] = valid
+    header.extend(x for x, k in zip(body, keep) if not k)
+    rows = [x for x, v in zip(candidates, valid) if v]
+    if not rows:
+        return TextSpectrum([], [], header, path=path)
+
+    ncols = min(len(x) for x in rows)
+    columns = []
+    values = []
+    for ci in range(ncols):
+        if ci < numeric:
+            strings, floats = firsts[ci][0][valid], firsts[ci][1][valid]
+        else:
+            strings, floats, isnumber = _numbers(
+                np.array([x[ci] for x in rows]))
+        columns.append(strings)
+        values.append(floats)
+    return TextSpectrum(columns, values, header, path=path)
+
+
+def read_text_spectrum(path, **kwargs):
+    """Read the spectrum in text file `path`, with the keyword arguments of
+    `parse_text_spectrum`.
+    """
+    with open(path, 'r') as f:
+        return parse_text_spectrum(f.read(), path=path, **kwargs)
+
+
+def read_text_spectra(paths, processes=None, **kwargs):
+    """Read the text spectra `paths`, yielding `TextSpectrum`s in order.
+
+    Files are read by `processes` worker processes (one per core if `None`),
+    with the keyword arguments of `parse_text_spectrum`.
+    """
+    return process_map(partial(read_text_spectrum, **kwargs), paths,
+                       processes=processes)
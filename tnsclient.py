@@ -0,0 +1,188 @@
+"""Concurrent, rate-limited client for the TNS object API.
+
+`do_tns_photo` and `do_tns_spectra` used to request each object serially,
+once per task, sleeping a fixed five seconds after any failure.
+`TNSClient` requests many objects at once from a few threads, asks for
+photometry and spectra together so that each object is fetched only once
+per run, and keeps to the rate limits the TNS advertises in its
+`x-rate-limit-*` response headers with a token bucket and an exponential
+backoff.
+"""
+import json
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+__all__ = ['TNSClient', 'load_tns_key']
+
+
+def load_tns_key(path='tns.key'):
+    """Return the TNS API key stored in `path`, `None` if not found."""
+    try:
+        with open(path, 'r') as f:
+            return f.read().splitlines()[0]
+    except Exception:
+        return None
+
+
+class TokenBucket(object):
+    """Thread-safe token bucket allowing `rate` acquisitions per second.
+
+    Up to `capacity` acquisitions can be made at once after a quiet period,
+    and `pause` holds off all acquisitions until a given time, e.g. when the
+    server has asked us to wait.
+    """
+
+    def __init__(self, rate, capacity):
+        """Initialize a full bucket."""
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Wait for and take a token."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (
+                    now - self._updated) * self.rate)
+                self._updated = now
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                else:
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Hold off all acquisitions for `seconds`."""
+        with self._lock:
+            self._paused_until = max(self._paused_until,
+                                     time.monotonic() + seconds)
+            self._tokens = 0
+
+
+class TNSClient(object):
+    """Fetch object replies from the `api/get/object` endpoint of a TNS.
+
+    `base_url` is the TNS (or WISeREP) site URL ending in '/'. Replies are
+    not kept; callers note in `saved` where they saved the reply of an
+    object, so that later tasks (e.g. reading its spectra after its
+    photometry) read it back instead of requesting it again.
+    """
+
+    CONCURRENCY = 4
+    # Sustained requests per second, and requests allowed in a burst.
+    RATE = 1.5
+    BURST = 10
+    RETRIES = 3
+    BACKOFF = 5.0
+    TIMEOUT = 30
+    # Stop requesting after this many objects could not be fetched.
+    MAX_FAILURES = 5
+
+    def __init__(self, base_url, api_key, concurrency=None, rate=None,
+                 burst=None, retries=None, timeout=None, max_failures=None):
+        """Initialize the client."""
+        self.base_url = base_url
+        self.api_key = api_key or ''
+        self.concurrency = concurrency or self.CONCURRENCY
+        self.retries = self.RETRIES if retries is None else retries
+        self.timeout = timeout or self.TIMEOUT
+        self.max_failures = max_failures or self.MAX_FAILURES
+        self._bucket = TokenBucket(rate or self.RATE, burst or self.BURST)
+        self.saved = {}
+        self._failures = 0
+        self._lock = threading.Lock()
+
+    def get_objects(self, objnames):
+        """Return an `OrderedDict` of object name -> reply, in given order.
+
+        Replies are the `data/reply` dictionaries of the API; objects that
+        could not be fetched or were not found map to `None`. Once
+        `max_failures` objects have failed, no further requests are made.
+        """
+        objnames = list(OrderedDict.fromkeys(objnames))
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            return OrderedDict(
+                zip(objnames, executor.map(self._get_object, objnames)))
+
+    def get_object(self, objname):
+        """Return the reply for a single object, `None` on failure."""
+        return self.get_objects([objname])[objname]
+
+    def reset(self):
+        """Forget the objects that failed, e.g. at the start of a task."""
+        with self._lock:
+            self._failures = 0
+
+    @property
+    def failed(self):
+        """Whether `max_failures` objects have failed to be fetched."""
+        return self._failures >= self.max_failures
+
+    def _get_object(self, objname):
+        if self.failed:
+            return None
+        data = urllib.parse.urlencode({
+            'api_key': self.api_key,
+            'data': json.dumps({
+                'objname': objname,
+                'photometry': '1',
+                'spectra': '1'
+            })
+        }).encode('ascii')
+        request = urllib.request.Request(
+            self.base_url + 'api/get/object', data=data)
+        reply = None
+        for attempt in range(self.retries):
+            self._bucket.acquire()
+            try:
+                response = urllib.request.urlopen(
+                    request, timeout=self.timeout)
+                self._respect_limits(response.headers)
+                reply = json.loads(
+                    response.read().decode('utf-8'))['data']['reply']
+                break
+            except (KeyboardInterrupt, SystemExit):
+                raise
+            except urllib.error.HTTPError as e:
+                # If rate limited, wait as long as we are told to instead.
+                if e.code == 429 and self._respect_limits(e.headers):
+                    continue
+            except Exception:
+                pass
+            if attempt + 1 < self.retries:
+                time.sleep(self.BACKOFF * 2 ** attempt)
+        if (not reply or 'objname' not in reply or
+                not isinstance(reply['objname'], str)):
+            with self._lock:
+                self._failures += 1
+            return None
+        return reply
+
+    def _respect_limits(self, headers):
+        """Pause if the TNS says no requests are left in its window.
+
+        Returns whether requests were paused.
+        """
+        if headers is None:
+            return False
+        remaining = headers.get('x-rate-limit-remaining')
+        reset = headers.get('x-rate-limit-reset')
+        try:
+            if remaining is None or int(remaining) > 0:
+                return False
+            self._bucket.pause(float(reset) if reset else 60.)
+        except ValueError:
+            return False
+        return True
@@ -0,0 +1,137 @@
+"""Concurrent downloading of the files a task is about to load.
+
+Tasks which load an index (a list of spectra, of alerts, a listing page)
+then called `load_url` once per object listed in it, inside their parsing
+loop, so that the download of each object's light curve or spectrum held up
+the parsing of the next one. Given the URLs the loop will load, in order,
+`URLPrefetcher` downloads them ahead of the loop in a bounded pool of
+threads, keeping to a rate limit per host, and `load_url` then finds each
+download done or waits for it.
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from .taskprefetch import url_key
+from .tnsclient import TokenBucket
+
+__all__ = ['URLPrefetcher']
+
+
+class URLPrefetcher(object):
+    """Download a list of URLs ahead of them being taken, in order.
+
+    `download(url, timeout, post, verify)` performs a download and returns
+    its text or `None`, and `requests` is the list of `[url, post, timeout,
+    verify]` that will be taken. Downloads are made at most `window` URLs
+    ahead of the last one taken. URLs are expected to be taken in order;
+    taking one drops the downloads of the URLs before it, which are taken
+    to have been skipped.
+    """
+
+    MAX_WORKERS = 4
+    # Sustained requests per second made to any one host, and requests
+    # allowed in a burst.
+    RATE = 4.0
+    BURST = 4
+    # Number of URLs downloaded ahead of the last one taken.
+    WINDOW = 32
+
+    def __init__(self, download, requests, max_workers=None, rate=None,
+                 burst=None, window=None):
+        """Initialize the prefetcher and start downloading."""
+        self.download = download
+        self.rate = rate or self.RATE
+        self.burst = burst or self.BURST
+        self.window = window or self.WINDOW
+        self._requests = OrderedDict()
+        for url, post, timeout, verify in requests:
+            self._requests.setdefault(url_key(url, post),
+                                      (url, post, timeout, verify))
+        self._order = list(self._requests)
+        self._index = {x: i for i, x in enumerate(self._order)}
+        # Index of the next URL to download, and of the URL after the last
+        # one taken.
+        self._next = 0
+        self._taken = 0
+        self._pending = set()
+        self._responses = {}
+        self._buckets = {}
+        self._closed = False
+        self._futures = set()
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or self.MAX_WORKERS)
+        with self._condition:
+            self._fill()
+
+    def take(self, url, post=None):
+        """Return the downloaded text of `url`.
+
+        Waits for the download if it is in progress; returns `None` if `url`
+        is not one of the requests, was already taken or skipped, or its
+        download failed.
+        """
+        key = url_key(url, post)
+        with self._condition:
+            index = self._index.get(key)
+            if index is None or index < self._taken:
+                return None
+            for skipped in self._order[self._taken:index]:
+                self._responses.pop(skipped, None)
+            self._taken = index + 1
+            if index >= self._next:
+                # Not downloaded yet, the caller downloads it now.
+                self._next = index + 1
+                self._fill()
+                return None
+            while key in self._pending and not self._closed:
+                self._condition.wait()
+            text = self._responses.pop(key, None)
+            self._fill()
+            return text
+
+    def close(self):
+        """Stop downloading and drop anything not yet taken."""
+        with self._condition:
+            self._closed = True
+            self._responses.clear()
+            self._condition.notify_all()
+        for future in list(self._futures):
+            future.cancel()
+        self._executor.shutdown(wait=False)
+
+    def _fill(self):
+        """Start the downloads of the window after the last URL taken."""
+        while (not self._closed and self._next < len(self._order) and
+               self._next < self._taken + self.window):
+            key = self._order[self._next]
+            self._pending.add(key)
+            future = self._executor.submit(
+                self._fetch, key, *self._requests[key])
+            self._futures.add(future)
+            future.add_done_callback(self._futures.discard)
+            self._next += 1
+
+    def _bucket(self, url):
+        """Return the token bucket of the host of `url`."""
+        host = urlsplit(url).netloc
+        with self._condition:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.burst)
+            return self._buckets[host]
+
+    def _fetch(self, key, url, post, timeout, verify):
+        text = None
+        if not self._closed:
+            self._bucket(url).acquire()
+            try:
+                text = self.download(url, timeout, post, verify)
+            except Exception:
+                text = None
+        with self._condition:
+            self._pending.discard(key)
+            if not self._closed and self._index[key] >= self._taken - 1:
+                self._responses[key] = text
+            self._condition.notify_all()
@@ -1,9 +1,11 @@
-from . import clean, compare, sorting
+from . import clean, compare, parallel, sorting
 from .clean import *
 from .compare import *
+from .parallel import *
 from .sorting import *
 
 __all__ = []
 __all__.extend(sorting.__all__)
 __all__.extend(clean.__all__)
 __all__.extend(compare.__all__)
+__all__.extend(parallel.__all__)
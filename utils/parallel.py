@@ -0,0 +1,38 @@
+"""Utility functions for running work in a pool of worker processes.
+"""
+import multiprocessing
+import os
+from collections import deque
+
+__all__ = ['process_map']
+
+
+def process_map(function, items, processes=None, window=None):
+    """Yield `function(item)` for each of `items`, in order.
+
+    The calls are made in `processes` forked worker processes (one per core
+    if `None`), or in this process if there is only one item or process.
+    `function` must be defined at module level, and its results picklable.
+    At most `window` calls (four per process if `None`) are made ahead of
+    the result being yielded, so that results do not pile up in memory when
+    they are used more slowly than they are made.
+    """
+    items = list(items)
+    processes = min(processes or os.cpu_count() or 1, len(items))
+    if processes <= 1:
+        for item in items:
+            yield function(item)
+        return
+    window = window or 4 * processes
+    pool = multiprocessing.get_context('fork').Pool(processes)
+    try:
+        pending = deque()
+        for item in items:
+            pending.append(pool.apply_async(function, (item,)))
+            if len(pending) >= window:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+    finally:
+        pool.terminate()
+        pool.join()
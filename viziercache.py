@@ -0,0 +1,116 @@
+"""Local cache of the VizieR tables read by the import tasks.
+
+The VizieR tasks queried VizieR for about a hundred published tables one
+after another on every import, although published tables never change.
+`VizierCache` answers `get_catalogs` from the VOTables VizieR returned the
+first time a catalog was queried, kept in the task's repo under a name
+made from the catalog IDs and the columns selected, and parses them with
+`astroquery` as it would have parsed the response. `prefetch` downloads the
+tables not yet cached concurrently, so that after one import the tasks run
+without touching the network.
+"""
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from astroquery.vizier import Vizier
+
+try:
+    from astroquery.vizier.core import parse_vizier_votable
+except ImportError:
+    # Made private, with keyword-only options, in astroquery 0.4.
+    from astroquery.vizier.core import (
+        _parse_vizier_votable as parse_vizier_votable)
+
+__all__ = ['VizierCache']
+
+
+class VizierCache(object):
+    """`Vizier` query of catalogs, answered from VOTables cached in `path`.
+
+    `columns` and `row_limit` are the columns and the maximum number of rows
+    (-1 for all) queried, and `server` the VizieR mirror queried if not the
+    `astroquery` default.
+    """
+
+    MAX_WORKERS = 4
+    SUFFIX = '.vot'
+
+    def __init__(self, path, columns=('*',), row_limit=-1, server=None,
+                 log=None):
+        """Initialize a cache of the tables in directory `path`."""
+        self.path = path
+        self.columns = list(columns)
+        self.row_limit = row_limit
+        self.server = server
+        self.log = log
+
+    def filename(self, catalog):
+        """Return the path catalog (or list of catalogs) `catalog` is cached
+        at.
+        """
+        catalogs = [catalog] if isinstance(catalog, str) else list(catalog)
+        name = '+'.join(re.sub(r'[^\w.+-]', '_', x) for x in catalogs)
+        selection = hashlib.sha1(json.dumps(
+            [self.columns, self.row_limit]).encode('utf-8')).hexdigest()[:8]
+        return os.path.join(self.path, name + '.' + selection + self.SUFFIX)
+
+    def get_catalogs(self, catalog):
+        """Return the `TableList` of catalog (or list of catalogs) `catalog`,
+        downloading and caching it if not cached.
+        """
+        path = self.filename(catalog)
+        if os.path.isfile(path):
+            with open(path, 'rb') as f:
+                return parse_vizier_votable(f.read())
+        return self._download(catalog)
+
+    def prefetch(self, catalogs):
+        """Download and cache those of `catalogs` that are not cached.
+
+        Catalogs are downloaded `MAX_WORKERS` at a time; those that fail to
+        download are left to be queried again by `get_catalogs`.
+        """
+        missing = [x for x in catalogs if not os.path.isfile(
+            self.filename(x))]
+        if not missing:
+            return
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+            for catalog, error in zip(missing, executor.map(
+                    self._prefetch, missing)):
+                if error is not None and self.log is not None:
+                    self.log.warning(
+                        "VizieR download of '{}' failed ('{}').".format(
+                            catalog, error))
+
+    def _prefetch(self, catalog):
+        try:
+            self._download(catalog)
+        except Exception as err:
+            return err
+        return None
+
+    def _download(self, catalog):
+        """Query VizieR for `catalog`, cache its VOTable and return its
+        `TableList`.
+        """
+        # A `Vizier` per query, as they are made from several threads.
+        viz = Vizier(columns=self.columns)
+        viz.ROW_LIMIT = self.row_limit
+        if self.server:
+            viz.VIZIER_SERVER = self.server
+        response = viz.get_catalogs_async(catalog)
+        response.raise_for_status()
+        data = response.content
+        tables = parse_vizier_votable(data)
+        # Only cache responses holding tables, not errors.
+        if not len(tables):
+            raise ValueError('no tables returned')
+        path = self.filename(catalog)
+        os.makedirs(self.path, exist_ok=True)
+        with open(path + '.tmp', 'wb') as f:
+            f.write(data)
+        os.replace(path + '.tmp', path)
+        return tables